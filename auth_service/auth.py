@@ -1,29 +1,125 @@
 """Auth middleware"""
 
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
 import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from config import settings
 from logger import auth_logger
 from utils import verify_token
 
 logger = auth_logger
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Auth middleware"""
+class TokenCache:
+    """Bounded LRU cache of verified JWT payloads
+
+    Entries are keyed by the SHA-256 of the token, so raw bearer tokens are
+    not kept around, and expire at the token's exp claim or after max_age
+    seconds, whichever comes first. Only successfully verified tokens are
+    cached.
+    """
+
+    def __init__(self, max_size: int, max_age: int):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached payload of token, or None"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # Callers get their own copy to modify
+                return dict(payload)
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: dict):
+        """Cache a verified payload until its exp"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.max_age
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        key = self._key(token)
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Size and hit/miss counters of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_SIZE,
+    settings.AUTH_TOKEN_CACHE_MAX_AGE_SECONDS,
+)
+
+
+class AuthMiddleware:
+    """Auth middleware
+
+    A plain ASGI middleware: it reads the Authorization header straight from
+    the scope and stores the verified payload in the request state, without
+    the extra task and body streaming BaseHTTPMiddleware adds per request.
+    """
+
+    TOKEN_PREFIX = b"Bearer "
 
-    TOKEN_PREFIX = "Bearer "
+    def __init__(self, app: ASGIApp, cache: TokenCache = None):
+        self.app = app
+        self.cache = cache or token_cache
 
-    async def dispatch(self, request, call_next):
-        """Dispatch request"""
-        token = request.headers.get("Authorization")
-        if token and token.startswith(self.TOKEN_PREFIX):
-            token = token.removeprefix(self.TOKEN_PREFIX)
+    def verify(self, token: str) -> dict:
+        """Payload of a verified token, or {} if it does not verify"""
+        payload = self.cache.get(token)
+        if payload is not None:
+            return payload
+        try:
+            payload = verify_token(token)
+        except (jwt.PyJWTError, ValueError) as e:
+            logger.error("JWT error: %s", e)
+            return {}
+        self.cache.put(token, payload)
+        return payload
 
-            try:
-                token_data = verify_token(token)
-                request.state.user = token_data
-            except jwt.PyJWTError as e:
-                logger.error("JWT error: %s", e)
-                request.state.user = {}
-        return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    if value.startswith(self.TOKEN_PREFIX):
+                        token = value[len(self.TOKEN_PREFIX) :].decode("latin-1")
+                        scope.setdefault("state", {})["user"] = self.verify(token)
+                    break
+        await self.app(scope, receive, send)
@@ -19,6 +19,11 @@ class Settings(BaseSettings):
     )
     JWT_SECRET: str = Field(..., env="JWT_SECRET")
     JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
+    AUTH_TOKEN_CACHE_SIZE: int = Field(10000, env="AUTH_TOKEN_CACHE_SIZE")
+    AUTH_TOKEN_CACHE_MAX_AGE_SECONDS: int = Field(
+        300,
+        env="AUTH_TOKEN_CACHE_MAX_AGE_SECONDS",
+    )
 
     class Config:
         """Config"""
@@ -5,7 +5,7 @@ from typing import Any, Dict
 from fastapi import Depends, FastAPI, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from auth import AuthMiddleware
+from auth import AuthMiddleware, token_cache
 from db import get_session
 from dependencies import require_admin_role
 from logger import auth_logger, setup_logging
@@ -123,3 +123,16 @@ def health_check_api() -> Dict[str, Any]:
     Health check endpoint
     """
     return {"status": "ok", "message": "Service is healthy"}
+
+
+@app.get(
+    "/health/auth",
+    tags=["Health"],
+    summary="Auth Token Cache Stats",
+    description="Size and hit/miss counters of the verified token cache",
+)
+def auth_stats_api() -> Dict[str, Any]:
+    """
+    Auth token cache stats endpoint
+    """
+    return token_cache.stats()
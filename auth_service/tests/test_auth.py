@@ -0,0 +1,72 @@
+"""Test auth middleware"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from auth import AuthMiddleware, TokenCache
+from utils import create_access_token, verify_token
+
+
+def create_test_app(cache: TokenCache) -> FastAPI:
+    """Create a test app"""
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(request: Request):
+        return {"user": getattr(request.state, "user", None)}
+
+    app.add_middleware(AuthMiddleware, cache=cache)
+    return app
+
+
+def test_auth_middleware_caches_verified_tokens():
+    """Test a reused token is verified only once"""
+    cache = TokenCache(100, 300)
+    client = TestClient(create_test_app(cache))
+    token = create_access_token({"sub": "me@example.com", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with patch("auth.verify_token", wraps=verify_token) as mock_verify:
+        responses = [client.get("/me", headers=headers) for _ in range(3)]
+
+    assert [r.json()["user"]["sub"] for r in responses] == ["me@example.com"] * 3
+    mock_verify.assert_called_once()
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_auth_middleware_expired_token():
+    """Test an expired token leaves an empty user instead of failing"""
+    cache = TokenCache(100, 300)
+    client = TestClient(create_test_app(cache))
+    token = create_access_token({"sub": "me@example.com"}, timedelta(seconds=-1))
+
+    response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["user"] == {}
+    assert cache.stats()["size"] == 0
+
+
+def test_auth_middleware_without_token():
+    """Test requests without a bearer token get no user"""
+    client = TestClient(create_test_app(TokenCache(100, 300)))
+
+    response = client.get("/me")
+
+    assert response.json()["user"] is None
+
+
+def test_token_cache_is_bounded_lru():
+    """Test the least recently used token is evicted first"""
+    cache = TokenCache(2, 300)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"}
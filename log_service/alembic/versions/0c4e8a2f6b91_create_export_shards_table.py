@@ -0,0 +1,71 @@
+"""Create export_shards table
+
+Revision ID: 0c4e8a2f6b91
+Revises: f5b9d2e7c3a6
+Create Date: 2026-10-18 18:02:15.640273
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0c4e8a2f6b91"
+down_revision: Union[str, Sequence[str], None] = "f5b9d2e7c3a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column("manifest_url", sa.String(), nullable=True),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("shard_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("shards_done", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "export_shards",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("pipeline_id", sa.UUID(), nullable=False),
+        sa.Column("shard_index", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=True),
+        sa.Column("end_time", sa.DateTime(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("file_key", sa.String(), nullable=True),
+        sa.Column("row_count", sa.BigInteger(), nullable=False),
+        sa.Column("bytes", sa.BigInteger(), nullable=False),
+        sa.Column("sha256", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["pipeline_id"], ["export_pipelines.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("pipeline_id", "shard_index"),
+    )
+    op.create_index(
+        op.f("ix_export_shards_pipeline_id"),
+        "export_shards",
+        ["pipeline_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_index(op.f("ix_export_shards_pipeline_id"), table_name="export_shards")
+    op.drop_table("export_shards")
+    op.drop_column("export_pipelines", "shards_done")
+    op.drop_column("export_pipelines", "shard_count")
+    op.drop_column("export_pipelines", "manifest_url")
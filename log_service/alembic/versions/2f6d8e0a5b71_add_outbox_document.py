@@ -0,0 +1,34 @@
+"""Add document to outbox_events
+
+Revision ID: 2f6d8e0a5b71
+Revises: 9c1e7a4b2d3f
+Create Date: 2026-10-18 10:03:27.418250
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6d8e0a5b71"
+down_revision: Union[str, Sequence[str], None] = "9c1e7a4b2d3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "outbox_events",
+        sa.Column("document", sa.JSON(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("outbox_events", "document")
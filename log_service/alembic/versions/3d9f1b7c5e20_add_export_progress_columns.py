@@ -0,0 +1,56 @@
+"""Add export progress columns
+
+Revision ID: 3d9f1b7c5e20
+Revises: 0c4e8a2f6b91
+Create Date: 2026-10-18 19:26:41.118304
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3d9f1b7c5e20"
+down_revision: Union[str, Sequence[str], None] = "0c4e8a2f6b91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column(
+            "rows_processed", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("bytes_written", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("rows_estimated", sa.BigInteger(), nullable=True),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_pipelines", "finished_at")
+    op.drop_column("export_pipelines", "started_at")
+    op.drop_column("export_pipelines", "rows_estimated")
+    op.drop_column("export_pipelines", "bytes_written")
+    op.drop_column("export_pipelines", "rows_processed")
@@ -0,0 +1,155 @@
+"""Partition audit_logs by month
+
+Revision ID: 6a3b9d2e4f10
+Revises: 2f6d8e0a5b71
+Create Date: 2026-10-18 13:40:05.261784
+
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6a3b9d2e4f10"
+down_revision: Union[str, Sequence[str], None] = "2f6d8e0a5b71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "alid, tenant_id, user_id, email, action, resource_type, resource_id, "
+    "ip_address, user_agent, log_metadata, before_state, after_state, severity"
+)
+
+
+def _audit_log_columns(created_at_nullable: bool) -> list:
+    return [
+        sa.Column("alid", sa.UUID(), nullable=False),
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("resource_type", sa.String(), nullable=False),
+        sa.Column("resource_id", sa.String(), nullable=False),
+        sa.Column("ip_address", sa.String(), nullable=True),
+        sa.Column("user_agent", sa.String(), nullable=True),
+        sa.Column("log_metadata", sa.JSON(), nullable=True),
+        sa.Column("before_state", sa.JSON(), nullable=True),
+        sa.Column("after_state", sa.JSON(), nullable=True),
+        sa.Column("severity", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=created_at_nullable),
+    ]
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _rename_indexes(old_table: str, new_table: str) -> None:
+    for column in ("created_at", "tenant_id"):
+        op.execute(
+            f"ALTER INDEX ix_{old_table}_{column} RENAME TO ix_{new_table}_{column}"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.rename_table("audit_logs", "audit_logs_legacy")
+    op.execute(
+        "ALTER TABLE audit_logs_legacy "
+        "RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey"
+    )
+    _rename_indexes("audit_logs", "audit_logs_legacy")
+
+    # The partition key has to be part of the primary key
+    op.create_table(
+        "audit_logs",
+        *_audit_log_columns(created_at_nullable=False),
+        sa.PrimaryKeyConstraint("alid", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    # Catches rows outside the pre-created months, e.g. backdated imports
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    oldest = (
+        op.get_bind()
+        .execute(sa.text("SELECT min(created_at) FROM audit_logs_legacy"))
+        .scalar()
+    )
+    start = _month_start(min(oldest or now, now))
+    last = _month_start(now)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while start <= last:
+        end = _next_month(start)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{start.strftime('%Y%m')} "
+            f"PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS}, created_at) "
+        f"SELECT {COLUMNS}, COALESCE(created_at, now() AT TIME ZONE 'utc') "
+        f"FROM audit_logs_legacy"
+    )
+    op.drop_table("audit_logs_legacy")
+    op.create_index(
+        op.f("ix_audit_logs_created_at"),
+        "audit_logs",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_audit_logs_tenant_id"),
+        "audit_logs",
+        ["tenant_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.rename_table("audit_logs", "audit_logs_partitioned")
+    op.execute(
+        "ALTER TABLE audit_logs_partitioned "
+        "RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey"
+    )
+    _rename_indexes("audit_logs", "audit_logs_partitioned")
+
+    op.create_table(
+        "audit_logs",
+        *_audit_log_columns(created_at_nullable=True),
+        sa.PrimaryKeyConstraint("alid"),
+    )
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS}, created_at) "
+        f"SELECT {COLUMNS}, created_at FROM audit_logs_partitioned"
+    )
+    # Dropping the parent drops every partition with it
+    op.drop_table("audit_logs_partitioned")
+    op.create_index(
+        op.f("ix_audit_logs_created_at"),
+        "audit_logs",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_audit_logs_tenant_id"),
+        "audit_logs",
+        ["tenant_id"],
+        unique=False,
+    )
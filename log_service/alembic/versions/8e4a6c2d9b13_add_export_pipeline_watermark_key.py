@@ -0,0 +1,67 @@
+"""Add watermark_key to export_pipelines
+
+Revision ID: 8e4a6c2d9b13
+Revises: 3d9f1b7c5e20
+Create Date: 2026-10-18 21:04:12.530618
+
+"""
+
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4a6c2d9b13"
+down_revision: Union[str, Sequence[str], None] = "3d9f1b7c5e20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+export_pipelines = sa.table(
+    "export_pipelines",
+    sa.column("id", sa.String()),
+    sa.column("filters", sa.JSON()),
+    sa.column("incremental", sa.Boolean()),
+    sa.column("watermark_key", sa.String()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column("watermark_key", sa.String(), nullable=True),
+    )
+
+    # Key existing incremental exports by their row filters, as
+    # services.export.export_watermark_key does
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(export_pipelines.c.id, export_pipelines.c.filters).where(
+            export_pipelines.c.incremental.is_(True)
+        )
+    )
+    for pipeline_id, filters in rows.all():
+        row_filters = {
+            key: value
+            for key, value in (filters or {}).items()
+            if key not in ("start_time", "end_time")
+        }
+        connection.execute(
+            export_pipelines.update()
+            .where(export_pipelines.c.id == pipeline_id)
+            .values(
+                watermark_key=json.dumps(
+                    row_filters, sort_keys=True, separators=(",", ":")
+                )
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_pipelines", "watermark_key")
@@ -0,0 +1,52 @@
+"""Add tenant composite indexes to audit_logs
+
+Revision ID: b4e1c7d9a2f3
+Revises: 6a3b9d2e4f10
+Create Date: 2026-10-18 15:12:44.903517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e1c7d9a2f3"
+down_revision: Union[str, Sequence[str], None] = "6a3b9d2e4f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    # Indexes on the partitioned parent cascade to every partition
+    op.create_index(
+        "ix_audit_logs_tenant_id_created_at",
+        "audit_logs",
+        ["tenant_id", sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_tenant_id_alid",
+        "audit_logs",
+        ["tenant_id", "alid"],
+        unique=False,
+    )
+    # Both composites lead with tenant_id, the single column index is redundant
+    op.drop_index(op.f("ix_audit_logs_tenant_id"), table_name="audit_logs")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.create_index(
+        op.f("ix_audit_logs_tenant_id"),
+        "audit_logs",
+        ["tenant_id"],
+        unique=False,
+    )
+    op.drop_index("ix_audit_logs_tenant_id_alid", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_tenant_id_created_at", table_name="audit_logs")
@@ -0,0 +1,39 @@
+"""Add attempt and lease to export_shards
+
+Revision ID: b7d3e9f1a4c8
+Revises: 8e4a6c2d9b13
+Create Date: 2026-10-18 22:12:37.204815
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d3e9f1a4c8"
+down_revision: Union[str, Sequence[str], None] = "8e4a6c2d9b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_shards",
+        sa.Column("attempt", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "export_shards",
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_shards", "lease_expires_at")
+    op.drop_column("export_shards", "attempt")
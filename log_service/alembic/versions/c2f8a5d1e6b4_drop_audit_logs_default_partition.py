@@ -0,0 +1,76 @@
+"""Drop the default audit_logs partition
+
+Revision ID: c2f8a5d1e6b4
+Revises: b7d3e9f1a4c8
+Create Date: 2026-10-18 23:05:41.872311
+
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f8a5d1e6b4"
+down_revision: Union[str, Sequence[str], None] = "b7d3e9f1a4c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created up front so inserts have a partition until the
+# maintenance service first runs
+MONTHS_AHEAD = 3
+
+
+def _next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _create_partition(start: datetime) -> None:
+    # pylint: disable=no-member
+    end = _next_month(start)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS audit_logs_p{start.strftime('%Y%m')} "
+        f"PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    # Expired partitions are detached CONCURRENTLY, which Postgres refuses
+    # while a default partition exists. Rows that landed in it get monthly
+    # partitions of their own.
+    connection = op.get_bind()
+    months = (
+        connection.execute(
+            sa.text(
+                "SELECT DISTINCT date_trunc('month', created_at) "
+                "FROM audit_logs_default ORDER BY 1"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    op.execute("ALTER TABLE audit_logs DETACH PARTITION audit_logs_default")
+    for start in months:
+        _create_partition(start)
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_default")
+    op.execute("DROP TABLE audit_logs_default")
+
+    start = datetime.now(timezone.utc).replace(
+        tzinfo=None, day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    for _ in range(MONTHS_AHEAD + 1):
+        _create_partition(start)
+        start = _next_month(start)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
@@ -0,0 +1,34 @@
+"""Add format to export_pipelines
+
+Revision ID: d7a3f5c1e8b2
+Revises: b4e1c7d9a2f3
+Create Date: 2026-10-18 16:05:12.338104
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3f5c1e8b2"
+down_revision: Union[str, Sequence[str], None] = "b4e1c7d9a2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column("format", sa.String(), nullable=False, server_default="csv"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_pipelines", "format")
@@ -0,0 +1,34 @@
+"""Add compression to export_pipelines
+
+Revision ID: e2c8b6a4d1f7
+Revises: d7a3f5c1e8b2
+Create Date: 2026-10-18 16:41:37.582916
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2c8b6a4d1f7"
+down_revision: Union[str, Sequence[str], None] = "d7a3f5c1e8b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column("compression", sa.String(), nullable=False, server_default="none"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_pipelines", "compression")
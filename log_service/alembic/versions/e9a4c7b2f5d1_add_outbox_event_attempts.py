@@ -0,0 +1,41 @@
+"""Add attempts and available_at to outbox_events
+
+Revision ID: e9a4c7b2f5d1
+Revises: c2f8a5d1e6b4
+Create Date: 2026-10-19 00:41:18.306529
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e9a4c7b2f5d1"
+down_revision: Union[str, Sequence[str], None] = "c2f8a5d1e6b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "outbox_events",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "outbox_events",
+        sa.Column("available_at", sa.DateTime(), nullable=True),
+    )
+    op.execute("UPDATE outbox_events SET available_at = created_at")
+    op.alter_column("outbox_events", "available_at", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("outbox_events", "available_at")
+    op.drop_column("outbox_events", "attempts")
@@ -0,0 +1,46 @@
+"""Add filters and watermark to export_pipelines
+
+Revision ID: f5b9d2e7c3a6
+Revises: e2c8b6a4d1f7
+Create Date: 2026-10-18 17:20:48.116390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b9d2e7c3a6"
+down_revision: Union[str, Sequence[str], None] = "e2c8b6a4d1f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pylint: disable=no-member
+    op.add_column(
+        "export_pipelines",
+        sa.Column("filters", sa.JSON(), nullable=True),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column(
+            "incremental", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+    op.add_column(
+        "export_pipelines",
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pylint: disable=no-member
+    op.drop_column("export_pipelines", "watermark")
+    op.drop_column("export_pipelines", "incremental")
+    op.drop_column("export_pipelines", "filters")
@@ -1,12 +1,25 @@
 """Audit log API"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from typing import Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
 from core.db import get_session
-from core.response import create_detail_response, create_paginated_response
-from infra.sqs import send_to_export_queue, send_to_log_queue
+from core.response import (
+    create_detail_response,
+    create_paginated_response,
+    etag_matches,
+)
+from infra.sqs import (
+    send_batch_to_log_queue_async,
+    send_to_export_queue_async,
+    send_to_log_queue_async,
+)
 from schemas.schemas import (
+    AuditLogBatchGet,
+    AuditLogBatchGetResponse,
     AuditLogBulkCreate,
     AuditLogBulkCreateResponse,
     AuditLogCleanupResponse,
@@ -15,16 +28,19 @@ from schemas.schemas import (
     AuditLogPaginatedResponse,
     AuditLogResponse,
     AuditLogStatsResponse,
+    ExportPipelineCreate,
     ExportPipelineDetailResponse,
 )
-from services.export import create_export_pipeline, get_export_pipeline
-from services.logs import (
-    cleanup_old_logs,
-    create_bulk_logs,
-    create_log_entry,
-    get_log_entry,
+from services.cache import get_log_detail, get_log_details, stats_cache
+from services.export import (
+    cancel_export_pipeline,
+    create_export_pipeline,
+    get_export_pipeline,
 )
+from services.logs import cleanup_old_logs, create_bulk_logs, create_log_entry
 from services.search import (
+    build_log_document,
+    decode_log_cursor,
     delete_old_logs_in_opensearch,
     get_log_stats_opensearch,
     search_logs,
@@ -42,11 +58,12 @@ router = APIRouter(prefix="/logs", tags=["Audit Logs"])
     summary="Cleanup Audit Logs",
     description="Cleanup audit logs",
 )
-def cleanup_logs_api(request: Request, db: Session = Depends(get_session)):
+async def cleanup_logs_api(request: Request, db: AsyncSession = Depends(get_session)):
     """Cleanup logs"""
     tenant_id = get_tenant_id(request)
-    result = cleanup_old_logs(db, tenant_id)
-    delete_old_logs_in_opensearch(tenant_id)
+    result = await db.run_sync(cleanup_old_logs, tenant_id)
+    await delete_old_logs_in_opensearch(tenant_id)
+    stats_cache.invalidate(tenant_id)
     return create_detail_response(result)
 
 
@@ -57,11 +74,25 @@ def cleanup_logs_api(request: Request, db: Session = Depends(get_session)):
     summary="Export Log Data",
     description="Export log data",
 )
-def export_log_data_api(request: Request, db: Session = Depends(get_session)):
+async def export_log_data_api(
+    request: Request,
+    payload: Optional[ExportPipelineCreate] = None,
+    db: AsyncSession = Depends(get_session),
+):
     """Export log data"""
     tenant_id = get_tenant_id(request)
-    pipeline = create_export_pipeline(tenant_id, db)
-    send_to_export_queue(pipeline.id, tenant_id)
+    payload = payload or ExportPipelineCreate()
+    pipeline = await db.run_sync(
+        lambda session: create_export_pipeline(
+            tenant_id,
+            session,
+            payload.format,
+            payload.compression,
+            payload.filters(),
+            payload.incremental,
+        )
+    )
+    await send_to_export_queue_async(pipeline.id, tenant_id)
     return create_detail_response(pipeline)
 
 
@@ -72,22 +103,49 @@ def export_log_data_api(request: Request, db: Session = Depends(get_session)):
     summary="Get Export Pipeline",
     description="Get an export pipeline by ID",
 )
-def export_result_api(
+async def export_result_api(
     pipeline_id: str,
     request: Request,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
 ):
     """Get export pipeline"""
     tenant_id = get_tenant_id(request)
     pipeline_id, error = validate_uuid(pipeline_id)
     if error:
         return HTTPException(status_code=400, detail="Invalid pipeline ID")
-    pipeline = get_export_pipeline(db, tenant_id, pipeline_id)
+    pipeline = await db.run_sync(get_export_pipeline, tenant_id, pipeline_id)
     if not pipeline:
         return HTTPException(status_code=404, detail="Pipeline not found")
     return create_detail_response(pipeline)
 
 
+@router.delete(
+    "/export/{pipeline_id}",
+    status_code=200,
+    response_model=ExportPipelineDetailResponse,
+    summary="Cancel Export Pipeline",
+    description="Cancel a pending or running export pipeline",
+)
+async def cancel_export_api(
+    pipeline_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+):
+    """Cancel export pipeline"""
+    tenant_id = get_tenant_id(request)
+    pipeline_id, error = validate_uuid(pipeline_id)
+    if error:
+        raise HTTPException(status_code=400, detail="Invalid pipeline ID")
+    pipeline = await db.run_sync(get_export_pipeline, tenant_id, pipeline_id)
+    if not pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    if not await db.run_sync(cancel_export_pipeline, pipeline):
+        raise HTTPException(
+            status_code=409, detail=f"Pipeline is already {pipeline.status}"
+        )
+    return create_detail_response(pipeline)
+
+
 @router.get(
     "/stats",
     status_code=200,
@@ -95,10 +153,10 @@ def export_result_api(
     summary="Get Audit Log Stats",
     description="Get audit log stats",
 )
-def get_log_stats_api(request: Request):
+async def get_log_stats_api(request: Request):
     """Get log stats"""
     tenant_id = get_tenant_id(request)
-    stats = get_log_stats_opensearch(tenant_id)
+    stats = await stats_cache.get(tenant_id, get_log_stats_opensearch)
     return create_detail_response(stats)
 
 
@@ -109,10 +167,10 @@ def get_log_stats_api(request: Request):
     summary="Bulk Create Audit Log Entries",
     description="Bulk create audit log entries",
 )
-def bulk_create_logs_api(
+async def bulk_create_logs_api(
     payload: AuditLogBulkCreate,
     request: Request,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
 ):
     """Bulk create logs"""
     tenant_id = get_tenant_id(request)
@@ -120,9 +178,11 @@ def bulk_create_logs_api(
         return HTTPException(
             status_code=400, detail="Bulk create logs is limited to 100 logs"
         )
-    result = create_bulk_logs(db, tenant_id, payload.logs)
-    for log_id in result["log_ids"]:
-        send_to_log_queue(log_id, tenant_id)
+    result = await db.run_sync(create_bulk_logs, tenant_id, payload.logs)
+    if not settings.OUTBOX_ENABLED:
+        result["failed_log_ids"] = await send_batch_to_log_queue_async(
+            result["log_ids"], tenant_id, result["documents"]
+        )
     return create_detail_response(result)
 
 
@@ -134,40 +194,101 @@ def bulk_create_logs_api(
     description="Create a new audit log entry to track user actions",
     response_description="Successfully created audit log entry",
 )
-def create_log_api(
-    log: AuditLogCreate, request: Request, db: Session = Depends(get_session)
+async def create_log_api(
+    log: AuditLogCreate, request: Request, db: AsyncSession = Depends(get_session)
 ):
     """
     Create a new audit log entry.
     """
     tenant_id = get_tenant_id(request)
-    log = create_log_entry(db, tenant_id, log)
-    send_to_log_queue(log.alid, tenant_id)
+    log = await db.run_sync(create_log_entry, tenant_id, log)
+    if not settings.OUTBOX_ENABLED:
+        document = (
+            build_log_document(log) if settings.LOG_MESSAGE_EMBED_DOCUMENT else None
+        )
+        await send_to_log_queue_async(log.alid, tenant_id, document)
     return create_detail_response(log)
 
 
+@router.post(
+    "/batch-get",
+    status_code=200,
+    response_model=AuditLogBatchGetResponse,
+    summary="Get Audit Log Entries",
+    description=(
+        "Get many audit log entries by ID in one call. Items keep the request "
+        "order; IDs that do not exist are flagged and listed in missing."
+    ),
+)
+async def batch_get_logs_api(
+    payload: AuditLogBatchGet,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+):
+    """Get logs by ID"""
+    tenant_id = get_tenant_id(request)
+    if len(payload.ids) > settings.LOG_BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch get is limited to {settings.LOG_BATCH_GET_MAX_IDS} IDs",
+        )
+    log_ids = []
+    invalid_ids = []
+    for raw_id in payload.ids:
+        log_id, error = validate_uuid(raw_id)
+        if error:
+            invalid_ids.append(raw_id)
+        log_ids.append(log_id)
+    if invalid_ids:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Invalid log IDs", "invalid_ids": invalid_ids},
+        )
+
+    found = await get_log_details(db, tenant_id, log_ids)
+    items = [
+        {
+            "id": log_id,
+            "found": log_id in found,
+            "log": found[log_id].data if log_id in found else None,
+        }
+        for log_id in log_ids
+    ]
+    missing = list(dict.fromkeys(item["id"] for item in items if not item["found"]))
+    return create_detail_response({"items": items, "missing": missing})
+
+
 @router.get(
     "/{log_id}",
     status_code=200,
     response_model=AuditLogDetailResponse,
     summary="Get Audit Log Entry",
-    description="Get an audit log entry by ID",
+    description=(
+        "Get an audit log entry by ID. Responses carry a strong ETag; send it "
+        "back in If-None-Match to get a 304 while the entry is unchanged."
+    ),
     response_description="Successfully retrieved audit log entry",
+    responses={304: {"description": "Entry matches If-None-Match"}},
 )
-def get_log_api(
+async def get_log_api(
     log_id: str,
     request: Request,
-    db: Session = Depends(get_session),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_session),
 ):
     """Get a log by ID"""
     log_id, error = validate_uuid(log_id)
     if error:
         return HTTPException(status_code=400, detail="Invalid log ID")
     tenant_id = get_tenant_id(request)
-    log = get_log_entry(db, tenant_id, log_id)
+    log = await get_log_detail(db, tenant_id, log_id)
     if not log:
         return HTTPException(status_code=404, detail="Log not found")
-    return create_detail_response(log)
+    if etag_matches(if_none_match, log.etag):
+        return Response(status_code=304, headers={"ETag": log.etag})
+    response.headers["ETag"] = log.etag
+    return create_detail_response(log.data)
 
 
 @router.get(
@@ -177,7 +298,7 @@ def get_log_api(
     summary="List Audit Log Entries",
     description="List audit log entries with optional filters",
 )
-def list_logs_api(
+async def list_logs_api(
     request: Request,
     action: str = Query(None),
     severity: str = Query(None),
@@ -185,9 +306,22 @@ def list_logs_api(
     search: str = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: str = Query(
+        None,
+        description="Opaque cursor from next_cursor; continues after the previous page",
+    ),
+    pit: bool = Query(
+        False,
+        description="Iterate over a point-in-time snapshot of the index",
+    ),
 ):
     """List logs"""
     tenant_id = get_tenant_id(request)
+    cursor_state = None
+    if cursor:
+        cursor_state, error = decode_log_cursor(cursor, tenant_id)
+        if error:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     filters = {
         "action": action,
         "severity": severity,
@@ -195,11 +329,14 @@ def list_logs_api(
         "search": search,
         "page": page,
         "page_size": page_size,
+        "cursor": cursor_state,
+        "pit": pit,
     }
-    results = search_logs(tenant_id, filters)
+    results = await search_logs(tenant_id, filters)
     return create_paginated_response(
         results["logs"],
         results["total"],
         page,
         page_size,
+        results.get("next_cursor"),
     )
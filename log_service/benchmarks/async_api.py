@@ -0,0 +1,140 @@
+"""Benchmark the async request path against sync handlers on a threadpool
+
+Serves the same log lookup two ways in-process: a sync handler on a sync
+SQLAlchemy session, which FastAPI runs on its threadpool, and an async handler
+on an asyncpg session, which is how the API serves requests. Both engines get
+the same pool size. Requests are fired with a fixed number in flight and
+throughput and latency percentiles are reported for each.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.async_api \
+        --requests 20000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.db import async_database_url
+from services.logs import get_log_entry
+
+
+def _build_app(database_url: str, pool_size: int, max_overflow: int):
+    """App with a sync and an async route for the same lookup"""
+    engine = create_engine(database_url, pool_size=pool_size, max_overflow=max_overflow)
+    async_engine = create_async_engine(
+        async_database_url(database_url),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    session_local = sessionmaker(bind=engine, autoflush=False)
+    async_session_local = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    def get_sync_session():
+        with session_local() as db:
+            yield db
+
+    async def get_async_session():
+        async with async_session_local() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/{tenant_id}/{log_id}")
+    def sync_lookup(
+        tenant_id: str, log_id: str, db: Session = Depends(get_sync_session)
+    ):
+        return {"found": get_log_entry(db, tenant_id, log_id) is not None}
+
+    @app.get("/async/{tenant_id}/{log_id}")
+    async def async_lookup(
+        tenant_id: str, log_id: str, db: AsyncSession = Depends(get_async_session)
+    ):
+        log = await db.run_sync(get_log_entry, tenant_id, log_id)
+        return {"found": log is not None}
+
+    return app, engine, async_engine
+
+
+async def _run(app, path: str, requests: int, concurrency: int) -> tuple:
+    """Fire requests at path and return elapsed seconds and latencies"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with client:
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return elapsed, latencies
+
+
+def _percentile(latencies: list, pct: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * pct))] * 1000
+
+
+def main():
+    """Run the benchmark and print one line per handler type"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    app, engine, async_engine = _build_app(
+        args.database_url, args.pool_size, args.max_overflow
+    )
+    with engine.connect() as connection:
+        row = connection.execute(
+            text("SELECT tenant_id, alid FROM audit_logs LIMIT 1")
+        ).first()
+    if row is None:
+        raise SystemExit("audit_logs is empty, seed it before benchmarking")
+    tenant_id, log_id = row
+
+    async def run_all():
+        print(
+            f"{'handler':<8} {'requests':>9} {'seconds':>8} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for handler in ("sync", "async"):
+            path = f"/{handler}/{tenant_id}/{log_id}"
+            # Warm up the pool and the route before measuring
+            await _run(app, path, args.concurrency, args.concurrency)
+            elapsed, latencies = await _run(app, path, args.requests, args.concurrency)
+            print(
+                f"{handler:<8} {args.requests:>9} {elapsed:>8.2f} "
+                f"{args.requests / elapsed:>8.0f} "
+                f"{_percentile(latencies, 0.5):>8.1f} "
+                f"{_percentile(latencies, 0.99):>8.1f}"
+            )
+        await async_engine.dispose()
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
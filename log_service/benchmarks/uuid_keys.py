@@ -0,0 +1,105 @@
+"""Benchmark random (v4) against time-ordered (v7) audit log keys
+
+Loads the same number of rows into two scratch tables shaped like the
+audit_logs primary key, one keyed by uuid4 and one by uuid7, and reports
+insert throughput and primary key index size for each.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.uuid_keys --rows 20000000
+"""
+
+import argparse
+import io
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+
+from utils.ids import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def _table_name(key: str) -> str:
+    return f"bench_audit_keys_{key}"
+
+
+def _load(raw_connection, key: str, rows: int, batch_size: int) -> float:
+    """COPY rows into the scratch table for key and return elapsed seconds"""
+    generate = GENERATORS[key]
+    table = _table_name(key)
+    elapsed = 0.0
+    with raw_connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(
+            f"CREATE TABLE {table} ("
+            "alid uuid NOT NULL, tenant_id varchar NOT NULL, "
+            "created_at timestamp NOT NULL, PRIMARY KEY (alid, created_at))"
+        )
+        raw_connection.commit()
+
+        loaded = 0
+        while loaded < rows:
+            count = min(batch_size, rows - loaded)
+            created_at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+            buffer = io.StringIO(
+                "".join(
+                    f"{generate()}\ttenant-{(loaded + i) % 100}\t{created_at}\n"
+                    for i in range(count)
+                )
+            )
+            started = time.perf_counter()
+            cursor.copy_expert(
+                f"COPY {table} (alid, tenant_id, created_at) FROM STDIN", buffer
+            )
+            raw_connection.commit()
+            elapsed += time.perf_counter() - started
+            loaded += count
+    return elapsed
+
+
+def _index_size(raw_connection, key: str) -> int:
+    with raw_connection.cursor() as cursor:
+        cursor.execute(f"SELECT pg_relation_size('{_table_name(key)}_pkey')")
+        return cursor.fetchone()[0]
+
+
+def _drop(raw_connection, key: str):
+    with raw_connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {_table_name(key)}")
+    raw_connection.commit()
+
+
+def main():
+    """Run the benchmark and print one line per key type"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the scratch tables afterwards"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    raw_connection = engine.raw_connection()
+    try:
+        print(f"{'key':<6} {'rows':>12} {'seconds':>9} {'rows/s':>10} {'pkey MB':>9}")
+        for key in GENERATORS:
+            elapsed = _load(raw_connection, key, args.rows, args.batch_size)
+            size_mb = _index_size(raw_connection, key) / (1024 * 1024)
+            print(
+                f"{key:<6} {args.rows:>12} {elapsed:>9.1f} "
+                f"{args.rows / elapsed:>10.0f} {size_mb:>9.1f}"
+            )
+            if not args.keep:
+                _drop(raw_connection, key)
+    finally:
+        raw_connection.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
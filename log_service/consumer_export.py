@@ -1,101 +1,359 @@
 """Export consumer"""
 
 import json
+import queue
+import threading
 import time
-
-import boto3
+from datetime import datetime, timezone
 
 from core.config import settings
-from core.db import get_session
+from core.db import SessionLocal
 from core.logging import consumer_log_consumer_logger, setup_logging
-from infra.s3 import upload_to_s3
+from infra.clients import clients
+from infra.s3 import S3MultipartWriter
+from infra.sqs import VisibilityHeartbeat, get_sqs_client, send_to_export_queue
 from models import ExportPipeline
-from services.csv import write_logs_to_csv
+from services.export import (
+    EXPORT_FORMAT_COLUMNS,
+    ExportCancelled,
+    ExportProgress,
+    ExportShardLost,
+    claim_export_shard,
+    complete_export_shard,
+    export_content_headers,
+    export_part_key,
+    finalize_export_pipeline,
+    get_export_shard,
+    get_pending_export_shards,
+    plan_export_shards,
+    release_export_shard,
+    resolve_export_filters,
+    shard_export_filters,
+    write_export,
+)
 from services.logs import get_logs_for_export
 
 setup_logging()
 
-sqs = boto3.client(
-    "sqs",
-    endpoint_url=settings.SQS_ENDPOINT,
-    region_name=settings.AWS_REGION,
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-)
-
 logger = consumer_log_consumer_logger
 
 
+def queue_export_shards(export_pipeline: ExportPipeline, shards: list):
+    """Send one export queue message per shard"""
+    for shard in shards:
+        send_to_export_queue(
+            export_pipeline.id, export_pipeline.tenant_id, shard=shard.shard_index
+        )
+
+
+def plan_export(db, export_pipeline: ExportPipeline):
+    """Split a pending export into shards and queue one message per shard
+
+    A planning message redelivered after the pipeline was planned queues
+    its still pending shards again, as the previous attempt may have died
+    before sending them.
+    """
+    export_id = export_pipeline.id
+    if export_pipeline.status == "IN_PROGRESS":
+        shards = get_pending_export_shards(db, export_id)
+        logger.info(
+            "Export pipeline already planned: export_id:%s, pending shards:%s",
+            export_id,
+            len(shards),
+        )
+        queue_export_shards(export_pipeline, shards)
+        return
+    if export_pipeline.status != "PENDING":
+        logger.info(
+            "Export pipeline not pending: export_id:%s, status:%s",
+            export_id,
+            export_pipeline.status,
+        )
+        return
+    try:
+        export_pipeline.status = "IN_PROGRESS"
+        export_pipeline.started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        filters = resolve_export_filters(db, export_pipeline)
+        shards = plan_export_shards(db, export_pipeline, filters)
+        db.commit()
+        logger.info(
+            "Export pipeline planned: export_id:%s, shards:%s, filters:%s",
+            export_id,
+            len(shards),
+            filters,
+        )
+        queue_export_shards(export_pipeline, shards)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error: %s", e)
+        fail_export(db, export_pipeline)
+
+
+def fail_export(db, export_pipeline: ExportPipeline, shard=None, attempt=None):
+    """Roll back and mark an export FAILED unless it was cancelled meanwhile
+
+    A shard attempt that lost its claim leaves the export to the attempt
+    that took it over.
+    """
+    db.rollback()
+    if shard is not None and not release_export_shard(db, shard, attempt, "FAILED"):
+        logger.info(
+            "Export shard reclaimed, not failing export: export_id:%s, shard:%s",
+            export_pipeline.id,
+            shard.shard_index,
+        )
+        db.rollback()
+        return
+    if export_pipeline.status in ("PENDING", "IN_PROGRESS"):
+        export_pipeline.status = "FAILED"
+        export_pipeline.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.commit()
+
+
+def export_shard(db, export_pipeline: ExportPipeline, shard_index: int):
+    """Stream one shard of an export into its own S3 part file
+
+    The shard is claimed first, so of several copies of its message only
+    one exports it. Progress is published while the shard streams; a
+    cancelled or failed pipeline stops the shard and aborts its upload. The
+    worker finishing the last shard writes the manifest and marks the
+    pipeline DONE.
+    """
+    export_id = export_pipeline.id
+    shard = get_export_shard(db, export_id, shard_index)
+    if shard is None:
+        logger.error(
+            "Export shard not found: export_id:%s, shard:%s", export_id, shard_index
+        )
+        return
+    attempt = None
+    if export_pipeline.status == "IN_PROGRESS":
+        attempt = claim_export_shard(db, export_pipeline, shard)
+    if attempt is None:
+        logger.info(
+            "Skipping export shard: export_id:%s, shard:%s, status:%s",
+            export_id,
+            shard_index,
+            shard.status,
+        )
+        return
+
+    try:
+        # Stream logs straight into an S3 multipart upload
+        export_format = export_pipeline.format
+        compression = export_pipeline.compression
+        filters = shard_export_filters(export_pipeline, shard)
+        logger.info(
+            "Streaming logs to S3: export_id:%s, shard:%s, format:%s, "
+            "compression:%s, filters:%s",
+            export_id,
+            shard_index,
+            export_format,
+            compression,
+            filters,
+        )
+        logs = get_logs_for_export(
+            db,
+            export_pipeline.tenant_id,
+            columns=EXPORT_FORMAT_COLUMNS[export_format],
+            filters=filters,
+        )
+        with (
+            SessionLocal() as progress_db,
+            S3MultipartWriter(
+                settings.EXPORT_S3_BUCKET,
+                export_part_key(export_pipeline, shard_index),
+                **export_content_headers(export_format, compression),
+            ) as upload,
+        ):
+            progress = ExportProgress(progress_db, export_id, shard.id, attempt, upload)
+            count = write_export(
+                progress.track(logs), upload, export_format, compression
+            )
+            # Last chance to cancel before the upload is completed
+            progress.report()
+        logger.info(
+            "Streamed logs to S3: export_id:%s, shard:%s, count:%s, bytes:%s",
+            export_id,
+            shard_index,
+            count,
+            upload.bytes_written,
+        )
+
+        # Record the part and count it towards the pipeline in one commit
+        if complete_export_shard(
+            db,
+            export_pipeline,
+            shard,
+            attempt,
+            file_key=upload.file_key,
+            row_count=count,
+            bytes=upload.bytes_written,
+            sha256=upload.sha256,
+        ):
+            db.refresh(export_pipeline)
+            if export_pipeline.status == "IN_PROGRESS" and finalize_export_pipeline(
+                db, export_pipeline
+            ):
+                logger.info("Export pipeline updated: export_id:%s", export_id)
+    except ExportShardLost as e:
+        logger.info(
+            "Export shard reclaimed: export_id:%s, shard:%s, reason:%s",
+            export_id,
+            shard_index,
+            e,
+        )
+        db.rollback()
+    except ExportCancelled as e:
+        logger.info(
+            "Export shard stopped: export_id:%s, shard:%s, reason:%s",
+            export_id,
+            shard_index,
+            e,
+        )
+        db.rollback()
+        release_export_shard(db, shard, attempt, "CANCELLED")
+        db.commit()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error: %s", e)
+        fail_export(db, export_pipeline, shard, attempt)
+
+
 def handle_message(msg: dict):
-    """Handle message"""
+    """Handle message
+
+    Messages without a shard plan an export, messages with one export that
+    shard.
+    """
     export_id = msg["export_id"]
     tenant_id = msg["tenant_id"]
 
-    db = next(get_session())
-    export_pipeline = (
-        db.query(ExportPipeline)
-        .filter_by(
-            id=export_id,
-            tenant_id=tenant_id,
+    with SessionLocal() as db:
+        export_pipeline = (
+            db.query(ExportPipeline)
+            .filter_by(
+                id=export_id,
+                tenant_id=tenant_id,
+            )
+            .first()
         )
-        .first()
-    )
-    if export_pipeline:
+        if not export_pipeline:
+            logger.error("Export pipeline not found: export_id:%s", export_id)
+            return
+        logger.info("Export pipeline found: export_id:%s", export_id)
+        if msg.get("shard") is None:
+            plan_export(db, export_pipeline)
+        else:
+            export_shard(db, export_pipeline, msg["shard"])
+
+
+def receive_loop(
+    inbox: queue.Queue,
+    heartbeat: VisibilityHeartbeat,
+    stop,
+    idle: threading.Semaphore,
+):
+    """Long-poll the export queue and hand messages to the workers
+
+    A message is only received once a worker is idle, so a busy consumer
+    leaves shards on the queue for other consumers instead of holding them
+    invisible until its workers free up.
+    """
+    sqs = get_sqs_client()
+    while not stop.is_set():
+        if not idle.acquire(timeout=1.0):
+            continue
         try:
-            logger.info("Export pipeline found: export_id:%s", export_id)
-            export_pipeline.status = "IN_PROGRESS"
-            db.commit()
-            db.refresh(export_pipeline)
+            response = sqs.receive_message(
+                QueueUrl=settings.SQS_EXPORT_QUEUE_URL,
+                MaxNumberOfMessages=1,
+                WaitTimeSeconds=10,
+                VisibilityTimeout=settings.EXPORT_CONSUMER_VISIBILITY_TIMEOUT,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error: %s", e)
+            idle.release()
+            time.sleep(1)
+            continue
+
+        messages = response.get("Messages", [])
+        if not messages:
+            idle.release()
+        for message in messages:
+            heartbeat.track([message])
+            inbox.put(message)
 
-            # Get logs and write to CSV
-            logger.info("Getting logs for export: export_id:%s", export_id)
-            logs = get_logs_for_export(db, tenant_id)
-            logger.info("Writing logs to CSV: export_id:%s", export_id)
-            file_path = write_logs_to_csv(logs, tenant_id)
 
-            # Upload to S3
-            logger.info("Uploading to S3: export_id:%s", export_id)
-            s3_url = upload_to_s3(file_path, settings.EXPORT_S3_BUCKET)
+def worker_loop(
+    inbox: queue.Queue,
+    heartbeat: VisibilityHeartbeat,
+    stop,
+    idle: threading.Semaphore,
+):
+    """Handle received export messages and delete them"""
+    sqs = get_sqs_client()
+    while not stop.is_set():
+        try:
+            message = inbox.get(timeout=1.0)
+        except queue.Empty:
+            continue
+        try:
+            body = json.loads(message["Body"])
+            logger.info("Processing message: body:%s", body)
+            handle_message(body)
 
-            # Update export pipeline
-            export_pipeline.status = "DONE"
-            export_pipeline.file_url = s3_url
-            logger.info("Export pipeline updated: export_id:%s", export_id)
+            # Delete after success
+            sqs.delete_message(
+                QueueUrl=settings.SQS_EXPORT_QUEUE_URL,
+                ReceiptHandle=message["ReceiptHandle"],
+            )
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error: %s", e)
-            export_pipeline.status = "FAILED"
         finally:
-            db.commit()
-            db.refresh(export_pipeline)
-    else:
-        logger.error("Export pipeline not found: export_id:%s", export_id)
+            heartbeat.release([message])
+            idle.release()
 
 
 def run_consumer():
     """Run SQS export consumer"""
-    logger.info("Starting SQS export consumer...")
-    while True:
-        response = sqs.receive_message(
-            QueueUrl=settings.SQS_EXPORT_QUEUE_URL,
-            MaxNumberOfMessages=10,
-            WaitTimeSeconds=10,
+    logger.info(
+        "Starting SQS export consumer: workers:%s",
+        settings.EXPORT_CONSUMER_WORKERS,
+    )
+    inbox = queue.Queue()
+    stop = threading.Event()
+    # One permit per worker not busy with a message
+    idle = threading.Semaphore(settings.EXPORT_CONSUMER_WORKERS)
+    heartbeat = VisibilityHeartbeat(
+        settings.SQS_EXPORT_QUEUE_URL,
+        settings.EXPORT_CONSUMER_VISIBILITY_TIMEOUT,
+    )
+    threads = [
+        threading.Thread(
+            target=receive_loop,
+            args=(inbox, heartbeat, stop, idle),
+            name="export-receiver",
+            daemon=True,
         )
+    ] + [
+        threading.Thread(
+            target=worker_loop,
+            args=(inbox, heartbeat, stop, idle),
+            name=f"export-worker-{index}",
+            daemon=True,
+        )
+        for index in range(settings.EXPORT_CONSUMER_WORKERS)
+    ]
 
-        messages = response.get("Messages", [])
-        for message in messages:
-            try:
-                body = json.loads(message["Body"])
-                logger.info("Processing message: body:%s", body)
-                handle_message(body)
-
-                # Delete after success
-                sqs.delete_message(
-                    QueueUrl=settings.SQS_EXPORT_QUEUE_URL,
-                    ReceiptHandle=message["ReceiptHandle"],
-                )
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Error: %s", e)
-        time.sleep(1)
+    heartbeat.start()
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    finally:
+        stop.set()
+        heartbeat.stop()
+        clients.close()
 
 
 if __name__ == "__main__":
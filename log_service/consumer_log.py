@@ -1,75 +1,265 @@
 """Log consumer"""
 
 import json
+import queue
+import threading
 import time
-
-import boto3
+from collections import defaultdict
 
 from core.config import settings
-from core.db import get_session
+from core.db import SessionLocal
 from core.logging import consumer_log_consumer_logger, setup_logging
-from models import AuditLog
-from services.search import index_log_to_opensearch
+from infra.clients import clients
+from infra.sqs import (
+    SQS_MAX_BATCH_SIZE,
+    VisibilityHeartbeat,
+    decode_log_document,
+    get_sqs_client,
+)
+from services.logs import get_log_entries
+from services.search import (
+    build_log_document,
+    bulk_index_documents,
+    install_log_index_template,
+)
 
 setup_logging()
 
-sqs = boto3.client(
-    "sqs",
-    endpoint_url=settings.SQS_ENDPOINT,
-    region_name=settings.AWS_REGION,
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-)
-
 logger = consumer_log_consumer_logger
 
 
-def handle_message(msg: dict):
-    """Handle message"""
-    log_id = msg["log_id"]
-    tenant_id = msg["tenant_id"]
+def resolve_documents(messages: list, heartbeat: VisibilityHeartbeat) -> list:
+    """Resolve SQS messages into (message, document) pairs
+
+    Self-contained messages carry the document and need no database read.
+    ID-only messages are loaded with one query per tenant. Messages whose
+    log no longer exists are paired with None so they can be dropped.
+    Malformed messages are released from the heartbeat and left on the
+    queue, so the redrive policy moves them to the DLQ.
+    """
+    resolved = []
+    missing = defaultdict(list)
+    for message in messages:
+        try:
+            body = json.loads(message["Body"])
+            document = decode_log_document(body)
+            if document is None:
+                ref = (message, body["log_id"])
+                missing[body["tenant_id"]].append(ref)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(
+                "Malformed message: message_id:%s, error:%s",
+                message.get("MessageId"),
+                e,
+            )
+            heartbeat.release([message])
+            continue
+        if document is not None:
+            resolved.append((message, document))
+
+    if missing:
+        with SessionLocal() as db:
+            for tenant_id, refs in missing.items():
+                logs = get_log_entries(db, tenant_id, [log_id for _, log_id in refs])
+                documents = {str(log.alid): build_log_document(log) for log in logs}
+                for message, log_id in refs:
+                    if str(log_id) not in documents:
+                        logger.error("Log not found: log_id:%s", log_id)
+                    resolved.append((message, documents.get(str(log_id))))
+    return resolved
+
+
+def delete_messages(messages: list):
+    """Delete processed messages with DeleteMessageBatch
+
+    Messages that could not be deleted are redelivered once their
+    visibility timeout expires; the consumer indexes by ID, so that is safe.
+    """
+    sqs = get_sqs_client()
+    for start in range(0, len(messages), SQS_MAX_BATCH_SIZE):
+        entries = [
+            {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+            for index, message in enumerate(
+                messages[start : start + SQS_MAX_BATCH_SIZE]
+            )
+        ]
+        try:
+            response = sqs.delete_message_batch(
+                QueueUrl=settings.SQS_LOG_QUEUE_URL,
+                Entries=entries,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error deleting messages: %s", e)
+            continue
+        for failure in response.get("Failed", []):
+            logger.error("Error deleting message: %s", failure)
 
-    db = next(get_session())
-    log = (
-        db.query(AuditLog)
-        .filter_by(
-            alid=log_id,
-            tenant_id=tenant_id,
-        )
-        .first()
+
+def flush(buffer: list):
+    """Bulk index buffered documents and delete their messages
+
+    Messages whose document failed to index are left on the queue and are
+    redelivered once their visibility timeout expires.
+    """
+    documents = [document for _, document in buffer if document is not None]
+    logger.info("Bulk indexing logs: count:%s", len(documents))
+    try:
+        failed = set(bulk_index_documents(documents))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error: %s", e)
+        return
+    if failed:
+        logger.error("Failed to index logs: log_ids:%s", sorted(failed))
+    delete_messages(
+        [
+            message
+            for message, document in buffer
+            if document is None or document["id"] not in failed
+        ]
     )
-    if log:
-        logger.info("Indexing log: log_id:%s", log_id)
-        index_log_to_opensearch(log)
-    else:
-        logger.error("Log not found: log_id:%s", log_id)
 
 
-def run_consumer():
-    """Run SQS log consumer"""
-    logger.info("Starting SQS log consumer...")
-    while True:
-        response = sqs.receive_message(
-            QueueUrl=settings.SQS_LOG_QUEUE_URL,
-            MaxNumberOfMessages=10,
-            WaitTimeSeconds=10,
-        )
+def flush_and_release(buffer: list, heartbeat: VisibilityHeartbeat):
+    """Flush a buffer and stop extending its messages whatever happens
+
+    Released messages that were not deleted become visible again, so a
+    failed flush is retried instead of holding them forever.
+    """
+    try:
+        flush(buffer)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error: %s", e)
+    finally:
+        heartbeat.release([message for message, _ in buffer])
+
+
+def receive_loop(inbox: queue.Queue, heartbeat: VisibilityHeartbeat, stop):
+    """Long-poll the log queue and hand batches to the workers
+
+    The bounded inbox provides prefetch and back pressure: the receiver
+    blocks once LOG_CONSUMER_PREFETCH batches are waiting.
+    """
+    sqs = get_sqs_client()
+    while not stop.is_set():
+        try:
+            response = sqs.receive_message(
+                QueueUrl=settings.SQS_LOG_QUEUE_URL,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=10,
+                VisibilityTimeout=settings.LOG_CONSUMER_VISIBILITY_TIMEOUT,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error: %s", e)
+            time.sleep(1)
+            continue
 
         messages = response.get("Messages", [])
-        for message in messages:
-            try:
-                body = json.loads(message["Body"])
-                logger.info("Processing message: body:%s", body)
-                handle_message(body)
-
-                # Delete after success
-                sqs.delete_message(
-                    QueueUrl=settings.SQS_LOG_QUEUE_URL,
-                    ReceiptHandle=message["ReceiptHandle"],
+        if messages:
+            heartbeat.track(messages)
+            inbox.put(messages)
+
+
+def worker_loop(inbox: queue.Queue, heartbeat: VisibilityHeartbeat, stop):
+    """Resolve received messages and bulk index them
+
+    Whatever stops the loop, the buffer is flushed and its messages are
+    released from the heartbeat.
+    """
+    buffer = []
+    buffer_started = None
+    try:
+        while not stop.is_set():
+            timeout = 1.0
+            if buffer:
+                timeout = max(
+                    0,
+                    settings.LOG_CONSUMER_BULK_MAX_SECONDS
+                    - (time.monotonic() - buffer_started),
                 )
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Error: %s", e)
-        time.sleep(1)
+            try:
+                messages = inbox.get(timeout=timeout)
+            except queue.Empty:
+                messages = []
+
+            if messages:
+                if not buffer:
+                    buffer_started = time.monotonic()
+                try:
+                    buffer.extend(resolve_documents(messages, heartbeat))
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Error: %s", e)
+                    heartbeat.release(messages)
+
+            if buffer and (
+                len(buffer) >= settings.LOG_CONSUMER_BULK_SIZE
+                or time.monotonic() - buffer_started
+                >= settings.LOG_CONSUMER_BULK_MAX_SECONDS
+            ):
+                # Swapped out first so a failed flush is not released twice
+                flushing, buffer = buffer, []
+                flush_and_release(flushing, heartbeat)
+    finally:
+        if buffer:
+            flush_and_release(buffer, heartbeat)
+
+
+def start_thread(target, args: tuple, name: str) -> threading.Thread:
+    """Start a daemon thread"""
+    thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def supervise(threads: list, specs: list, stop):
+    """Restart any of threads that died until stop is set
+
+    threads[i] was started from specs[i], a (target, args, name) tuple, and
+    is replaced in place when restarted.
+    """
+    while not stop.wait(1):
+        for index, thread in enumerate(threads):
+            if not thread.is_alive():
+                logger.error("Thread died, restarting: name:%s", thread.name)
+                threads[index] = start_thread(*specs[index])
+
+
+def run_consumer():
+    """Run SQS log consumer"""
+    logger.info(
+        "Starting SQS log consumer: workers:%s, receivers:%s",
+        settings.LOG_CONSUMER_WORKERS,
+        settings.LOG_CONSUMER_RECEIVERS,
+    )
+    try:
+        install_log_index_template()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error installing index template: %s", e)
+
+    inbox = queue.Queue(maxsize=settings.LOG_CONSUMER_PREFETCH)
+    stop = threading.Event()
+    heartbeat = VisibilityHeartbeat(
+        settings.SQS_LOG_QUEUE_URL,
+        settings.LOG_CONSUMER_VISIBILITY_TIMEOUT,
+    )
+    specs = [
+        (receive_loop, (inbox, heartbeat, stop), f"log-receiver-{index}")
+        for index in range(settings.LOG_CONSUMER_RECEIVERS)
+    ] + [
+        (worker_loop, (inbox, heartbeat, stop), f"log-worker-{index}")
+        for index in range(settings.LOG_CONSUMER_WORKERS)
+    ]
+
+    heartbeat.start()
+    threads = [start_thread(*spec) for spec in specs]
+    try:
+        supervise(threads, specs, stop)
+    finally:
+        stop.set()
+        heartbeat.stop()
+        # Let workers flush what they already buffered before closing clients
+        for thread in threads[settings.LOG_CONSUMER_RECEIVERS :]:
+            thread.join(timeout=settings.LOG_CONSUMER_BULK_MAX_SECONDS + 5)
+        clients.close()
 
 
 if __name__ == "__main__":
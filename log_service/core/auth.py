@@ -1,32 +1,88 @@
 """Auth middleware"""
 
+import hashlib
+import time
+from typing import Optional
+
 import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from core.config import settings
 from core.logging import log_service_logger
+from infra.cache import LRUCache
 
 logger = log_service_logger
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Auth middleware"""
-
-    TOKEN_PREFIX = "Bearer "
-
-    async def dispatch(self, request, call_next):
-        """Dispatch request"""
-        token = request.headers.get("Authorization")
-        if token and token.startswith(self.TOKEN_PREFIX):
-            token = token.removeprefix(self.TOKEN_PREFIX)
-            try:
-                token_data = jwt.decode(
-                    token,
-                    settings.JWT_SECRET,
-                    algorithms=settings.JWT_ALGORITHM,
-                )
-                request.state.user = token_data
-            except jwt.PyJWTError as e:
-                logger.error("JWT error: %s", e)
-                request.state.user = {}
-        return await call_next(request)
+class TokenCache(LRUCache):
+    """Bounded LRU cache of verified JWT payloads
+
+    Entries are keyed by the SHA-256 of the token, so raw bearer tokens are
+    not kept around, and expire at the token's exp claim or after the cache
+    ttl, whichever comes first. Only successfully verified tokens are cached.
+    """
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached payload of token, or None"""
+        payload = super().get(self._key(token))
+        # Callers get their own copy to modify
+        return dict(payload) if payload is not None else None
+
+    def put(self, token: str, payload: dict):
+        """Cache a verified payload until its exp"""
+        ttl = self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            ttl = min(ttl, payload["exp"] - time.time())
+        super().put(self._key(token), payload, ttl)
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_SIZE,
+    settings.AUTH_TOKEN_CACHE_MAX_AGE_SECONDS,
+)
+
+
+class AuthMiddleware:
+    """Auth middleware
+
+    A plain ASGI middleware: it reads the Authorization header straight from
+    the scope and stores the verified payload in the request state, without
+    the extra task and body streaming BaseHTTPMiddleware adds per request.
+    """
+
+    TOKEN_PREFIX = b"Bearer "
+
+    def __init__(self, app: ASGIApp, cache: TokenCache = None):
+        self.app = app
+        self.cache = cache or token_cache
+
+    def verify(self, token: str) -> dict:
+        """Payload of a verified token, or {} if it does not verify"""
+        payload = self.cache.get(token)
+        if payload is not None:
+            return payload
+        try:
+            payload = jwt.decode(
+                token,
+                settings.JWT_SECRET,
+                algorithms=settings.JWT_ALGORITHM,
+            )
+        except jwt.PyJWTError as e:
+            logger.error("JWT error: %s", e)
+            return {}
+        self.cache.put(token, payload)
+        return payload
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    if value.startswith(self.TOKEN_PREFIX):
+                        token = value[len(self.TOKEN_PREFIX) :].decode("latin-1")
+                        scope.setdefault("state", {})["user"] = self.verify(token)
+                    break
+        await self.app(scope, receive, send)
@@ -1,6 +1,7 @@
 """Configuration"""
 
-from typing import Optional
+from typing import Literal, Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -15,9 +16,29 @@ class Settings(BaseSettings):
     TENANT_ID: str = Field("1", env="TENANT_ID")
 
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    DB_POOL_SIZE: int = Field(20, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
 
     JWT_SECRET: str = Field(..., env="JWT_SECRET")
     JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
+    # Signs list pagination cursors; JWT_SECRET is used when unset
+    CURSOR_SECRET: Optional[str] = Field(None, env="CURSOR_SECRET")
+    AUTH_TOKEN_CACHE_SIZE: int = Field(10000, env="AUTH_TOKEN_CACHE_SIZE")
+    AUTH_TOKEN_CACHE_MAX_AGE_SECONDS: int = Field(
+        300,
+        env="AUTH_TOKEN_CACHE_MAX_AGE_SECONDS",
+    )
+
+    # Read-through cache of GET /logs/{log_id}; audit logs are immutable, the
+    # TTL only bounds how long a log deleted by retention can still be served
+    LOG_CACHE_SIZE: int = Field(10000, env="LOG_CACHE_SIZE")
+    LOG_CACHE_TTL_SECONDS: int = Field(3600, env="LOG_CACHE_TTL_SECONDS")
+    LOG_BATCH_GET_MAX_IDS: int = Field(100, env="LOG_BATCH_GET_MAX_IDS")
+
+    # GET /logs/stats results are fresh for the TTL, then served stale for up
+    # to STATS_CACHE_STALE_SECONDS more while one request refreshes them
+    STATS_CACHE_TTL_SECONDS: int = Field(30, env="STATS_CACHE_TTL_SECONDS")
+    STATS_CACHE_STALE_SECONDS: int = Field(300, env="STATS_CACHE_STALE_SECONDS")
 
     AWS_ENDPOINT_URL: Optional[str] = Field(
         "http://localhost:4566",
@@ -36,6 +57,66 @@ class Settings(BaseSettings):
     LOG_QUEUE_NAME: str = Field("log-queue", env="LOG_QUEUE_NAME")
     EXPORT_QUEUE_NAME: str = Field("export-queue", env="EXPORT_QUEUE_NAME")
     EXPORT_S3_BUCKET: str = Field("logs-export", env="EXPORT_S3_BUCKET")
+    EXPORT_CHUNK_SIZE: int = Field(1000, env="EXPORT_CHUNK_SIZE")
+    EXPORT_PART_SIZE: int = Field(8 * 1024 * 1024, env="EXPORT_PART_SIZE")
+    EXPORT_MAX_SHARDS: int = Field(16, env="EXPORT_MAX_SHARDS")
+    EXPORT_SHARD_MIN_ROWS: int = Field(1000000, env="EXPORT_SHARD_MIN_ROWS")
+    EXPORT_CONSUMER_WORKERS: int = Field(4, env="EXPORT_CONSUMER_WORKERS")
+    EXPORT_CONSUMER_VISIBILITY_TIMEOUT: int = Field(
+        300,
+        env="EXPORT_CONSUMER_VISIBILITY_TIMEOUT",
+    )
+    EXPORT_PROGRESS_INTERVAL_SECONDS: int = Field(
+        5,
+        env="EXPORT_PROGRESS_INTERVAL_SECONDS",
+    )
+    EXPORT_SHARD_LEASE_SECONDS: int = Field(
+        120,
+        env="EXPORT_SHARD_LEASE_SECONDS",
+    )
+    EXPORT_WATERMARK_LAG_SECONDS: int = Field(
+        60,
+        env="EXPORT_WATERMARK_LAG_SECONDS",
+    )
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = Field(
+        50000,
+        env="EXPORT_PARQUET_ROW_GROUP_SIZE",
+    )
+
+    AUDIT_LOG_RETENTION_DAYS: int = Field(90, env="AUDIT_LOG_RETENTION_DAYS")
+    AUDIT_LOG_PARTITIONS_AHEAD: int = Field(3, env="AUDIT_LOG_PARTITIONS_AHEAD")
+    AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS: int = Field(
+        3600,
+        env="AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS",
+    )
+
+    LOG_MESSAGE_EMBED_DOCUMENT: bool = Field(
+        False,
+        env="LOG_MESSAGE_EMBED_DOCUMENT",
+    )
+    LOG_MESSAGE_COMPRESS_BYTES: int = Field(
+        8 * 1024,
+        env="LOG_MESSAGE_COMPRESS_BYTES",
+    )
+
+    LOG_CONSUMER_WORKERS: int = Field(4, env="LOG_CONSUMER_WORKERS")
+    LOG_CONSUMER_RECEIVERS: int = Field(1, env="LOG_CONSUMER_RECEIVERS")
+    LOG_CONSUMER_PREFETCH: int = Field(8, env="LOG_CONSUMER_PREFETCH")
+    LOG_CONSUMER_VISIBILITY_TIMEOUT: int = Field(
+        60,
+        env="LOG_CONSUMER_VISIBILITY_TIMEOUT",
+    )
+    LOG_CONSUMER_BULK_SIZE: int = Field(500, env="LOG_CONSUMER_BULK_SIZE")
+    LOG_CONSUMER_BULK_MAX_SECONDS: float = Field(
+        5.0,
+        env="LOG_CONSUMER_BULK_MAX_SECONDS",
+    )
+
+    OUTBOX_ENABLED: bool = Field(True, env="OUTBOX_ENABLED")
+    OUTBOX_RELAY_BATCH_SIZE: int = Field(500, env="OUTBOX_RELAY_BATCH_SIZE")
+    OUTBOX_RELAY_IDLE_SECONDS: float = Field(1.0, env="OUTBOX_RELAY_IDLE_SECONDS")
+    OUTBOX_MAX_ATTEMPTS: int = Field(15, env="OUTBOX_MAX_ATTEMPTS")
+    OUTBOX_RETRY_BASE_SECONDS: float = Field(1.0, env="OUTBOX_RETRY_BASE_SECONDS")
 
     OPENSEARCH_HOST: str = Field(
         "http://localhost:9200",
@@ -44,6 +125,19 @@ class Settings(BaseSettings):
     OPENSEARCH_PORT: int = Field(9200, env="OPENSEARCH_PORT")
     OPENSEARCH_USER: str = Field("admin", env="OPENSEARCH_USER")
     OPENSEARCH_PASS: str = Field("admin", env="OPENSEARCH_PASS")
+    OPENSEARCH_INDEX_PERIOD: Literal["daily", "monthly"] = Field(
+        "monthly",
+        env="OPENSEARCH_INDEX_PERIOD",
+    )
+    OPENSEARCH_INDEX_SHARDS: int = Field(1, env="OPENSEARCH_INDEX_SHARDS")
+    OPENSEARCH_INDEX_REPLICAS: int = Field(1, env="OPENSEARCH_INDEX_REPLICAS")
+    OPENSEARCH_REFRESH_INTERVAL: str = Field(
+        "5s",
+        env="OPENSEARCH_REFRESH_INTERVAL",
+    )
+    OPENSEARCH_POOL_MAXSIZE: int = Field(25, env="OPENSEARCH_POOL_MAXSIZE")
+
+    AWS_MAX_POOL_CONNECTIONS: int = Field(50, env="AWS_MAX_POOL_CONNECTIONS")
 
     class Config:
         """Config"""
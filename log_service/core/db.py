@@ -3,19 +3,45 @@
 from typing import Any
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from core.config import settings
 
+# Workers and scripts use the synchronous engine
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str):
+    """DATABASE_URL with the asyncpg driver"""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# The API serves requests on the event loop with the asyncpg engine.
+# Objects stay loaded after commit so responses can be built without I/O.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
 # Dependency for FastAPI
-def get_session() -> Any:
-    """Get a database session"""
-    db = SessionLocal()
-    try:
+async def get_session() -> Any:
+    """Get an async database session
+
+    Services are plain synchronous functions shared with the workers; the
+    API runs them on this session's connection with
+    ``await db.run_sync(service, *args)``, which does not block the event
+    loop or take a threadpool slot.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
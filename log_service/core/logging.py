@@ -34,5 +34,9 @@ def get_logger(name: str):
 
 consumer_log_consumer_logger = get_logger("consumer.log_consumer")
 log_service_logger = get_logger("log_service")
+outbox_relay_logger = get_logger("relay.outbox")
+partition_maintenance_logger = get_logger("maintenance.partitions")
 sqs_logger = get_logger("infra.sqs")
+clients_logger = get_logger("infra.clients")
 s3_logger = get_logger("infra.s3")
+cache_logger = get_logger("infra.cache")
@@ -1,6 +1,6 @@
 """Pagination"""
 
-from typing import List, TypeVar
+from typing import List, Optional, TypeVar
 
 from schemas.base import DetailResponse, PaginatedResponse
 
@@ -8,7 +8,11 @@ T = TypeVar("T")
 
 
 def create_paginated_response(
-    items: List[T], total: int, page: int, size: int
+    items: List[T],
+    total: int,
+    page: int,
+    size: int,
+    next_cursor: Optional[str] = None,
 ) -> PaginatedResponse[T]:
     """Create a paginated response"""
 
@@ -17,9 +21,26 @@ def create_paginated_response(
         total=total,
         page=page,
         page_size=size,
+        next_cursor=next_cursor,
     )
 
 
 def create_detail_response(data: T) -> DetailResponse[T]:
     """Create a detail response"""
     return DetailResponse(data=data)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,86 @@
+"""Caches"""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from core.logging import cache_logger
+
+logger = cache_logger
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with a per-entry TTL
+
+    Meant for the event loop thread, so it takes no locks. A max_size of 0
+    disables it.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value of key, or None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache value under key for ttl seconds, the cache's ttl by default"""
+        ttl = self.ttl if ttl is None else ttl
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Size and hit/miss counters of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """Shared cache backend interface
+
+    Implementations wrap a cache every API instance can reach, e.g. Redis or
+    Memcached, and store opaque bytes under string keys. No implementation
+    ships with the service; assign one to services.cache.log_cache.shared at
+    startup to share cached logs between instances.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Value stored under key, or None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        """Store value under key for ttl seconds"""
+
+    async def close(self):
+        """Release connections held by the backend"""
@@ -0,0 +1,114 @@
+"""Shared infrastructure clients"""
+
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+from core.logging import clients_logger
+
+logger = clients_logger
+
+
+def _client_pools(client: Any) -> list:
+    """Return the urllib3 connection pools behind a client"""
+    transport = getattr(client, "transport", None)
+    if transport is not None:
+        # opensearch-py: one urllib3 pool per configured host
+        return [
+            connection.pool
+            for connection in transport.connection_pool.connections
+            if getattr(connection, "pool", None) is not None
+        ]
+    endpoint = getattr(client, "_endpoint", None)
+    if endpoint is not None:
+        # boto3: one urllib3 pool per endpoint host; aiobotocore has none
+        manager = getattr(endpoint.http_session, "_manager", None)
+        if manager is None:
+            return []
+        return [manager.pools[key] for key in manager.pools.keys()]
+    return []
+
+
+def _pool_stats(client: Any) -> dict:
+    """Summarize connection pool utilization for a client"""
+    stats = {"pools": 0, "max_size": 0, "in_use": 0, "created": 0, "requests": 0}
+    for pool in _client_pools(client):
+        stats["pools"] += 1
+        stats["created"] += pool.num_connections
+        stats["requests"] += pool.num_requests
+        if pool.pool is not None:
+            stats["max_size"] += pool.pool.maxsize
+            stats["in_use"] += pool.pool.maxsize - pool.pool.qsize()
+    return stats
+
+
+class ClientRegistry:
+    """Process-wide registry of infrastructure clients
+
+    Clients are created once on first use and shared across threads; the
+    boto3 and opensearch-py clients are thread safe. The API builds them at
+    startup and closes them on shutdown, consumers do the same around their
+    polling loop. Async clients belong to the event loop that created them
+    and are closed with aclose().
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get a client by name, creating it with factory on first use"""
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    logger.info("Creating client: name:%s", name)
+                    client = factory()
+                    self._clients[name] = client
+        return client
+
+    async def aget(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Get an async client by name, awaiting factory on first use"""
+        client = self._clients.get(name)
+        if client is None:
+            logger.info("Creating client: name:%s", name)
+            created = await factory()
+            with self._lock:
+                client = self._clients.setdefault(name, created)
+            if client is not created:
+                # Another task created it while the factory was awaited
+                await created.close()
+        return client
+
+    def stats(self) -> dict:
+        """Connection pool utilization per client"""
+        # Copied under the lock, clients may be created while stats are read
+        with self._lock:
+            items = list(self._clients.items())
+        return {name: _pool_stats(client) for name, client in items}
+
+    def close(self):
+        """Close and forget every client"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                client.close()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error closing client: name:%s, error:%s", name, e)
+
+    async def aclose(self):
+        """Close and forget every client, awaiting async ones"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                result = client.close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error closing client: name:%s, error:%s", name, e)
+
+
+clients = ClientRegistry()
@@ -1,12 +1,13 @@
 """OpenSearch client"""
 
-from opensearchpy import OpenSearch
+from opensearchpy import AsyncOpenSearch, OpenSearch
 
 from core.config import settings
+from infra.clients import clients
 
 
-def get_opensearch_client():
-    """Get OpenSearch client"""
+def create_opensearch_client():
+    """Create OpenSearch client"""
     return OpenSearch(
         hosts=[
             {
@@ -24,4 +25,36 @@ def get_opensearch_client():
         sniff_on_start=False,
         sniff_on_connection_fail=False,
         sniffer_timeout=None,
+        pool_maxsize=settings.OPENSEARCH_POOL_MAXSIZE,
+    )
+
+
+def get_opensearch_client():
+    """Get the shared OpenSearch client"""
+    return clients.get("opensearch", create_opensearch_client)
+
+
+def create_async_opensearch_client():
+    """Create OpenSearch client for the event loop"""
+    return AsyncOpenSearch(
+        hosts=[
+            {
+                "host": settings.OPENSEARCH_HOST,
+                "port": settings.OPENSEARCH_PORT,
+            },
+        ],
+        http_auth=(settings.OPENSEARCH_USER, settings.OPENSEARCH_PASS),
+        use_ssl=False,
+        verify_certs=False,
+        timeout=30,
+        max_retries=3,
+        retry_on_timeout=True,
+        retry_on_status=[502, 503, 504],
+        # aiohttp connections size their pool with maxsize
+        maxsize=settings.OPENSEARCH_POOL_MAXSIZE,
     )
+
+
+def get_async_opensearch_client():
+    """Get the shared async OpenSearch client"""
+    return clients.get("opensearch_async", create_async_opensearch_client)
@@ -1,23 +1,28 @@
 """S3 service"""
 
+import hashlib
+import io
+import json
 import os
-from uuid import uuid4
 
 import boto3
 from botocore.config import Config
 
 from core.config import settings
 from core.logging import s3_logger
+from infra.clients import clients
 
 S3_PREFIX = os.getenv("S3_PREFIX", "exports/")
+# Every multipart part except the last must be at least 5 MiB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
 
 logger = s3_logger
 
 
-def get_s3_client():
-    """Get S3 client"""
+def create_s3_client():
+    """Create S3 client"""
     config = Config(
-        max_pool_connections=50,
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
         retries={"max_attempts": 3, "mode": "adaptive"},
         read_timeout=60,
         connect_timeout=60,
@@ -33,17 +38,161 @@ def get_s3_client():
     )
 
 
-def upload_to_s3(file_path: str, bucket: str) -> str:
-    """Upload to S3"""
-    logger.info("Uploading to S3: file_path:%s, bucket:%s", file_path, bucket)
-    file_key = f"{S3_PREFIX}{uuid4()}_{os.path.basename(file_path)}"
+def get_s3_client():
+    """Get the shared S3 client"""
+    return clients.get("s3", create_s3_client)
+
+
+def build_s3_url(bucket: str, file_key: str) -> str:
+    """Public URL of an object"""
+    return f"https://{bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{file_key}"
+
+
+def upload_json_to_s3(data: dict, bucket: str, file_key: str) -> str:
+    """Upload a small JSON document and return its URL"""
+    logger.info("Uploading JSON to S3: bucket:%s, file_key:%s", bucket, file_key)
     s3 = get_s3_client()
-    s3.upload_file(
-        file_path,
-        bucket,
-        file_key,
-        ExtraArgs={"ACL": "public-read"},
+    s3.put_object(
+        Bucket=bucket,
+        Key=file_key,
+        Body=json.dumps(data, default=str).encode("utf-8"),
+        ContentType="application/json",
+        ACL="public-read",
     )
+    return build_s3_url(bucket, file_key)
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """Writable binary stream backed by an S3 multipart upload
+
+    Writes are collected in an in-memory part buffer that is uploaded as a
+    part as soon as it reaches part_size, so memory stays bounded by one part
+    and nothing touches local disk. A SHA-256 of the object is computed on
+    the way. Used as a context manager the upload is completed on success
+    and aborted on error; an aborted upload leaves no object and no billed
+    parts behind.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        file_key: str,
+        part_size: int = None,
+        content_type: str = None,
+        content_encoding: str = None,
+    ):
+        super().__init__()
+        self.bucket = bucket
+        self.file_key = file_key
+        self.part_size = max(part_size or settings.EXPORT_PART_SIZE, S3_MIN_PART_SIZE)
+        self.bytes_written = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._parts = []
+        self._s3 = get_s3_client()
+        logger.info(
+            "Starting multipart upload: bucket:%s, file_key:%s", bucket, self.file_key
+        )
+        headers = {}
+        if content_type:
+            headers["ContentType"] = content_type
+        if content_encoding:
+            headers["ContentEncoding"] = content_encoding
+        self.upload_id = self._s3.create_multipart_upload(
+            Bucket=bucket,
+            Key=self.file_key,
+            ACL="public-read",
+            **headers,
+        )["UploadId"]
+
+    @property
+    def url(self) -> str:
+        """Public URL of the uploaded object"""
+        return build_s3_url(self.bucket, self.file_key)
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of everything written so far"""
+        return self._sha256.hexdigest()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """Buffer data, uploading every full part"""
+        if self.closed:
+            raise ValueError("write to closed S3MultipartWriter")
+        self._buffer += data
+        self._sha256.update(data)
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes):
+        part_number = len(self._parts) + 1
+        response = self._s3.upload_part(
+            Bucket=self.bucket,
+            Key=self.file_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def close(self):
+        """Upload the last part and complete the upload"""
+        if self.closed:
+            return
+        try:
+            # The last part may be short; an empty export still needs one part
+            if self._buffer or not self._parts:
+                self._upload_part(bytes(self._buffer))
+                self._buffer.clear()
+            self._s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.file_key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+            logger.info(
+                "Completed multipart upload: file_key:%s, parts:%s, bytes:%s",
+                self.file_key,
+                len(self._parts),
+                self.bytes_written,
+            )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            super().close()
+
+    def abort(self):
+        """Abort the upload and drop any parts already uploaded"""
+        if self.closed:
+            return
+        self._buffer.clear()
+        try:
+            self._s3.abort_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.file_key,
+                UploadId=self.upload_id,
+            )
+            logger.info("Aborted multipart upload: file_key:%s", self.file_key)
+        finally:
+            super().close()
+
+    def __del__(self):
+        # Never complete a half written upload from the garbage collector
+        if not self.closed:
+            try:
+                self.abort()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
 
-    url = f"https://{bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{file_key}"
-    return url
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -1,17 +1,36 @@
 """SQS"""
 
+import asyncio
+import base64
+import gzip
 import json
+import random
+import threading
+import time
+from typing import Optional
 
 import boto3
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session as get_aio_session
+from botocore.config import Config
 
 from core.config import settings
 from core.logging import sqs_logger
+from infra.clients import clients
 
 logger = sqs_logger
 
+# SendMessageBatch accepts at most 10 entries and 256 KiB per call
+SQS_MAX_BATCH_SIZE = 10
+SQS_MAX_BATCH_BYTES = 256 * 1024
+SQS_MAX_MESSAGE_BYTES = 256 * 1024
+SQS_BATCH_MAX_ATTEMPTS = 3
+# Retries wait a random delay of up to base * 2 ** (attempt - 1) seconds
+SQS_BATCH_RETRY_BASE_SECONDS = 0.1
 
-def get_sqs_client():
-    """Get SQS client
+
+def create_sqs_client():
+    """Create SQS client
 
     Returns:
         boto3.client: SQS client
@@ -22,28 +41,115 @@ def get_sqs_client():
         region_name=settings.AWS_REGION,
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=Config(max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS),
     )
 
 
-def send_to_log_queue(log_id: str, tenant_id: str):
-    """Send to log queue
+def get_sqs_client():
+    """Get the shared SQS client
+
+    Returns:
+        boto3.client: SQS client
+    """
+    return clients.get("sqs", create_sqs_client)
+
+
+async def create_async_sqs_client():
+    """Create SQS client for the event loop
+
+    Returns:
+        aiobotocore client: SQS client, closed with ``await client.close()``
+    """
+    context = get_aio_session().create_client(
+        "sqs",
+        endpoint_url=settings.SQS_ENDPOINT,
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=AioConfig(max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS),
+    )
+    return await context.__aenter__()  # pylint: disable=unnecessary-dunder-call
+
+
+async def get_async_sqs_client():
+    """Get the shared async SQS client
+
+    Returns:
+        aiobotocore client: SQS client
+    """
+    return await clients.aget("sqs_async", create_async_sqs_client)
+
+
+def build_log_message(
+    log_id: str, tenant_id: str, document: Optional[dict] = None
+) -> str:
+    """Build a log queue message body
+
+    When a document is given it is embedded so the consumer can index it
+    without reading the database. Documents larger than
+    LOG_MESSAGE_COMPRESS_BYTES are gzipped and base64 encoded. If the body
+    would still exceed the SQS message size limit, the document is left out
+    and the consumer reads the log from the database instead.
 
     Args:
         log_id (str): Log ID
         tenant_id (str): Tenant ID
+        document (dict, optional): OpenSearch document for the log
+
+    Returns:
+        str: Message body
     """
+    message = {"log_id": str(log_id), "tenant_id": str(tenant_id)}
+    if document is not None:
+        raw = json.dumps(document, default=str).encode("utf-8")
+        if len(raw) > settings.LOG_MESSAGE_COMPRESS_BYTES:
+            message["document_gz"] = base64.b64encode(gzip.compress(raw)).decode()
+        else:
+            message["document"] = document
+    body = json.dumps(message)
+    if len(body.encode("utf-8")) > SQS_MAX_MESSAGE_BYTES:
+        logger.warning(
+            "Log document too large to embed: log_id:%s, tenant_id:%s, bytes:%s",
+            log_id,
+            tenant_id,
+            len(body),
+        )
+        body = json.dumps({"log_id": str(log_id), "tenant_id": str(tenant_id)})
+    return body
+
+
+def decode_log_document(message: dict) -> Optional[dict]:
+    """Return the document embedded in a log queue message, if any
+
+    Args:
+        message (dict): Decoded message body
+
+    Returns:
+        dict: OpenSearch document, or None for ID-only messages
+    """
+    if "document_gz" in message:
+        raw = gzip.decompress(base64.b64decode(message["document_gz"]))
+        return json.loads(raw)
+    return message.get("document")
+
+
+def _log_queue_message(
+    log_id: str, tenant_id: str, document: Optional[dict] = None
+) -> dict:
+    """SendMessage arguments for a log queue message"""
     logger.info(
         "Sending to log queue: log_id:%s, tenant_id:%s, queue_url:%s",
         log_id,
         tenant_id,
         settings.SQS_LOG_QUEUE_URL,
     )
-    sqs = get_sqs_client()
-    message = {"log_id": str(log_id), "tenant_id": str(tenant_id)}
-    sqs.send_message(
-        QueueUrl=settings.SQS_LOG_QUEUE_URL,
-        MessageBody=json.dumps(message),
-    )
+    return {
+        "QueueUrl": settings.SQS_LOG_QUEUE_URL,
+        "MessageBody": build_log_message(log_id, tenant_id, document),
+    }
+
+
+def _log_queue_sent(log_id: str, tenant_id: str):
     logger.info(
         "Sent to log queue: tenant_id:%s, log_id:%s, queue_url:%s",
         tenant_id,
@@ -52,31 +158,320 @@ def send_to_log_queue(log_id: str, tenant_id: str):
     )
 
 
-def send_to_export_queue(export_id: str, tenant_id: str):
-    """Send to export queue
+def send_to_log_queue(log_id: str, tenant_id: str, document: Optional[dict] = None):
+    """Send to log queue
 
     Args:
-        export_id (str): Export ID
+        log_id (str): Log ID
+        tenant_id (str): Tenant ID
+        document (dict, optional): OpenSearch document to embed
+    """
+    sqs = get_sqs_client()
+    sqs.send_message(**_log_queue_message(log_id, tenant_id, document))
+    _log_queue_sent(log_id, tenant_id)
+
+
+async def send_to_log_queue_async(
+    log_id: str, tenant_id: str, document: Optional[dict] = None
+):
+    """Send to log queue without blocking the event loop
+
+    Args:
+        log_id (str): Log ID
+        tenant_id (str): Tenant ID
+        document (dict, optional): OpenSearch document to embed
+    """
+    sqs = await get_async_sqs_client()
+    await sqs.send_message(**_log_queue_message(log_id, tenant_id, document))
+    _log_queue_sent(log_id, tenant_id)
+
+
+def _chunk_entries(entries: list) -> list:
+    """Split batch entries by SendMessageBatch count and size limits"""
+    chunks = []
+    chunk = []
+    chunk_bytes = 0
+    for entry in entries:
+        size = len(entry["MessageBody"].encode("utf-8"))
+        if chunk and (
+            len(chunk) == SQS_MAX_BATCH_SIZE or chunk_bytes + size > SQS_MAX_BATCH_BYTES
+        ):
+            chunks.append(chunk)
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(entry)
+        chunk_bytes += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _log_batch_entries(
+    log_ids: list, tenant_id: str, documents: Optional[list] = None
+) -> list:
+    """SendMessageBatch entries for log IDs, with the index as entry ID"""
+    documents = documents or [None] * len(log_ids)
+    return [
+        {
+            "Id": str(index),
+            "MessageBody": build_log_message(log_id, tenant_id, document),
+        }
+        for index, (log_id, document) in enumerate(zip(log_ids, documents))
+    ]
+
+
+def _log_batch_result(log_ids: list, tenant_id: str, failed: list):
+    if failed:
+        logger.error(
+            "Failed to send to log queue: tenant_id:%s, log_ids:%s",
+            tenant_id,
+            failed,
+        )
+    logger.info(
+        "Sent batch to log queue: sent:%s, failed:%s, tenant_id:%s",
+        len(log_ids) - len(failed),
+        len(failed),
+        tenant_id,
+    )
+
+
+def _batch_retry_delay(attempt: int) -> float:
+    """Seconds to wait before retry attempt of a batch, with full jitter"""
+    return random.uniform(0, SQS_BATCH_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+
+
+def _batch_attempts(entries: list):
+    """Plan the SendMessageBatch calls for entries
+
+    Shared by the sync and async senders, which only do the waiting and the
+    calls. Yields (delay, entries) for every call to make after sleeping
+    delay seconds, and expects the call's response back, or None if it
+    raised. Entries SQS reports as failed are retried on their own up to
+    SQS_BATCH_MAX_ATTEMPTS times.
+
+    Returns:
+        list: IDs of the entries that could not be sent
+    """
+    failed = []
+    for chunk in _chunk_entries(entries):
+        pending = {entry["Id"]: entry for entry in chunk}
+        for attempt in range(SQS_BATCH_MAX_ATTEMPTS):
+            delay = _batch_retry_delay(attempt) if attempt else 0
+            response = yield delay, list(pending.values())
+            if response is None:
+                continue
+            pending = {
+                entry["Id"]: pending[entry["Id"]]
+                for entry in response.get("Failed", [])
+            }
+            if not pending:
+                break
+        failed.extend(pending)
+    return failed
+
+
+def send_batch_to_log_queue(
+    log_ids: list, tenant_id: str, documents: Optional[list] = None
+) -> list:
+    """Send many log IDs to the log queue with SendMessageBatch
+
+    Messages are grouped into batches of up to 10 entries and 256 KiB.
+    Entries that SQS reports as failed are retried on their own up to
+    SQS_BATCH_MAX_ATTEMPTS times, with exponential backoff and jitter.
+
+    Args:
+        log_ids (list): Log IDs
         tenant_id (str): Tenant ID
+        documents (list, optional): OpenSearch documents, aligned with log_ids
+
+    Returns:
+        list: Log IDs that could not be sent
+    """
+    logger.info(
+        "Sending batch to log queue: count:%s, tenant_id:%s, queue_url:%s",
+        len(log_ids),
+        tenant_id,
+        settings.SQS_LOG_QUEUE_URL,
+    )
+    sqs = get_sqs_client()
+    attempts = _batch_attempts(_log_batch_entries(log_ids, tenant_id, documents))
+    response = None
+    while True:
+        try:
+            delay, entries = attempts.send(response)
+        except StopIteration as done:
+            failed = [str(log_ids[int(entry_id)]) for entry_id in done.value]
+            break
+        if delay:
+            time.sleep(delay)
+        try:
+            response = sqs.send_message_batch(
+                QueueUrl=settings.SQS_LOG_QUEUE_URL, Entries=entries
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error sending batch to log queue: %s", e)
+            response = None
+
+    _log_batch_result(log_ids, tenant_id, failed)
+    return failed
+
+
+async def send_batch_to_log_queue_async(
+    log_ids: list, tenant_id: str, documents: Optional[list] = None
+) -> list:
+    """Send many log IDs to the log queue without blocking the event loop
+
+    Batches and retries like send_batch_to_log_queue.
+
+    Returns:
+        list: Log IDs that could not be sent
     """
+    sqs = await get_async_sqs_client()
+    attempts = _batch_attempts(_log_batch_entries(log_ids, tenant_id, documents))
+    response = None
+    while True:
+        try:
+            delay, entries = attempts.send(response)
+        except StopIteration as done:
+            failed = [str(log_ids[int(entry_id)]) for entry_id in done.value]
+            break
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            response = await sqs.send_message_batch(
+                QueueUrl=settings.SQS_LOG_QUEUE_URL, Entries=entries
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error sending batch to log queue: %s", e)
+            response = None
+
+    _log_batch_result(log_ids, tenant_id, failed)
+    return failed
+
+
+def _export_queue_message(export_id: str, tenant_id: str, shard: int = None) -> dict:
+    """SendMessage arguments for an export queue message"""
     logger.info(
-        "Sending to export queue: export_id:%s, tenant_id:%s, queue_url:%s",
+        "Sending to export queue: export_id:%s, tenant_id:%s, shard:%s, "
+        "queue_url:%s",
         export_id,
         tenant_id,
+        shard,
         settings.SQS_EXPORT_QUEUE_URL,
     )
-    sqs = get_sqs_client()
     message = {
         "export_id": str(export_id),
         "tenant_id": str(tenant_id),
     }
-    sqs.send_message(
-        QueueUrl=settings.SQS_EXPORT_QUEUE_URL,
-        MessageBody=json.dumps(message),
-    )
+    if shard is not None:
+        message["shard"] = shard
+    return {
+        "QueueUrl": settings.SQS_EXPORT_QUEUE_URL,
+        "MessageBody": json.dumps(message),
+    }
+
+
+def _export_queue_sent(export_id: str, tenant_id: str):
     logger.info(
         "Sent to export queue: tenant_id:%s, export_id:%s, queue_url:%s",
         tenant_id,
         export_id,
         settings.SQS_EXPORT_QUEUE_URL,
     )
+
+
+def send_to_export_queue(export_id: str, tenant_id: str, shard: int = None):
+    """Send to export queue
+
+    Args:
+        export_id (str): Export ID
+        tenant_id (str): Tenant ID
+        shard (int, optional): Shard index, omitted for the planning message
+    """
+    sqs = get_sqs_client()
+    sqs.send_message(**_export_queue_message(export_id, tenant_id, shard))
+    _export_queue_sent(export_id, tenant_id)
+
+
+async def send_to_export_queue_async(export_id: str, tenant_id: str, shard: int = None):
+    """Send to export queue without blocking the event loop
+
+    Args:
+        export_id (str): Export ID
+        tenant_id (str): Tenant ID
+        shard (int, optional): Shard index, omitted for the planning message
+    """
+    sqs = await get_async_sqs_client()
+    await sqs.send_message(**_export_queue_message(export_id, tenant_id, shard))
+    _export_queue_sent(export_id, tenant_id)
+
+
+class VisibilityHeartbeat:
+    """Keep in-flight messages invisible while they are being processed
+
+    Tracked messages get their visibility timeout extended every
+    timeout / 3 seconds with ChangeMessageVisibilityBatch until they are
+    released, so long-running batches are not redelivered to another worker.
+    """
+
+    def __init__(self, queue_url: str, visibility_timeout: int):
+        self.queue_url = queue_url
+        self.visibility_timeout = visibility_timeout
+        self.interval = max(1, visibility_timeout // 3)
+        self._handles = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sqs-visibility-heartbeat", daemon=True
+        )
+
+    def track(self, messages: list):
+        """Start extending the visibility of messages"""
+        with self._lock:
+            for message in messages:
+                self._handles[message["MessageId"]] = message["ReceiptHandle"]
+
+    def release(self, messages: list):
+        """Stop extending the visibility of messages"""
+        with self._lock:
+            for message in messages:
+                self._handles.pop(message["MessageId"], None)
+
+    def beat(self):
+        """Extend the visibility of every tracked message once"""
+        with self._lock:
+            handles = list(self._handles.values())
+        sqs = get_sqs_client()
+        for start in range(0, len(handles), SQS_MAX_BATCH_SIZE):
+            entries = [
+                {
+                    "Id": str(index),
+                    "ReceiptHandle": handle,
+                    "VisibilityTimeout": self.visibility_timeout,
+                }
+                for index, handle in enumerate(
+                    handles[start : start + SQS_MAX_BATCH_SIZE]
+                )
+            ]
+            try:
+                response = sqs.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=entries,
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error extending message visibility: %s", e)
+                continue
+            for failure in response.get("Failed", []):
+                logger.error("Error extending message visibility: %s", failure)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.beat()
+
+    def start(self):
+        """Start the heartbeat thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Stop the heartbeat thread"""
+        self._stopped.set()
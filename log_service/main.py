@@ -2,18 +2,46 @@
 Main module for the FastAPI application
 """
 
+from contextlib import asynccontextmanager
 from typing import Any, Dict
 
 from fastapi import FastAPI
 from pydantic import BaseModel
 
 from api import logs
-from core.auth import AuthMiddleware
-from core.logging import setup_logging
+from core.auth import AuthMiddleware, token_cache
+from core.db import async_engine
+from core.logging import log_service_logger, setup_logging
+from infra.clients import clients
+from infra.opensearch import get_async_opensearch_client, get_opensearch_client
+from infra.sqs import get_async_sqs_client, get_sqs_client
+from services.cache import log_cache, stats_cache
+from services.search import install_log_index_template
 
 setup_logging()
 
-app = FastAPI(title="Log Service")
+logger = log_service_logger
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Create shared clients on startup and close them on shutdown"""
+    get_opensearch_client()
+    get_sqs_client()
+    get_async_opensearch_client()
+    await get_async_sqs_client()
+    try:
+        install_log_index_template()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error installing index template: %s", e)
+    yield
+    await clients.aclose()
+    if log_cache.shared is not None:
+        await log_cache.shared.close()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Log Service", lifespan=lifespan)
 
 app.add_middleware(AuthMiddleware)
 
@@ -41,3 +69,42 @@ def health_check() -> Dict[str, Any]:
     Health check endpoint
     """
     return {"status": "ok", "message": "Service is healthy"}
+
+
+@app.get(
+    "/health/clients",
+    tags=["Health"],
+    summary="Client Pool Stats",
+    description="Connection pool utilization of the shared infrastructure clients",
+)
+def client_stats() -> Dict[str, Any]:
+    """
+    Client pool stats endpoint
+    """
+    return clients.stats()
+
+
+@app.get(
+    "/health/auth",
+    tags=["Health"],
+    summary="Auth Token Cache Stats",
+    description="Size and hit/miss counters of the verified token cache",
+)
+def auth_stats() -> Dict[str, Any]:
+    """
+    Auth token cache stats endpoint
+    """
+    return token_cache.stats()
+
+
+@app.get(
+    "/health/cache",
+    tags=["Health"],
+    summary="Response Cache Stats",
+    description="Hit ratios of the audit log and stats caches",
+)
+def cache_stats() -> Dict[str, Any]:
+    """
+    Response cache stats endpoint
+    """
+    return {"logs": log_cache.stats(), "stats": stats_cache.stats()}
@@ -0,0 +1,48 @@
+"""Audit log partition maintenance"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from core.config import settings
+from core.db import SessionLocal, engine
+from core.logging import partition_maintenance_logger, setup_logging
+from services.partitions import (
+    drop_expired_audit_log_partitions,
+    ensure_audit_log_partitions,
+)
+
+setup_logging()
+
+logger = partition_maintenance_logger
+
+
+def maintain_once():
+    """Create upcoming monthly partitions and drop expired ones"""
+    with SessionLocal() as db:
+        names = ensure_audit_log_partitions(db, settings.AUDIT_LOG_PARTITIONS_AHEAD)
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.AUDIT_LOG_RETENTION_DAYS
+    )
+    # DETACH PARTITION CONCURRENTLY cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        dropped = drop_expired_audit_log_partitions(connection, cutoff)
+    logger.info(
+        "Maintained audit log partitions: partitions:%s, dropped:%s",
+        names,
+        dropped,
+    )
+
+
+def run_maintenance():
+    """Run partition maintenance every AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS"""
+    logger.info("Starting audit log partition maintenance...")
+    while True:
+        try:
+            maintain_once()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error: %s", e)
+        time.sleep(settings.AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    run_maintenance()
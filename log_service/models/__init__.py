@@ -1,2 +1,4 @@
 from .audit_logs import AuditLog
 from .export_pipeline import ExportPipeline
+from .export_shard import ExportShard
+from .outbox import OutboxEvent
@@ -1,21 +1,30 @@
 """Audit log model"""
 
 from datetime import datetime, timezone
-from uuid import uuid4
 
-from sqlalchemy import JSON, Column, DateTime, String
+from sqlalchemy import JSON, Column, DateTime, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from models.base import Base
+from utils.ids import uuid7
 
 
 class AuditLog(Base):
     """Audit log model"""
 
     __tablename__ = "audit_logs"
+    # Monthly range partitions, see services/partitions.py
+    __table_args__ = (
+        # Tenant scoped reads: newest first listing/export/cleanup and lookups
+        Index(
+            "ix_audit_logs_tenant_id_created_at", "tenant_id", text("created_at DESC")
+        ),
+        Index("ix_audit_logs_tenant_id_alid", "tenant_id", "alid"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    alid = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    tenant_id = Column(String, nullable=False, index=True)
+    alid = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    tenant_id = Column(String, nullable=False)
     user_id = Column(String, nullable=True)
     email = Column(String, nullable=True)
     action = Column(String, nullable=False)
@@ -27,6 +36,11 @@ class AuditLog(Base):
     before_state = Column(JSON, nullable=True)
     after_state = Column(JSON, nullable=True)
     severity = Column(String, default="INFO")
+    # Partitioned tables need the partition key in their primary key
     created_at = Column(
-        DateTime, default=lambda: datetime.now(timezone.utc), index=True
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        index=True,
     )
@@ -2,7 +2,16 @@
 
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    false,
+)
 from sqlalchemy.dialects.postgresql import UUID
 
 from models.base import Base
@@ -16,5 +25,25 @@ class ExportPipeline(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     tenant_id = Column(String, nullable=False, index=True)
     status = Column(String, nullable=False)
+    format = Column(String, nullable=False, default="csv", server_default="csv")
+    compression = Column(String, nullable=False, default="none", server_default="none")
     file_url = Column(String, nullable=True)
+    manifest_url = Column(String, nullable=True)
+    # Progress of the time range shards in export_shards
+    shard_count = Column(Integer, nullable=False, default=0, server_default="0")
+    shards_done = Column(Integer, nullable=False, default=0, server_default="0")
+    # Running totals published by the export workers while shards stream
+    rows_processed = Column(BigInteger, nullable=False, default=0, server_default="0")
+    bytes_written = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rows_estimated = Column(BigInteger, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    filters = Column(JSON, nullable=True)
+    incremental = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Exclusive upper created_at bound of an incremental export; the next
+    # incremental export of the tenant with the same filters starts here
+    watermark = Column(DateTime, nullable=True)
+    # Row filters the watermark applies to; incremental exports only
+    # continue from watermarks of exports with the same key
+    watermark_key = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=False)
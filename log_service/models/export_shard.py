@@ -0,0 +1,54 @@
+"""Export shard model"""
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from models.base import Base
+
+
+class ExportShard(Base):
+    """Export shard model
+
+    One created_at range of an export pipeline, exported to its own part
+    file by whichever export consumer worker picks it up.
+    """
+
+    __tablename__ = "export_shards"
+    __table_args__ = (UniqueConstraint("pipeline_id", "shard_index"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    pipeline_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("export_pipelines.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    shard_index = Column(Integer, nullable=False)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    status = Column(String, nullable=False, default="PENDING")
+    # Bumped by every claim; only the latest attempt may report or complete
+    attempt = Column(Integer, nullable=False, default=0, server_default="0")
+    # A running attempt renews this; once it passes the shard can be reclaimed
+    lease_expires_at = Column(DateTime, nullable=True)
+    file_key = Column(String, nullable=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+    bytes = Column(BigInteger, nullable=False, default=0)
+    sha256 = Column(String, nullable=True)
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
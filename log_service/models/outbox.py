@@ -0,0 +1,36 @@
+"""Outbox event model"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from models.base import Base
+
+
+class OutboxEvent(Base):
+    """Outbox event model
+
+    Written in the same transaction as the audit log rows and drained to the
+    log queue by relay_outbox.py. Events that fail to send are retried at
+    available_at; after OUTBOX_MAX_ATTEMPTS they stay in the table as dead
+    letters and are no longer claimed.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, nullable=False)
+    log_id = Column(UUID(as_uuid=True), nullable=False)
+    document = Column(JSON, nullable=True)
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
@@ -0,0 +1,92 @@
+"""Outbox relay"""
+
+import time
+
+from core.config import settings
+from core.db import SessionLocal
+from core.logging import outbox_relay_logger, setup_logging
+from infra.clients import clients
+from infra.sqs import send_batch_to_log_queue
+from services.outbox import (
+    claim_outbox_events,
+    delete_outbox_events,
+    group_outbox_events,
+    retry_outbox_events,
+)
+
+setup_logging()
+
+logger = outbox_relay_logger
+
+
+def relay_once(db) -> int:
+    """Relay one batch of outbox events to the log queue
+
+    Events that could not be queued stay in the outbox and are retried with
+    a growing delay, until OUTBOX_MAX_ATTEMPTS leaves them as dead letters.
+
+    Returns:
+        int: Number of events relayed
+    """
+    events = claim_outbox_events(db, settings.OUTBOX_RELAY_BATCH_SIZE)
+    if not events:
+        db.commit()
+        return 0
+
+    relayed_ids = []
+    failed_events = []
+    for tenant_id, tenant_events in group_outbox_events(events).items():
+        failed = set(
+            send_batch_to_log_queue(
+                [event.log_id for event in tenant_events],
+                tenant_id,
+                [event.document for event in tenant_events],
+            )
+        )
+        for event in tenant_events:
+            if str(event.log_id) in failed:
+                failed_events.append(event)
+            else:
+                relayed_ids.append(event.id)
+
+    delete_outbox_events(db, relayed_ids)
+    for event in retry_outbox_events(failed_events):
+        logger.error(
+            "Outbox event dead-lettered: id:%s, tenant_id:%s, log_id:%s",
+            event.id,
+            event.tenant_id,
+            event.log_id,
+        )
+    db.commit()
+    logger.info(
+        "Relayed outbox events: claimed:%s, relayed:%s, failed:%s",
+        len(events),
+        len(relayed_ids),
+        len(failed_events),
+    )
+    return len(relayed_ids)
+
+
+def run_relay():
+    """Run outbox relay"""
+    logger.info("Starting outbox relay...")
+    try:
+        while True:
+            relayed = 0
+            db = SessionLocal()
+            try:
+                relayed = relay_once(db)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error: %s", e)
+                db.rollback()
+            finally:
+                db.close()
+            # Keep draining while there is a backlog
+            if not relayed:
+                time.sleep(settings.OUTBOX_RELAY_IDLE_SECONDS)
+    finally:
+        clients.close()
+
+
+if __name__ == "__main__":
+    run_relay()
@@ -1,6 +1,6 @@
 """Base schemas"""
 
-from typing import Generic, List, TypeVar
+from typing import Generic, List, Optional, TypeVar
 
 from pydantic import BaseModel
 
@@ -14,6 +14,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class DetailResponse(BaseModel, Generic[T]):
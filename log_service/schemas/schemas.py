@@ -1,10 +1,10 @@
 """Schemas for audit logs"""
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field, model_validator
 
 from schemas.base import DetailResponse, PaginatedResponse
 
@@ -142,20 +142,128 @@ class AuditLogBulkCreateResult(BaseModel):
     """Audit log bulk create result schema"""
 
     affected_rows: int
+    failed_log_ids: List[str] = Field(
+        default_factory=list,
+        description="Log IDs that were stored but could not be queued for indexing",
+    )
 
 
 class AuditLogBulkCreateResponse(DetailResponse[AuditLogBulkCreateResult]):
     """Audit log bulk create response schema"""
 
 
+class AuditLogBatchGet(BaseModel):
+    """Audit log multi-get request schema"""
+
+    ids: List[str] = Field(..., min_length=1, description="Log IDs to fetch")
+
+
+class AuditLogBatchGetItem(BaseModel):
+    """One requested log, in request order"""
+
+    id: str = Field(..., description="Requested log ID")
+    found: bool = Field(..., description="Whether the log exists for the tenant")
+    log: Optional[AuditLogDetail] = None
+
+
+class AuditLogBatchGetResult(BaseModel):
+    """Audit log multi-get result schema"""
+
+    items: List[AuditLogBatchGetItem]
+    missing: List[str] = Field(
+        default_factory=list,
+        description="Requested log IDs that were not found",
+    )
+
+
+class AuditLogBatchGetResponse(DetailResponse[AuditLogBatchGetResult]):
+    """Audit log multi-get response schema"""
+
+
+ExportFormat = Literal["csv", "parquet"]
+ExportCompression = Literal["none", "gzip", "zstd"]
+
+
+class ExportPipelineCreate(BaseModel):
+    """Export pipeline create schema"""
+
+    format: ExportFormat = Field(
+        "csv",
+        description="Export file format; parquet keeps column types and state fields",
+    )
+    compression: Optional[ExportCompression] = Field(
+        None,
+        description=(
+            "Compression applied while streaming; defaults to none for csv and "
+            "zstd for parquet"
+        ),
+    )
+    start_time: Optional[datetime] = Field(
+        None, description="Only export logs created at or after this time"
+    )
+    end_time: Optional[datetime] = Field(
+        None, description="Only export logs created before this time"
+    )
+    action: Optional[str] = None
+    severity: Optional[str] = None
+    user_id: Optional[str] = None
+    incremental: bool = Field(
+        False,
+        description="Only export logs created since the last successful "
+        "incremental export of the tenant",
+    )
+
+    @model_validator(mode="after")
+    def check_time_range(self):
+        """Reject empty time ranges"""
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValueError("start_time must be before end_time")
+        return self
+
+    def filters(self) -> dict:
+        """Row filters to store on the pipeline"""
+        return self.model_dump(
+            include={"start_time", "end_time", "action", "severity", "user_id"},
+            exclude_none=True,
+            mode="json",
+        )
+
+
 class ExportPipeline(BaseModel):
     """Export pipeline schema"""
 
     id: UUID
     tenant_id: str
     status: str
+    format: ExportFormat = "csv"
+    compression: ExportCompression = "none"
+    filters: Optional[Dict[str, Any]] = None
+    incremental: bool = False
+    watermark: Optional[datetime] = None
     created_at: datetime
     file_url: Optional[str] = None
+    manifest_url: Optional[str] = None
+    shard_count: int = 0
+    shards_done: int = 0
+    rows_processed: int = 0
+    bytes_written: int = 0
+    rows_estimated: Optional[int] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        """Average export throughput since the export started"""
+        if not self.started_at:
+            return None
+        finished_at = self.finished_at or datetime.now(timezone.utc).replace(
+            tzinfo=None
+        )
+        elapsed = (finished_at - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return None
+        return round(self.rows_processed / elapsed, 1)
 
 
 class ExportPipelineDetailResponse(DetailResponse[ExportPipeline]):
@@ -0,0 +1,268 @@
+"""Response caches"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from core.config import settings
+from core.logging import log_service_logger
+from infra.cache import CacheBackend, LRUCache
+from schemas.schemas import AuditLogDetail
+from services.logs import get_log_entries, get_log_entry
+
+logger = log_service_logger
+
+
+class CachedLog(NamedTuple):
+    """Serialized audit log detail and its strong ETag"""
+
+    data: dict
+    etag: str
+
+
+def build_cached_log(log) -> CachedLog:
+    """Serialize a log the way GET /logs/{log_id} returns it"""
+    data = AuditLogDetail.model_validate(log, from_attributes=True).model_dump(
+        mode="json"
+    )
+    body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return CachedLog(data, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class LogCache:
+    """Two level read-through cache of audit log details
+
+    Audit logs never change after they are written, so entries keyed by
+    (tenant_id, alid) only leave the cache by size or TTL. The in-process
+    LRU is checked first, then the optional shared backend, which fills the
+    LRU on a hit. Backend errors are logged and treated as misses.
+    """
+
+    def __init__(self, local: LRUCache, shared: Optional[CacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+
+    @staticmethod
+    def _shared_key(tenant_id: str, log_id: str) -> str:
+        return f"audit-log:{tenant_id}:{log_id}"
+
+    async def get(self, tenant_id: str, log_id: str) -> Optional[CachedLog]:
+        """Cached log of a tenant, or None"""
+        key = (tenant_id, log_id)
+        entry = self.local.get(key)
+        if entry is not None or self.shared is None:
+            return entry
+        try:
+            value = await self.shared.get(self._shared_key(tenant_id, log_id))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error reading shared log cache: %s", e)
+            return None
+        if value is None:
+            return None
+        entry = CachedLog(*json.loads(value))
+        self.shared_hits += 1
+        self.local.put(key, entry)
+        return entry
+
+    async def put(self, tenant_id: str, log_id: str, entry: CachedLog):
+        """Cache a log in both levels"""
+        self.local.put((tenant_id, log_id), entry)
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(
+                self._shared_key(tenant_id, log_id),
+                json.dumps(list(entry)).encode("utf-8"),
+                self.local.ttl,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error writing shared log cache: %s", e)
+
+    def clear(self):
+        """Drop the local entries and reset the counters"""
+        self.local.clear()
+        self.shared_hits = 0
+
+    def stats(self) -> dict:
+        """Local cache counters and hits served by the shared backend"""
+        return {
+            **self.local.stats(),
+            "shared": type(self.shared).__name__ if self.shared else None,
+            "shared_hits": self.shared_hits,
+        }
+
+
+log_cache = LogCache(LRUCache(settings.LOG_CACHE_SIZE, settings.LOG_CACHE_TTL_SECONDS))
+
+
+async def get_log_detail(db, tenant_id: str, log_id: str) -> Optional[CachedLog]:
+    """Get a log through the cache, reading the database on a miss
+
+    Args:
+        db (AsyncSession): Database session
+        tenant_id (str): Tenant ID
+        log_id (str): Log ID
+
+    Returns:
+        CachedLog: Serialized log and ETag, or None if it does not exist
+    """
+    entry = await log_cache.get(tenant_id, log_id)
+    if entry is not None:
+        return entry
+    log = await db.run_sync(get_log_entry, tenant_id, log_id)
+    if log is None:
+        # Misses are not cached; the log may just not be written yet
+        return None
+    entry = build_cached_log(log)
+    await log_cache.put(tenant_id, log_id, entry)
+    return entry
+
+
+async def get_log_details(
+    db, tenant_id: str, log_ids: List[str]
+) -> Dict[str, CachedLog]:
+    """Get many logs through the cache, reading all misses with one query
+
+    Args:
+        db (AsyncSession): Database session
+        tenant_id (str): Tenant ID
+        log_ids (List[str]): Canonical log IDs, duplicates allowed
+
+    Returns:
+        Dict[str, CachedLog]: Found logs by ID; missing IDs are left out
+    """
+    found = {}
+    misses = []
+    for log_id in dict.fromkeys(log_ids):
+        entry = await log_cache.get(tenant_id, log_id)
+        if entry is None:
+            misses.append(log_id)
+        else:
+            found[log_id] = entry
+    if misses:
+        for log in await db.run_sync(get_log_entries, tenant_id, misses):
+            log_id = str(log.alid)
+            found[log_id] = build_cached_log(log)
+            await log_cache.put(tenant_id, log_id, found[log_id])
+    return found
+
+
+class RefreshingCache:
+    """Per-key result cache with stale-while-revalidate and single-flight
+
+    A value is fresh for ttl seconds and served as is. For stale seconds
+    after that it is still served, while one background task refreshes it.
+    Older or missing values are loaded before returning. Concurrent
+    requests for the same key share one in-flight load, so at most one
+    load per key runs at a time. A load still running when its key is
+    invalidated does not write its result back.
+
+    Load latency and hit/miss counters are kept for /health/cache.
+    """
+
+    def __init__(self, ttl: int, stale: int):
+        self.ttl = ttl
+        self.stale = stale
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.refresh_seconds_total = 0.0
+        self.refresh_seconds_max = 0.0
+        self._entries: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, key: str, loader: Callable[[str], Awaitable[Any]]) -> Any:
+        """Cached value of key, loading it with loader(key) when needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl + self.stale:
+                self.stale_hits += 1
+                self._refresh(key, loader)
+                return entry[1]
+        self.misses += 1
+        # Shielded so a client going away does not cancel the shared load
+        return await asyncio.shield(self._refresh(key, loader))
+
+    def _refresh(self, key: str, loader) -> asyncio.Task:
+        """Start a load of key unless one is already running"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.create_task(self._load(key, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marks background failures as retrieved; _load already logged them
+            task.exception()
+
+    async def _load(self, key: str, loader) -> Any:
+        started = time.monotonic()
+        try:
+            value = await loader(key)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.refresh_errors += 1
+            logger.error("Error refreshing cache: key:%s, error:%s", key, e)
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self.refreshes += 1
+            self.refresh_seconds_total += elapsed
+            self.refresh_seconds_max = max(self.refresh_seconds_max, elapsed)
+        # Invalidated while loading, the value may predate the change
+        if self._inflight.get(key) is asyncio.current_task():
+            self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, key: str):
+        """Forget the cached value of key and any load of it in flight"""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self._entries.clear()
+        self.hits = self.stale_hits = self.misses = self.coalesced = 0
+        self.refreshes = self.refresh_errors = 0
+        self.refresh_seconds_total = self.refresh_seconds_max = 0.0
+
+    def stats(self) -> dict:
+        """Hit ratio and refresh latency of the cache"""
+        lookups = self.hits + self.stale_hits + self.misses
+        served = self.hits + self.stale_hits
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refresh_ms_avg": (
+                round(self.refresh_seconds_total / self.refreshes * 1000, 1)
+                if self.refreshes
+                else 0.0
+            ),
+            "refresh_ms_max": round(self.refresh_seconds_max * 1000, 1),
+        }
+
+
+stats_cache = RefreshingCache(
+    settings.STATS_CACHE_TTL_SECONDS, settings.STATS_CACHE_STALE_SECONDS
+)
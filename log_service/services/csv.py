@@ -1,53 +1,40 @@
 """CSV service"""
 
 import csv
-import os
-from datetime import datetime, timezone
-from typing import List
-
-from models import AuditLog
-
-EXPORT_DIR = "/tmp/exports"
-os.makedirs(EXPORT_DIR, exist_ok=True)
-
-
-def write_logs_to_csv(logs: List[AuditLog], tenant_id: str) -> str:
-    """Write logs to CSV"""
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-    filename = f"{tenant_id}_logs_{timestamp}.csv"
-    filepath = os.path.join(EXPORT_DIR, filename)
-
-    with open(filepath, mode="w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(
-            [
-                "alid",
-                "tenant_id",
-                "user_id",
-                "action",
-                "resource_type",
-                "resource_id",
-                "ip_address",
-                "user_agent",
-                "log_metadata",
-                "severity",
-                "created_at",
-            ]
-        )
-        for log in logs:
-            writer.writerow(
-                [
-                    log.alid,
-                    log.tenant_id,
-                    log.user_id,
-                    log.action,
-                    log.resource_type,
-                    log.resource_id,
-                    log.ip_address,
-                    log.user_agent,
-                    log.log_metadata,
-                    log.severity,
-                    log.created_at,
-                ]
-            )
-    return filepath
+import io
+from typing import BinaryIO, Iterable
+
+from services.logs import EXPORT_COLUMNS
+
+# Encoded rows are handed to the output stream in blocks of about this size
+CSV_FLUSH_BYTES = 64 * 1024
+
+
+def _drain(buffer: io.StringIO, stream: BinaryIO):
+    """Move buffered CSV text into stream as UTF-8"""
+    stream.write(buffer.getvalue().encode("utf-8"))
+    buffer.seek(0)
+    buffer.truncate()
+
+
+def write_logs_to_csv(logs: Iterable[tuple], stream: BinaryIO) -> int:
+    """Write logs to CSV
+
+    logs are EXPORT_COLUMNS tuples; they are encoded and written to stream as
+    they are read so an iterator is never materialized. The stream is left
+    open for the caller to finish.
+
+    Returns:
+        int: Number of logs written
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    count = 0
+    for log in logs:
+        writer.writerow(log)
+        count += 1
+        if buffer.tell() >= CSV_FLUSH_BYTES:
+            _drain(buffer, stream)
+    _drain(buffer, stream)
+    return count
@@ -1,21 +1,155 @@
 """Export service"""
 
+import gzip
+import json
+import time
 import uuid
-from datetime import datetime, timezone
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterable, Iterator, Optional
 
+import zstandard
+from sqlalchemy import and_, func, or_, update
 from sqlalchemy.orm import Session
 
+from core.config import settings
+from infra.s3 import S3_PREFIX, build_s3_url, upload_json_to_s3
 from models.export_pipeline import ExportPipeline
+from models.export_shard import ExportShard
+from services.csv import write_logs_to_csv
+from services.logs import EXPORT_COLUMNS, get_export_bounds
+from services.parquet import PARQUET_COLUMNS, write_logs_to_parquet
 
+# Columns streamed from the database for each export format
+EXPORT_FORMAT_COLUMNS = {"csv": EXPORT_COLUMNS, "parquet": PARQUET_COLUMNS}
 
-def create_export_pipeline(tenant_id: str, db: Session):
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Parquet compresses its column chunks itself, so only CSV gets a compressed
+# stream, a Content-Encoding and a suffix
+STREAM_COMPRESSED_FORMATS = {"csv"}
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Used when the export request does not pick a compression
+DEFAULT_COMPRESSION = {"csv": "none", "parquet": "zstd"}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Filters that bound an export in time rather than select its rows
+EXPORT_TIME_FILTERS = ("start_time", "end_time")
+
+# Pipelines in these states can still be cancelled
+ACTIVE_EXPORT_STATUSES = ("PENDING", "IN_PROGRESS")
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export worker once its pipeline is cancelled or failed"""
+
+
+class ExportShardLost(Exception):
+    """Raised inside an export worker whose shard was claimed by a newer attempt"""
+
+
+def export_part_key(pipeline: ExportPipeline, shard_index: int) -> str:
+    """S3 key of one shard's part file"""
+    key = (
+        f"{S3_PREFIX}{pipeline.id}/"
+        f"{pipeline.tenant_id}_logs_part{shard_index:05d}.{pipeline.format}"
+    )
+    if pipeline.format in STREAM_COMPRESSED_FORMATS:
+        key += COMPRESSION_EXTENSIONS.get(pipeline.compression, "")
+    return key
+
+
+def export_manifest_key(pipeline: ExportPipeline) -> str:
+    """S3 key of an export's manifest"""
+    return f"{S3_PREFIX}{pipeline.id}/manifest.json"
+
+
+def export_content_headers(export_format: str, compression: str) -> dict:
+    """S3 object headers of an export file"""
+    headers = {"content_type": EXPORT_CONTENT_TYPES[export_format]}
+    if export_format in STREAM_COMPRESSED_FORMATS and compression != "none":
+        headers["content_encoding"] = compression
+    return headers
+
+
+@contextmanager
+def compressed_stream(stream: BinaryIO, compression: str):
+    """Compress everything written to the yielded stream into stream
+
+    The compressor is flushed and its trailer written only when the block
+    succeeds; stream itself is never closed.
+    """
+    if compression == "gzip":
+        compressor = gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=GZIP_LEVEL)
+    elif compression == "zstd":
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+            stream, closefd=False
+        )
+    else:
+        yield stream
+        return
+    yield compressor
+    compressor.close()
+
+
+def write_export(
+    logs: Iterable[tuple],
+    stream: BinaryIO,
+    export_format: str,
+    compression: str,
+) -> int:
+    """Encode and compress logs into stream
+
+    logs are EXPORT_FORMAT_COLUMNS[export_format] tuples.
+
+    Returns:
+        int: Number of logs written
+    """
+    if export_format == "parquet":
+        return write_logs_to_parquet(logs, stream, compression=compression)
+    with compressed_stream(stream, compression) as output:
+        return write_logs_to_csv(logs, output)
+
+
+def export_watermark_key(filters: Optional[dict]) -> str:
+    """Canonical form of the row filters an incremental watermark applies to
+
+    Time bounds are left out; incremental runs narrow those themselves.
+    """
+    row_filters = {
+        key: value
+        for key, value in (filters or {}).items()
+        if key not in EXPORT_TIME_FILTERS
+    }
+    return json.dumps(row_filters, sort_keys=True, separators=(",", ":"))
+
+
+def create_export_pipeline(
+    tenant_id: str,
+    db: Session,
+    export_format: str = "csv",
+    compression: str = None,
+    filters: dict = None,
+    incremental: bool = False,
+):
     """Create export pipeline"""
     pipeline_id = str(uuid.uuid4())
     pipeline = ExportPipeline(
         id=pipeline_id,
         tenant_id=tenant_id,
         status="PENDING",
-        created_at=datetime.now(timezone.utc),
+        format=export_format,
+        compression=compression or DEFAULT_COMPRESSION[export_format],
+        filters=filters or None,
+        incremental=incremental,
+        watermark_key=export_watermark_key(filters) if incremental else None,
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None),
     )
     db.add(pipeline)
     db.commit()
@@ -32,3 +166,431 @@ def get_export_pipeline(db: Session, tenant_id: str, pipeline_id: str):
         )
         .first()
     )
+
+
+def _utcnow() -> datetime:
+    """Current time in the naive UTC the export tables use"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def cancel_export_pipeline(db: Session, pipeline: ExportPipeline) -> bool:
+    """Cancel a pending or running export
+
+    Only the status changes here; workers notice it the next time they
+    publish progress, stop reading and abort their multipart uploads.
+
+    Returns:
+        bool: Whether the pipeline was still active and is now cancelled
+    """
+    result = db.execute(
+        update(ExportPipeline)
+        .where(ExportPipeline.id == pipeline.id)
+        .where(ExportPipeline.status.in_(ACTIVE_EXPORT_STATUSES))
+        .values(status="CANCELLED", finished_at=_utcnow())
+    )
+    db.commit()
+    db.refresh(pipeline)
+    return result.rowcount == 1
+
+
+def _naive_utc(value) -> datetime:
+    """Parse a stored filter time into the naive UTC audit_logs uses"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def get_export_watermark(
+    db: Session, tenant_id: str, watermark_key: str
+) -> Optional[datetime]:
+    """Watermark of the tenant's last successful incremental export
+
+    Only exports of the same row filters count; a watermark advanced by a
+    filtered export says nothing about the rows it filtered out.
+    """
+    return (
+        db.query(func.max(ExportPipeline.watermark))
+        .filter(ExportPipeline.tenant_id == tenant_id)
+        .filter(ExportPipeline.status == "DONE")
+        .filter(ExportPipeline.incremental.is_(True))
+        .filter(ExportPipeline.watermark_key == watermark_key)
+        .scalar()
+    )
+
+
+def parse_export_filters(pipeline: ExportPipeline) -> dict:
+    """Filters requested for a pipeline, with times in naive UTC"""
+    filters = dict(pipeline.filters or {})
+    for key in ("start_time", "end_time"):
+        if filters.get(key):
+            filters[key] = _naive_utc(filters[key])
+    return filters
+
+
+def resolve_export_filters(db: Session, pipeline: ExportPipeline) -> dict:
+    """Filters to export a pipeline with
+
+    An incremental pipeline is narrowed to rows created since the last
+    successful incremental export of the tenant with the same row filters
+    and up to a new watermark, which is set on the pipeline. The watermark
+    trails now by EXPORT_WATERMARK_LAG_SECONDS so rows of transactions
+    still in flight are picked up by the next run instead of being skipped,
+    and stops at an earlier requested end_time.
+    """
+    filters = parse_export_filters(pipeline)
+    if pipeline.incremental:
+        watermark_key = pipeline.watermark_key or export_watermark_key(pipeline.filters)
+        since = get_export_watermark(db, pipeline.tenant_id, watermark_key)
+        until = _utcnow() - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+        if since and (not filters.get("start_time") or since > filters["start_time"]):
+            filters["start_time"] = since
+        if not filters.get("end_time") or until < filters["end_time"]:
+            filters["end_time"] = until
+        pipeline.watermark = filters["end_time"]
+    return filters
+
+
+def _split_time_range(start: datetime, end: datetime, count: int) -> list:
+    """Split [start, end) into up to count contiguous, equally long ranges"""
+    step = (end - start) / count
+    if step <= timedelta(0):
+        return [(start, end)]
+    bounds = [start + step * index for index in range(count)] + [end]
+    return list(zip(bounds, bounds[1:]))
+
+
+def plan_export_shards(
+    db: Session,
+    pipeline: ExportPipeline,
+    filters: dict,
+) -> list:
+    """Split a pipeline into created_at range shards
+
+    One shard is planned per EXPORT_SHARD_MIN_ROWS matching logs, up to
+    EXPORT_MAX_SHARDS, over equal slices of the time range the logs span.
+    The shards are added to the session and the pipeline's shard_count
+    set; the caller commits.
+
+    Returns:
+        list: The planned ExportShard rows, in shard_index order
+    """
+    count, first, last = get_export_bounds(db, pipeline.tenant_id, filters)
+    start = filters.get("start_time") or first
+    end = filters.get("end_time")
+    if not end and last:
+        # end_time is exclusive, keep the newest log in the last shard
+        end = last + timedelta(microseconds=1)
+
+    shard_count = max(1, -(-count // settings.EXPORT_SHARD_MIN_ROWS))
+    shard_count = min(shard_count, settings.EXPORT_MAX_SHARDS)
+    if count and shard_count > 1:
+        ranges = _split_time_range(start, end, shard_count)
+    else:
+        ranges = [(start, end)]
+
+    shards = [
+        ExportShard(
+            pipeline_id=pipeline.id,
+            shard_index=index,
+            start_time=shard_start,
+            end_time=shard_end,
+            status="PENDING",
+        )
+        for index, (shard_start, shard_end) in enumerate(ranges)
+    ]
+    db.add_all(shards)
+    pipeline.shard_count = len(shards)
+    pipeline.shards_done = 0
+    pipeline.rows_estimated = count
+    return shards
+
+
+def get_export_shard(db: Session, pipeline_id: str, shard_index: int):
+    """Get export shard"""
+    return (
+        db.query(ExportShard)
+        .filter_by(pipeline_id=pipeline_id, shard_index=shard_index)
+        .first()
+    )
+
+
+def get_pending_export_shards(db: Session, pipeline_id: str) -> list:
+    """Get the shards of a pipeline no worker has started yet
+
+    Returns:
+        list: The PENDING ExportShard rows, in shard_index order
+    """
+    return (
+        db.query(ExportShard)
+        .filter_by(pipeline_id=pipeline_id, status="PENDING")
+        .order_by(ExportShard.shard_index)
+        .all()
+    )
+
+
+def claim_export_shard(
+    db: Session, pipeline: ExportPipeline, shard: ExportShard
+) -> Optional[int]:
+    """Claim a shard for this worker, mark it IN_PROGRESS and commit
+
+    Only PENDING shards and shards whose previous attempt stopped renewing
+    its lease can be claimed. The row is locked with SKIP LOCKED, so of
+    several copies of a shard message only one claims it. Each claim bumps
+    the shard's attempt; progress and completion are only accepted from the
+    attempt holding the claim. A crashed attempt has already added partial
+    progress to the pipeline; that is taken back before the shard starts
+    over.
+
+    Returns:
+        Optional[int]: The claimed attempt, None if the shard is not claimable
+    """
+    now = _utcnow()
+    claimed = (
+        db.query(ExportShard)
+        .filter(ExportShard.id == shard.id)
+        .filter(
+            or_(
+                ExportShard.status == "PENDING",
+                and_(
+                    ExportShard.status == "IN_PROGRESS",
+                    or_(
+                        ExportShard.lease_expires_at.is_(None),
+                        ExportShard.lease_expires_at < now,
+                    ),
+                ),
+            )
+        )
+        .with_for_update(skip_locked=True)
+        .populate_existing()
+        .first()
+    )
+    if claimed is None:
+        db.rollback()
+        return None
+    if shard.row_count or shard.bytes:
+        db.execute(
+            update(ExportPipeline)
+            .where(ExportPipeline.id == pipeline.id)
+            .values(
+                rows_processed=ExportPipeline.rows_processed - shard.row_count,
+                bytes_written=ExportPipeline.bytes_written - shard.bytes,
+            )
+        )
+    attempt = shard.attempt + 1
+    shard.attempt = attempt
+    shard.row_count = 0
+    shard.bytes = 0
+    shard.status = "IN_PROGRESS"
+    shard.lease_expires_at = now + timedelta(
+        seconds=settings.EXPORT_SHARD_LEASE_SECONDS
+    )
+    db.commit()
+    return attempt
+
+
+def release_export_shard(
+    db: Session, shard: ExportShard, attempt: int, status: str
+) -> bool:
+    """Move a shard this attempt still holds out of IN_PROGRESS (no commit)
+
+    Returns:
+        bool: Whether the attempt still held the shard
+    """
+    result = db.execute(
+        update(ExportShard)
+        .where(ExportShard.id == shard.id)
+        .where(ExportShard.attempt == attempt)
+        .where(ExportShard.status == "IN_PROGRESS")
+        .values(status=status, lease_expires_at=None)
+    )
+    return result.rowcount == 1
+
+
+class ExportProgress:
+    """Publish a running shard's progress and watch for cancellation
+
+    Logs passed through track() are counted, and at most every
+    EXPORT_PROGRESS_INTERVAL_SECONDS the rows and bytes since the last
+    report are added to the pipeline's totals and the shard's lease is
+    renewed. Reports go through a session of their own because the
+    exporting session holds an open server-side cursor. A report that finds
+    the pipeline cancelled, or failed by another shard, raises
+    ExportCancelled; one that finds the shard claimed by a newer attempt
+    raises ExportShardLost. Either unwinds the export and aborts its upload.
+    """
+
+    def __init__(self, db: Session, pipeline_id, shard_id, attempt, stream):
+        self.db = db
+        self.pipeline_id = pipeline_id
+        self.shard_id = shard_id
+        self.attempt = attempt
+        self.stream = stream
+        self.interval = settings.EXPORT_PROGRESS_INTERVAL_SECONDS
+        self.rows = 0
+        self._reported_rows = 0
+        self._reported_bytes = 0
+        self._next_report = time.monotonic() + self.interval
+
+    def track(self, logs: Iterable[tuple]) -> Iterator[tuple]:
+        """Yield logs, reporting progress as they are consumed"""
+        for log in logs:
+            yield log
+            self.rows += 1
+            if time.monotonic() >= self._next_report:
+                self.report()
+
+    def report(self):
+        """Add progress since the last report to the pipeline and commit"""
+        bytes_written = self.stream.bytes_written
+        claimed = self.db.execute(
+            update(ExportShard)
+            .where(ExportShard.id == self.shard_id)
+            .where(ExportShard.attempt == self.attempt)
+            .values(
+                row_count=self.rows,
+                bytes=bytes_written,
+                lease_expires_at=_utcnow()
+                + timedelta(seconds=settings.EXPORT_SHARD_LEASE_SECONDS),
+            )
+        )
+        if claimed.rowcount == 0:
+            self.db.rollback()
+            raise ExportShardLost(
+                f"export {self.pipeline_id} shard {self.shard_id} was reclaimed"
+            )
+        status = self.db.execute(
+            update(ExportPipeline)
+            .where(ExportPipeline.id == self.pipeline_id)
+            .values(
+                rows_processed=ExportPipeline.rows_processed
+                + (self.rows - self._reported_rows),
+                bytes_written=ExportPipeline.bytes_written
+                + (bytes_written - self._reported_bytes),
+            )
+            .returning(ExportPipeline.status)
+        ).scalar_one()
+        self.db.commit()
+        self._reported_rows = self.rows
+        self._reported_bytes = bytes_written
+        self._next_report = time.monotonic() + self.interval
+        if status in ("CANCELLED", "FAILED"):
+            raise ExportCancelled(f"export {self.pipeline_id} is {status}")
+
+
+def shard_export_filters(pipeline: ExportPipeline, shard: ExportShard) -> dict:
+    """Filters that select exactly the logs of one shard
+
+    Shard ranges were planned from the pipeline's resolved filters, so they
+    already include any incremental watermark and replace the requested
+    time range.
+    """
+    filters = parse_export_filters(pipeline)
+    filters["start_time"] = shard.start_time
+    filters["end_time"] = shard.end_time
+    return filters
+
+
+def complete_export_shard(
+    db: Session,
+    pipeline: ExportPipeline,
+    shard: ExportShard,
+    attempt: int,
+    **values,
+) -> bool:
+    """Mark a shard DONE with values, count it towards its pipeline and commit
+
+    Only the attempt holding the shard can complete it, so a shard run twice
+    is counted once. The counter is incremented in the database, so workers
+    finishing shards of the same pipeline concurrently each see a distinct
+    value.
+
+    Returns:
+        bool: Whether this was the pipeline's last outstanding shard
+    """
+    completed = db.execute(
+        update(ExportShard)
+        .where(ExportShard.id == shard.id)
+        .where(ExportShard.attempt == attempt)
+        .where(ExportShard.status == "IN_PROGRESS")
+        .values(status="DONE", lease_expires_at=None, **values)
+    )
+    if completed.rowcount == 0:
+        db.rollback()
+        raise ExportShardLost(f"export {pipeline.id} shard {shard.id} was reclaimed")
+    shards_done, shard_count = db.execute(
+        update(ExportPipeline)
+        .where(ExportPipeline.id == pipeline.id)
+        .values(shards_done=ExportPipeline.shards_done + 1)
+        .returning(ExportPipeline.shards_done, ExportPipeline.shard_count)
+    ).one()
+    db.commit()
+    return shards_done == shard_count
+
+
+def build_export_manifest(pipeline: ExportPipeline, shards: list) -> dict:
+    """Manifest describing every part file of an export"""
+    return {
+        "export_id": str(pipeline.id),
+        "tenant_id": pipeline.tenant_id,
+        "format": pipeline.format,
+        "compression": pipeline.compression,
+        "filters": pipeline.filters,
+        "watermark": pipeline.watermark,
+        "row_count": sum(shard.row_count for shard in shards),
+        "parts": [
+            {
+                "index": shard.shard_index,
+                "key": shard.file_key,
+                "url": build_s3_url(settings.EXPORT_S3_BUCKET, shard.file_key),
+                "start_time": shard.start_time,
+                "end_time": shard.end_time,
+                "row_count": shard.row_count,
+                "bytes": shard.bytes,
+                "sha256": shard.sha256,
+            }
+            for shard in shards
+        ],
+    }
+
+
+def finalize_export_pipeline(db: Session, pipeline: ExportPipeline) -> bool:
+    """Upload the manifest of a pipeline whose shards are all done and commit
+
+    file_url points at the only part file of a single shard export and at
+    the manifest otherwise. The pipeline is only marked DONE while it is
+    still IN_PROGRESS, so a concurrent cancel is not overwritten.
+
+    Returns:
+        bool: Whether the pipeline was marked DONE
+    """
+    shards = (
+        db.query(ExportShard)
+        .filter_by(pipeline_id=pipeline.id)
+        .order_by(ExportShard.shard_index)
+        .all()
+    )
+    manifest_url = upload_json_to_s3(
+        build_export_manifest(pipeline, shards),
+        settings.EXPORT_S3_BUCKET,
+        export_manifest_key(pipeline),
+    )
+    if len(shards) == 1:
+        file_url = build_s3_url(settings.EXPORT_S3_BUCKET, shards[0].file_key)
+    else:
+        file_url = manifest_url
+    result = db.execute(
+        update(ExportPipeline)
+        .where(ExportPipeline.id == pipeline.id)
+        .where(ExportPipeline.status == "IN_PROGRESS")
+        .values(
+            manifest_url=manifest_url,
+            file_url=file_url,
+            status="DONE",
+            finished_at=_utcnow(),
+        )
+    )
+    db.commit()
+    db.refresh(pipeline)
+    return result.rowcount == 1
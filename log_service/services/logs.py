@@ -1,14 +1,43 @@
 """Audit log services"""
 
 from datetime import datetime, timedelta, timezone
-from typing import List
-from uuid import uuid4
+from typing import Iterator, List
 
+from sqlalchemy import Row, any_, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Session
 
+from core.config import settings
 from models.audit_logs import AuditLog
 from schemas.schemas import AuditLogCreate
 from services.masking import mask_sensitive_data
+from services.outbox import add_outbox_events
+from services.search import build_log_document
+from utils.ids import uuid7
+
+AUDIT_LOG_COLUMNS = {column.key for column in AuditLog.__table__.columns}
+
+# Columns written by exports, in output order
+EXPORT_COLUMNS = (
+    AuditLog.alid,
+    AuditLog.tenant_id,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.resource_type,
+    AuditLog.resource_id,
+    AuditLog.ip_address,
+    AuditLog.user_agent,
+    AuditLog.log_metadata,
+    AuditLog.severity,
+    AuditLog.created_at,
+)
+
+
+def _to_columns(log_data: dict) -> dict:
+    """Map masked payload keys onto audit_logs column names"""
+    row = {key: value for key, value in log_data.items() if key in AUDIT_LOG_COLUMNS}
+    row["log_metadata"] = log_data.get("metadata")
+    return row
 
 
 def create_log_entry(
@@ -18,8 +47,18 @@ def create_log_entry(
 ) -> AuditLog:
     """Create a log entry"""
     log_data = mask_sensitive_data(log.model_dump())
-    log_entry = AuditLog(**log_data, tenant_id=tenant_id, alid=uuid4())
+    log_entry = AuditLog(
+        **_to_columns(log_data),
+        tenant_id=tenant_id,
+        alid=uuid7(),
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+    )
     db.add(log_entry)
+    if settings.OUTBOX_ENABLED:
+        documents = None
+        if settings.LOG_MESSAGE_EMBED_DOCUMENT:
+            documents = [build_log_document(log_entry)]
+        add_outbox_events(db, tenant_id, [log_entry.alid], documents)
     db.commit()
     db.refresh(log_entry)
     return log_entry
@@ -38,32 +77,110 @@ def get_log_entry(db: Session, tenant_id: str, log_id: str) -> AuditLog:
     )
 
 
+def get_log_entries(db: Session, tenant_id: str, log_ids: List) -> List[AuditLog]:
+    """Get many log entries of a tenant with a single query
+
+    The IDs are bound as one uuid[] parameter to alid = ANY(...), so the
+    statement text is the same for any number of IDs.
+    """
+    if not log_ids:
+        return []
+    return (
+        db.query(AuditLog)
+        .filter(AuditLog.tenant_id == tenant_id)
+        .filter(AuditLog.alid == any_(literal(list(log_ids), ARRAY(UUID()))))
+        .all()
+    )
+
+
 def create_bulk_logs(
     db: Session,
     tenant_id: str,
     logs: List[AuditLogCreate],
 ) -> dict:
-    """Create bulk logs"""
-    log_ids = []
+    """Create bulk logs
+
+    The whole batch is masked and built in memory, then written with a single
+    multi-row INSERT inside one transaction. IDs are generated client side so
+    no per-row refresh is needed to read them back. When the outbox is
+    enabled the matching outbox events are written in the same transaction.
+    """
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
     for log in logs:
         log_data = mask_sensitive_data(log.model_dump())
-        log_entry = AuditLog(**log_data, tenant_id=tenant_id, alid=uuid4())
-        db.add(log_entry)
+        rows.append(
+            {
+                **_to_columns(log_data),
+                "alid": uuid7(),
+                "tenant_id": tenant_id,
+                "created_at": created_at,
+            }
+        )
+    log_ids = [row["alid"] for row in rows]
+    documents = None
+    if settings.LOG_MESSAGE_EMBED_DOCUMENT:
+        documents = [build_log_document(AuditLog(**row)) for row in rows]
+    if rows:
+        db.execute(insert(AuditLog), rows)
+        if settings.OUTBOX_ENABLED:
+            add_outbox_events(db, tenant_id, log_ids, documents)
         db.commit()
-        db.refresh(log_entry)
-        log_ids.append(log_entry.alid)
 
-    return {"affected_rows": len(log_ids), "log_ids": log_ids}
+    return {
+        "affected_rows": len(log_ids),
+        "log_ids": log_ids,
+        "documents": documents,
+    }
 
 
-def get_logs_for_export(db: Session, tenant_id: str) -> List[AuditLog]:
-    """Get logs for export"""
-    return (
-        db.query(AuditLog)
-        .filter(AuditLog.tenant_id == tenant_id)
-        .order_by(AuditLog.created_at.desc())
-        .all()
+def _filter_export_query(query, tenant_id: str, filters: dict):
+    """Apply a tenant and export filters to a select on audit_logs"""
+    filters = filters or {}
+    query = query.where(AuditLog.tenant_id == tenant_id)
+    if filters.get("start_time"):
+        query = query.where(AuditLog.created_at >= filters["start_time"])
+    if filters.get("end_time"):
+        query = query.where(AuditLog.created_at < filters["end_time"])
+    for key in ("action", "severity", "user_id"):
+        if filters.get(key):
+            query = query.where(getattr(AuditLog, key) == filters[key])
+    return query
+
+
+def get_logs_for_export(
+    db: Session,
+    tenant_id: str,
+    chunk_size: int = None,
+    columns: tuple = EXPORT_COLUMNS,
+    filters: dict = None,
+) -> Iterator[Row]:
+    """Stream logs for export
+
+    Rows are plain tuples of columns fetched from a server-side cursor
+    chunk_size at a time, so memory stays flat however many logs the tenant
+    has. filters may hold a start_time (inclusive) / end_time (exclusive)
+    range on created_at and exact action, severity and user_id matches. The
+    cursor lives on the session's connection; consume the iterator before
+    committing.
+    """
+    query = _filter_export_query(select(*columns), tenant_id, filters)
+    result = db.execute(
+        query.order_by(AuditLog.created_at.desc()),
+        execution_options={"yield_per": chunk_size or settings.EXPORT_CHUNK_SIZE},
     )
+    for chunk in result.partitions():
+        yield from chunk
+
+
+def get_export_bounds(db: Session, tenant_id: str, filters: dict = None) -> Row:
+    """Row count and created_at range of the logs an export would read"""
+    query = select(
+        func.count(),
+        func.min(AuditLog.created_at),
+        func.max(AuditLog.created_at),
+    )
+    return db.execute(_filter_export_query(query, tenant_id, filters)).one()
 
 
 def cleanup_old_logs(
@@ -71,12 +188,16 @@ def cleanup_old_logs(
     tenant_id: str,
     retention_days: int = 90,
 ):
-    """Cleanup old logs"""
+    """Cleanup old logs
+
+    Only the tenant's expired rows are deleted. Whole monthly partitions
+    past the global retention are dropped by maintain_partitions.py.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
     deleted = (
         db.query(AuditLog)
         .filter(AuditLog.tenant_id == tenant_id)
-        .filter(AuditLog.created_at < cutoff)
+        .filter(AuditLog.created_at < cutoff.replace(tzinfo=None))
         .delete(synchronize_session=False)
     )
     db.commit()
@@ -0,0 +1,87 @@
+"""Outbox service"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.outbox import OutboxEvent
+
+
+def add_outbox_events(
+    db: Session,
+    tenant_id: str,
+    log_ids: List,
+    documents: Optional[List[dict]] = None,
+) -> None:
+    """Stage outbox events in the caller's transaction (no commit)"""
+    documents = documents or [None] * len(log_ids)
+    db.add_all(
+        [
+            OutboxEvent(tenant_id=tenant_id, log_id=log_id, document=document)
+            for log_id, document in zip(log_ids, documents)
+        ]
+    )
+
+
+def claim_outbox_events(db: Session, limit: int) -> List[OutboxEvent]:
+    """Lock the oldest pending outbox events
+
+    Rows already locked by another relay are skipped, so several relays can
+    drain the table concurrently. Events waiting out a retry delay and dead
+    letters are skipped as well. Locks are held until the caller commits.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (
+        db.query(OutboxEvent)
+        .filter(OutboxEvent.attempts < settings.OUTBOX_MAX_ATTEMPTS)
+        .filter(OutboxEvent.available_at <= now)
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def group_outbox_events(events: List[OutboxEvent]) -> dict:
+    """Group outbox events by tenant"""
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[event.tenant_id].append(event)
+    return grouped
+
+
+def retry_outbox_events(events: List[OutboxEvent]) -> List[OutboxEvent]:
+    """Count a failed send and delay the next one (no commit)
+
+    The delay doubles with every attempt, starting at
+    OUTBOX_RETRY_BASE_SECONDS, so failing events stop holding back newer
+    ones.
+
+    Returns:
+        List[OutboxEvent]: Events that reached OUTBOX_MAX_ATTEMPTS and are
+        left in the table as dead letters
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    dead = []
+    for event in events:
+        event.attempts = (event.attempts or 0) + 1
+        event.available_at = now + timedelta(
+            seconds=settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (event.attempts - 1)
+        )
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            dead.append(event)
+    return dead
+
+
+def delete_outbox_events(db: Session, event_ids: List[int]) -> int:
+    """Delete relayed outbox events (no commit)"""
+    if not event_ids:
+        return 0
+    return (
+        db.query(OutboxEvent)
+        .filter(OutboxEvent.id.in_(event_ids))
+        .delete(synchronize_session=False)
+    )
@@ -0,0 +1,122 @@
+"""Audit log partition service"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.logging import log_service_logger
+
+logger = log_service_logger
+
+PARTITION_PREFIX = "audit_logs_p"
+PARTITION_SUFFIX_FORMAT = "%Y%m"
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing value"""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    """First instant of the month after the one starting at value"""
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(start: datetime) -> str:
+    """Name of the monthly audit_logs partition starting at start"""
+    return f"{PARTITION_PREFIX}{start.strftime(PARTITION_SUFFIX_FORMAT)}"
+
+
+def ensure_audit_log_partitions(db: Session, months_ahead: int) -> List[str]:
+    """Create the current and the next months_ahead monthly partitions
+
+    Missing months are created as tables of their own and then attached,
+    which only takes a SHARE UPDATE EXCLUSIVE lock on audit_logs, so
+    inserts and reads carry on meanwhile.
+
+    Returns:
+        List[str]: Names of the partitions that exist afterwards
+    """
+    existing = set(list_audit_log_partitions(db))
+    start = month_start(datetime.now(timezone.utc).replace(tzinfo=None))
+    names = []
+    for _ in range(months_ahead + 1):
+        end = next_month(start)
+        name = partition_name(start)
+        if name not in existing:
+            logger.info("Creating partition: partition:%s", name)
+            db.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} "
+                    "(LIKE audit_logs INCLUDING DEFAULTS)"
+                )
+            )
+            db.execute(
+                text(
+                    f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            db.commit()
+        names.append(name)
+        start = end
+    return names
+
+
+def list_audit_log_partitions(db, detach_pending: bool = False) -> List[str]:
+    """Names of the monthly partitions attached to audit_logs
+
+    With detach_pending, only partitions whose concurrent detach was
+    interrupted are listed.
+    """
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'audit_logs' "
+            "AND pg_inherits.inhdetachpending = :detach_pending"
+        ),
+        {"detach_pending": detach_pending},
+    ).scalars()
+    return sorted(name for name in rows if name.startswith(PARTITION_PREFIX))
+
+
+def drop_expired_audit_log_partitions(connection, cutoff: datetime) -> List[str]:
+    """Detach and drop every monthly partition that ends before cutoff
+
+    Partitions are shared by all tenants, so cutoff must come from the global
+    retention period. Partitions are detached CONCURRENTLY, which cannot run
+    in a transaction: connection must be in autocommit mode. A detach that
+    was interrupted is finished first.
+
+    Returns:
+        List[str]: Names of the dropped partitions
+    """
+    cutoff = cutoff.replace(tzinfo=None)
+    for name in list_audit_log_partitions(connection, detach_pending=True):
+        logger.info("Finishing interrupted detach: partition:%s", name)
+        connection.execute(
+            text(f"ALTER TABLE audit_logs DETACH PARTITION {name} FINALIZE")
+        )
+        connection.execute(text(f"DROP TABLE {name}"))
+
+    dropped = []
+    for name in list_audit_log_partitions(connection):
+        suffix = name[len(PARTITION_PREFIX) :]
+        try:
+            start = datetime.strptime(suffix, PARTITION_SUFFIX_FORMAT)
+        except ValueError:
+            continue
+        if next_month(start) > cutoff:
+            continue
+
+        logger.info("Dropping expired partition: partition:%s", name)
+        connection.execute(
+            text(f"ALTER TABLE audit_logs DETACH PARTITION {name} CONCURRENTLY")
+        )
+        connection.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
@@ -1,17 +1,155 @@
 """Search service"""
 
+import threading
 from datetime import datetime, timedelta, timezone
+from typing import List
 
-from infra.opensearch import get_opensearch_client
+from opensearchpy.exceptions import NotFoundError, RequestError
+
+from core.config import settings
+from core.logging import log_service_logger
+from infra.opensearch import get_async_opensearch_client, get_opensearch_client
 from models import AuditLog
+from utils.strutils import decode_cursor, encode_cursor
 
+logger = log_service_logger
 
-def index_log_to_opensearch(log: AuditLog):
-    """Index log to opensearch"""
+LOG_INDEX_TEMPLATE_NAME = "logs"
+# Bump whenever the template body changes so running services reinstall it
+LOG_INDEX_TEMPLATE_VERSION = 1
+
+# Newest first, with the document ID as a tiebreaker for search_after
+SEARCH_SORT = [
+    {"created_at": {"order": "desc"}},
+    {"id": {"order": "desc"}},
+]
+PIT_KEEP_ALIVE = "5m"
+
+# Backing index suffix per OPENSEARCH_INDEX_PERIOD
+INDEX_PERIOD_FORMATS = {"daily": "%Y.%m.%d", "monthly": "%Y.%m"}
+
+_ensured_indices = set()
+_ensured_indices_lock = threading.Lock()
+
+
+def log_read_alias(tenant_id: str) -> str:
+    """Alias spanning every backing index of a tenant"""
+    return f"logs-{tenant_id}"
+
+
+def log_backing_index(tenant_id: str, created_at: datetime) -> str:
+    """Time-partitioned index a log created at created_at belongs to"""
+    period_format = INDEX_PERIOD_FORMATS[settings.OPENSEARCH_INDEX_PERIOD]
+    return f"logs-{tenant_id}-{created_at.strftime(period_format)}"
+
+
+def _period_end(suffix: str) -> datetime:
+    """End of the period covered by a backing index suffix, or None"""
+    try:
+        start = datetime.strptime(suffix, INDEX_PERIOD_FORMATS["daily"])
+        return (start + timedelta(days=1)).replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        start = datetime.strptime(suffix, INDEX_PERIOD_FORMATS["monthly"])
+    except ValueError:
+        return None
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month.replace(tzinfo=timezone.utc)
+
+
+def ensure_log_index(client, tenant_id: str, index_name: str):
+    """Create a backing index attached to the tenant read alias
+
+    Each index is only checked once per process.
+    """
+    if index_name in _ensured_indices:
+        return
+    alias = log_read_alias(tenant_id)
+    try:
+        client.indices.create(index=index_name, body={"aliases": {alias: {}}})
+    except RequestError as e:
+        if e.error != "resource_already_exists_exception":
+            raise
+        client.indices.put_alias(index=index_name, name=alias)
+    with _ensured_indices_lock:
+        _ensured_indices.add(index_name)
+
+
+def build_log_index_template() -> dict:
+    """Build the index template applied to every logs-* index
+
+    Filter, sort and aggregation fields are keywords backed by doc values and
+    created_at is a real date. The free-form state objects are flat_object
+    so arbitrary keys cannot grow the mapping.
+    """
+    return {
+        "index_patterns": ["logs-*"],
+        "version": LOG_INDEX_TEMPLATE_VERSION,
+        "priority": 100,
+        "template": {
+            "settings": {
+                "number_of_shards": settings.OPENSEARCH_INDEX_SHARDS,
+                "number_of_replicas": settings.OPENSEARCH_INDEX_REPLICAS,
+                "refresh_interval": settings.OPENSEARCH_REFRESH_INTERVAL,
+            },
+            "mappings": {
+                "dynamic": False,
+                "properties": {
+                    "id": {"type": "keyword"},
+                    "tenant_id": {"type": "keyword"},
+                    "user_id": {"type": "keyword"},
+                    "action": {"type": "keyword"},
+                    "resource_type": {"type": "keyword"},
+                    "resource_id": {"type": "keyword"},
+                    "ip_address": {"type": "keyword"},
+                    "user_agent": {
+                        "type": "text",
+                        "fields": {"keyword": {"type": "keyword", "ignore_above": 512}},
+                    },
+                    "log_metadata": {"type": "flat_object"},
+                    "before_state": {"type": "flat_object"},
+                    "after_state": {"type": "flat_object"},
+                    "severity": {"type": "keyword"},
+                    "created_at": {"type": "date"},
+                },
+            },
+        },
+    }
+
+
+def install_log_index_template() -> bool:
+    """Install the log index template unless an equal or newer one exists
+
+    Returns:
+        bool: True if the template was installed or updated
+    """
     client = get_opensearch_client()
-    index_name = f"logs-{log.tenant_id}"
+    try:
+        response = client.indices.get_index_template(name=LOG_INDEX_TEMPLATE_NAME)
+        installed = response["index_templates"][0]["index_template"].get("version")
+    except NotFoundError:
+        installed = None
+
+    if installed is not None and installed >= LOG_INDEX_TEMPLATE_VERSION:
+        return False
+
+    logger.info(
+        "Installing index template: name:%s, version:%s, installed:%s",
+        LOG_INDEX_TEMPLATE_NAME,
+        LOG_INDEX_TEMPLATE_VERSION,
+        installed,
+    )
+    client.indices.put_index_template(
+        name=LOG_INDEX_TEMPLATE_NAME,
+        body=build_log_index_template(),
+    )
+    return True
 
-    doc = {
+
+def build_log_document(log: AuditLog) -> dict:
+    """Build the OpenSearch document for a log"""
+    return {
         "id": str(log.alid),
         "tenant_id": log.tenant_id,
         "user_id": log.user_id,
@@ -27,15 +165,70 @@ def index_log_to_opensearch(log: AuditLog):
         "created_at": log.created_at.isoformat(),
     }
 
+
+def index_document_to_opensearch(doc: dict):
+    """Index a prebuilt log document to opensearch"""
+    client = get_opensearch_client()
+    index_name = log_backing_index(
+        doc["tenant_id"], datetime.fromisoformat(doc["created_at"])
+    )
+    ensure_log_index(client, doc["tenant_id"], index_name)
     client.index(index=index_name, id=doc["id"], body=doc)
 
 
-def search_logs(tenant_id: str, filters: dict) -> dict:
-    """Search logs in opensearch"""
+def bulk_index_documents(docs: List[dict]) -> List[str]:
+    """Index many prebuilt log documents with one _bulk request
+
+    Returns:
+        List[str]: IDs of the documents that failed to index
+    """
+    if not docs:
+        return []
     client = get_opensearch_client()
-    index_name = f"logs-{tenant_id}"
+    body = []
+    for doc in docs:
+        index_name = log_backing_index(
+            doc["tenant_id"], datetime.fromisoformat(doc["created_at"])
+        )
+        ensure_log_index(client, doc["tenant_id"], index_name)
+        body.append({"index": {"_index": index_name, "_id": doc["id"]}})
+        body.append(doc)
+
+    response = client.bulk(body=body)
+    if not response.get("errors"):
+        return []
+    return [
+        item["index"]["_id"]
+        for item in response["items"]
+        if item["index"].get("status", 500) >= 300
+    ]
+
+
+def index_log_to_opensearch(log: AuditLog):
+    """Index log to opensearch"""
+    index_document_to_opensearch(build_log_document(log))
+
+
+def encode_log_cursor(state: dict, tenant_id: str) -> str:
+    """Signed list cursor that only verifies for tenant_id"""
+    secret = settings.CURSOR_SECRET or settings.JWT_SECRET
+    return encode_cursor(state, secret, context=tenant_id)
+
+
+def decode_log_cursor(cursor: str, tenant_id: str) -> tuple[dict, str]:
+    """Verify and decode a list cursor issued to tenant_id"""
+    secret = settings.CURSOR_SECRET or settings.JWT_SECRET
+    return decode_cursor(cursor, secret, context=tenant_id)
+
+
+async def search_logs(tenant_id: str, filters: dict) -> dict:
+    """Search logs in opensearch"""
+    client = get_async_opensearch_client()
+    index_name = log_read_alias(tenant_id)
 
     must_clauses = []
+    # PIT searches name no index, so the tenant is always filtered explicitly
+    filter_clauses = [{"term": {"tenant_id": tenant_id}}]
 
     if filters.get("action"):
         must_clauses.append({"term": {"action": filters["action"]}})
@@ -55,24 +248,53 @@ def search_logs(tenant_id: str, filters: dict) -> dict:
             }
         )
 
+    page_size = filters.get("page_size", 10)
     body = {
-        "query": {"bool": {"must": must_clauses}},
-        "from": (filters.get("page", 1) - 1) * filters.get("page_size", 10),
-        "size": filters.get("page_size", 10),
-        "sort": [{"timestamp": {"order": "desc"}}],
+        "query": {"bool": {"must": must_clauses, "filter": filter_clauses}},
+        "size": page_size,
+        "sort": SEARCH_SORT,
     }
 
-    result = client.search(index=index_name, body=body)
+    # Cursor pages continue after the last hit of the previous page; page
+    # numbers are only used for the first request
+    cursor = filters.get("cursor") or {}
+    if cursor.get("search_after"):
+        body["search_after"] = cursor["search_after"]
+    elif not cursor:
+        body["from"] = (filters.get("page", 1) - 1) * page_size
+
+    pit_id = cursor.get("pit_id")
+    if not pit_id and filters.get("pit"):
+        pit = await client.create_pit(index=index_name, keep_alive=PIT_KEEP_ALIVE)
+        pit_id = pit["pit_id"]
+
+    if pit_id:
+        # Point-in-time searches must not name an index
+        body["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+        result = await client.search(body=body)
+        pit_id = result.get("pit_id", pit_id)
+    else:
+        result = await client.search(index=index_name, body=body)
+
+    hits = result["hits"]["hits"]
+    next_cursor = None
+    if len(hits) == page_size and "sort" in hits[-1]:
+        state = {"search_after": hits[-1]["sort"]}
+        if pit_id:
+            state["pit_id"] = pit_id
+        next_cursor = encode_log_cursor(state, tenant_id)
+
     return {
         "total": result["hits"]["total"]["value"],
-        "logs": [hit["_source"] for hit in result["hits"]["hits"]],
+        "logs": [hit["_source"] for hit in hits],
+        "next_cursor": next_cursor,
     }
 
 
-def get_log_stats_opensearch(tenant_id: str):
+async def get_log_stats_opensearch(tenant_id: str):
     """Get log stats from opensearch"""
-    client = get_opensearch_client()
-    index = f"logs-{tenant_id}"
+    client = get_async_opensearch_client()
+    index = log_read_alias(tenant_id)
 
     body = {
         "size": 0,
@@ -83,7 +305,7 @@ def get_log_stats_opensearch(tenant_id: str):
     }
 
     try:
-        response = client.search(index=index, body=body)
+        response = await client.search(index=index, body=body)
         aggregations = response["aggregations"]
         return {
             "action_counts": aggregations["by_action"]["buckets"],
@@ -93,22 +315,33 @@ def get_log_stats_opensearch(tenant_id: str):
         raise RuntimeError(f"Failed to get stats from OpenSearch: {e}") from e
 
 
-def delete_old_logs_in_opensearch(tenant_id: str, days: int = 90):
-    """Delete old logs in opensearch"""
-    client = get_opensearch_client()
-    index_name = f"logs-{tenant_id}"
-    threshold_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-    query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {"term": {"tenant_id": tenant_id}},
-                    {"range": {"timestamp": {"lt": threshold_date}}},
-                ]
-            }
-        }
-    }
+async def delete_old_logs_in_opensearch(tenant_id: str, days: int = 90):
+    """Delete old logs in opensearch
+
+    Retention drops whole backing indices whose period ended before the
+    cutoff, so the cost does not depend on how many documents expire.
+    """
+    client = get_async_opensearch_client()
+    alias = log_read_alias(tenant_id)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    try:
+        indices = await client.indices.get_alias(name=alias)
+    except NotFoundError:
+        return {"deleted_indices": []}
+
+    prefix = f"{alias}-"
+    expired = []
+    for index_name in sorted(indices):
+        if not index_name.startswith(prefix):
+            continue
+        period_end = _period_end(index_name[len(prefix) :])
+        if period_end is not None and period_end <= cutoff:
+            expired.append(index_name)
 
-    response = client.delete_by_query(index=index_name, body=query)
-    return response
+    if expired:
+        logger.info("Deleting expired log indices: indices:%s", expired)
+        await client.indices.delete(index=",".join(expired))
+        with _ensured_indices_lock:
+            _ensured_indices.difference_update(expired)
+    return {"deleted_indices": expired}
@@ -1,16 +1,19 @@
 """Test auth middleware"""
 
+import time
+from unittest.mock import patch
+
 import jwt
 from fastapi import FastAPI
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 from starlette.testclient import TestClient
 
-from core.auth import AuthMiddleware
+from core.auth import AuthMiddleware, TokenCache
 from core.config import settings
 
 
-def create_test_app():
+def create_test_app(cache: TokenCache = None):
     """Create a test app"""
     app = FastAPI()
 
@@ -18,10 +21,15 @@ def create_test_app():
     async def abcxyz(request: Request):
         return JSONResponse(content={"user": request.state.user})
 
-    app.add_middleware(AuthMiddleware)
+    app.add_middleware(AuthMiddleware, cache=cache or TokenCache(100, 300))
     return app
 
 
+def _token(**claims) -> str:
+    payload = {"user_id": "123", "tenant_id": "tenant-abc", **claims}
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
 def test_auth_middleware_valid_token():
     """Test auth middleware with valid token"""
     # Arrange
@@ -66,3 +74,55 @@ def test_auth_middleware_invalid_token():
     assert response.status_code == 200
     user = response.json()["user"]
     assert user == {}  # fallback if JWT decoding fails
+
+
+def test_auth_middleware_caches_verified_tokens():
+    """Test a reused token is only decoded once"""
+    # Arrange
+    cache = TokenCache(100, 300)
+    client = TestClient(create_test_app(cache))
+    headers = {"Authorization": f"Bearer {_token()}"}
+
+    # Act
+    with patch("core.auth.jwt.decode", wraps=jwt.decode) as mock_decode:
+        responses = [client.get("/abcxyz", headers=headers) for _ in range(3)]
+
+    # Assert
+    assert [r.json()["user"]["user_id"] for r in responses] == ["123"] * 3
+    mock_decode.assert_called_once()
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_auth_middleware_does_not_cache_invalid_tokens():
+    """Test invalid tokens are rejected on every request"""
+    cache = TokenCache(100, 300)
+    client = TestClient(create_test_app(cache))
+
+    for _ in range(2):
+        response = client.get("/abcxyz", headers={"Authorization": "Bearer bad"})
+        assert response.json()["user"] == {}
+
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_evicts_at_exp():
+    """Test cached tokens expire with their exp claim"""
+    cache = TokenCache(100, 300)
+    cache.put("token", {"exp": time.time() - 1})
+
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_is_bounded_lru():
+    """Test the least recently used token is evicted first"""
+    cache = TokenCache(2, 300)
+    cache.put("a", {"user_id": "a"})
+    cache.put("b", {"user_id": "b"})
+    cache.get("a")
+    cache.put("c", {"user_id": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"user_id": "a"}
+    assert cache.get("c") == {"user_id": "c"}
@@ -0,0 +1,39 @@
+"""Test helpers"""
+
+import time
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+from infra.cache import CacheBackend
+
+
+def mock_async_session(db: MagicMock = None) -> MagicMock:
+    """Mock AsyncSession whose run_sync calls the service with the mock itself
+
+    Lets API tests assert service calls as service(mock_db, *args).
+    """
+    db = db or MagicMock()
+    db.run_sync = AsyncMock(
+        side_effect=lambda service, *args, **kwargs: service(db, *args, **kwargs)
+    )
+    return db
+
+
+class InMemoryBackend(CacheBackend):
+    """Process-local stand-in for a shared cache backend"""
+
+    def __init__(self):
+        self._values = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._values[key] = (time.monotonic() + ttl, value)
@@ -0,0 +1,78 @@
+"""Test caches"""
+
+from unittest.mock import patch
+
+import pytest
+
+from infra.cache import CacheBackend, LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test LRU cache keeps at most max_size entries"""
+    # Arrange
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    # Act
+    cache.put("c", 3)
+
+    # Assert
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["size"] == 2
+
+
+@patch("infra.cache.time.monotonic")
+def test_lru_cache_expires_entries(mock_monotonic):
+    """Test LRU cache drops entries older than the TTL"""
+    # Arrange
+    cache = LRUCache(max_size=10, ttl=60)
+    mock_monotonic.return_value = 1000.0
+    cache.put("a", 1)
+
+    # Act
+    mock_monotonic.return_value = 1061.0
+    value = cache.get("a")
+
+    # Assert
+    assert value is None
+    assert cache.stats() == {
+        "size": 0,
+        "max_size": 10,
+        "hits": 0,
+        "misses": 1,
+        "hit_ratio": 0.0,
+    }
+
+
+@patch("infra.cache.time.monotonic")
+def test_lru_cache_put_with_ttl(mock_monotonic):
+    """Test a per-entry TTL overrides the cache TTL"""
+    # Arrange
+    cache = LRUCache(max_size=10, ttl=60)
+    mock_monotonic.return_value = 1000.0
+    cache.put("short", 1, ttl=5)
+    cache.put("long", 2)
+    cache.put("expired", 3, ttl=0)
+
+    # Act
+    mock_monotonic.return_value = 1006.0
+
+    # Assert
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.get("expired") is None
+
+
+def test_cache_backend_is_abstract():
+    """Test shared backends must implement get and set"""
+
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key: str):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()  # pylint: disable=abstract-class-instantiated
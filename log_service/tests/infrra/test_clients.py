@@ -0,0 +1,106 @@
+"""Test shared clients"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from opensearchpy import OpenSearch
+
+from infra.clients import ClientRegistry
+
+
+def test_client_registry_reuses_client():
+    """Test client registry creates each client once"""
+    # Arrange
+    registry = ClientRegistry()
+    factory = MagicMock(side_effect=lambda: MagicMock())
+
+    # Act
+    first = registry.get("sqs", factory)
+    second = registry.get("sqs", factory)
+
+    # Assert
+    assert first is second
+    factory.assert_called_once()
+
+
+def test_client_registry_close():
+    """Test client registry closes and forgets clients"""
+    # Arrange
+    registry = ClientRegistry()
+    client = MagicMock()
+    client.close.side_effect = RuntimeError("boom")
+    other = MagicMock()
+    registry.get("sqs", lambda: client)
+    registry.get("s3", lambda: other)
+
+    # Act
+    registry.close()
+
+    # Assert
+    client.close.assert_called_once()
+    other.close.assert_called_once()
+    assert registry.stats() == {}
+
+
+def test_client_registry_aget_reuses_client():
+    """Test client registry awaits an async factory once"""
+    # Arrange
+    registry = ClientRegistry()
+    client = AsyncMock()
+    factory = AsyncMock(return_value=client)
+
+    async def get_twice():
+        return await registry.aget("sqs_async", factory), await registry.aget(
+            "sqs_async", factory
+        )
+
+    # Act
+    first, second = asyncio.run(get_twice())
+
+    # Assert
+    assert first is second is client
+    factory.assert_awaited_once()
+
+
+def test_client_registry_aclose():
+    """Test client registry awaits async close and calls sync close"""
+    # Arrange
+    registry = ClientRegistry()
+    async_client = AsyncMock()
+    sync_client = MagicMock()
+    registry.get("opensearch", lambda: sync_client)
+
+    async def create():
+        return async_client
+
+    asyncio.run(registry.aget("sqs_async", create))
+
+    # Act
+    asyncio.run(registry.aclose())
+
+    # Assert
+    async_client.close.assert_awaited_once()
+    sync_client.close.assert_called_once()
+    assert registry.stats() == {}
+
+
+def test_client_registry_stats():
+    """Test client registry reports connection pool utilization"""
+    # Arrange
+    registry = ClientRegistry()
+    registry.get(
+        "opensearch",
+        lambda: OpenSearch(hosts=[{"host": "localhost", "port": 9200}], pool_maxsize=7),
+    )
+
+    # Act
+    stats = registry.stats()
+
+    # Assert
+    assert stats["opensearch"] == {
+        "pools": 1,
+        "max_size": 7,
+        "in_use": 0,
+        "created": 0,
+        "requests": 0,
+    }
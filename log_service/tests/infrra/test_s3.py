@@ -0,0 +1,140 @@
+"""Test S3"""
+
+import hashlib
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infra.s3 import S3_MIN_PART_SIZE, S3MultipartWriter, upload_json_to_s3
+
+
+def _mock_s3(mock_get_client):
+    mock_s3 = MagicMock()
+    mock_s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    mock_s3.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f"etag-{kwargs['PartNumber']}"
+    }
+    mock_get_client.return_value = mock_s3
+    return mock_s3
+
+
+@patch("infra.s3.get_s3_client")
+def test_multipart_writer_uploads_full_parts(mock_get_client):
+    """Test multipart writer uploads a part whenever the buffer fills"""
+    # Arrange
+    mock_s3 = _mock_s3(mock_get_client)
+    chunk = b"x" * (S3_MIN_PART_SIZE // 2)
+
+    # Act
+    with S3MultipartWriter(
+        "bucket", "exports/tenant_logs.csv", part_size=S3_MIN_PART_SIZE
+    ) as upload:
+        for _ in range(5):
+            upload.write(chunk)
+
+    # Assert
+    bodies = [call[1]["Body"] for call in mock_s3.upload_part.call_args_list]
+    assert [len(body) for body in bodies] == [
+        S3_MIN_PART_SIZE,
+        S3_MIN_PART_SIZE,
+        S3_MIN_PART_SIZE // 2,
+    ]
+    assert upload.bytes_written == len(chunk) * 5
+    assert upload.sha256 == hashlib.sha256(chunk * 5).hexdigest()
+    assert upload.file_key == "exports/tenant_logs.csv"
+    assert upload.url.endswith(upload.file_key)
+    mock_s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="bucket",
+        Key=upload.file_key,
+        UploadId="upload-1",
+        MultipartUpload={
+            "Parts": [
+                {"ETag": "etag-1", "PartNumber": 1},
+                {"ETag": "etag-2", "PartNumber": 2},
+                {"ETag": "etag-3", "PartNumber": 3},
+            ]
+        },
+    )
+    mock_s3.abort_multipart_upload.assert_not_called()
+
+
+@patch("infra.s3.get_s3_client")
+def test_multipart_writer_empty_upload(mock_get_client):
+    """Test multipart writer completes an empty upload with one empty part"""
+    mock_s3 = _mock_s3(mock_get_client)
+
+    with S3MultipartWriter("bucket", "empty.csv"):
+        pass
+
+    mock_s3.upload_part.assert_called_once()
+    assert mock_s3.upload_part.call_args[1]["Body"] == b""
+    mock_s3.complete_multipart_upload.assert_called_once()
+
+
+@patch("infra.s3.get_s3_client")
+def test_multipart_writer_aborts_on_error(mock_get_client):
+    """Test multipart writer aborts instead of completing when writing fails"""
+    # Arrange
+    mock_s3 = _mock_s3(mock_get_client)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        with S3MultipartWriter("bucket", "tenant_logs.csv") as upload:
+            upload.write(b"partial")
+            raise RuntimeError("database went away")
+
+    # Assert
+    mock_s3.complete_multipart_upload.assert_not_called()
+    mock_s3.abort_multipart_upload.assert_called_once_with(
+        Bucket="bucket", Key=upload.file_key, UploadId="upload-1"
+    )
+    assert upload.closed
+    with pytest.raises(ValueError):
+        upload.write(b"more")
+
+
+@patch("infra.s3.get_s3_client")
+def test_multipart_writer_aborts_when_complete_fails(mock_get_client):
+    """Test multipart writer aborts if completing the upload fails"""
+    mock_s3 = _mock_s3(mock_get_client)
+    mock_s3.complete_multipart_upload.side_effect = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        with S3MultipartWriter("bucket", "tenant_logs.csv") as upload:
+            upload.write(b"data")
+
+    mock_s3.abort_multipart_upload.assert_called_once()
+
+
+@patch("infra.s3.get_s3_client")
+def test_multipart_writer_content_headers(mock_get_client):
+    """Test multipart writer sets Content-Type and Content-Encoding"""
+    mock_s3 = _mock_s3(mock_get_client)
+
+    with S3MultipartWriter(
+        "bucket",
+        "tenant_logs.csv.gz",
+        content_type="text/csv",
+        content_encoding="gzip",
+    ):
+        pass
+
+    kwargs = mock_s3.create_multipart_upload.call_args[1]
+    assert kwargs["ContentType"] == "text/csv"
+    assert kwargs["ContentEncoding"] == "gzip"
+
+
+@patch("infra.s3.get_s3_client")
+def test_upload_json_to_s3(mock_get_client):
+    """Test upload JSON to S3 puts a JSON object and returns its URL"""
+    mock_s3 = MagicMock()
+    mock_get_client.return_value = mock_s3
+
+    url = upload_json_to_s3({"parts": [1, 2]}, "bucket", "exports/manifest.json")
+
+    kwargs = mock_s3.put_object.call_args[1]
+    assert kwargs["Key"] == "exports/manifest.json"
+    assert kwargs["ContentType"] == "application/json"
+    assert json.loads(kwargs["Body"]) == {"parts": [1, 2]}
+    assert url.endswith("/exports/manifest.json")
@@ -1,9 +1,24 @@
 """Test SQS"""
 
+import asyncio
 import json
-from unittest.mock import MagicMock, patch
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from infra.sqs import send_to_export_queue, send_to_log_queue
+from core.config import settings
+from infra.sqs import (
+    SQS_BATCH_RETRY_BASE_SECONDS,
+    SQS_MAX_MESSAGE_BYTES,
+    VisibilityHeartbeat,
+    build_log_message,
+    decode_log_document,
+    send_batch_to_log_queue,
+    send_batch_to_log_queue_async,
+    send_to_export_queue,
+    send_to_export_queue_async,
+    send_to_log_queue,
+    send_to_log_queue_async,
+)
 
 
 @patch("infra.sqs.get_sqs_client")
@@ -27,6 +42,132 @@ def test_send_to_log_queue(mock_get_client):
     )
 
 
+def test_build_log_message_without_document():
+    """Test build log message keeps ID-only messages unchanged"""
+    body = json.loads(build_log_message("log-123", "tenant-abc"))
+
+    assert body == {"log_id": "log-123", "tenant_id": "tenant-abc"}
+    assert decode_log_document(body) is None
+
+
+def test_build_log_message_with_document():
+    """Test build log message embeds small documents as-is"""
+    document = {"id": "log-123", "tenant_id": "tenant-abc", "action": "LOGIN"}
+
+    body = json.loads(build_log_message("log-123", "tenant-abc", document))
+
+    assert body["document"] == document
+    assert decode_log_document(body) == document
+
+
+@patch.object(settings, "LOG_MESSAGE_COMPRESS_BYTES", 16)
+def test_build_log_message_compresses_large_document():
+    """Test build log message compresses large documents"""
+    document = {"id": "log-123", "user_agent": "Mozilla/5.0 " * 50}
+
+    body = json.loads(build_log_message("log-123", "tenant-abc", document))
+
+    assert "document" not in body
+    assert len(body["document_gz"]) < len(json.dumps(document))
+    assert decode_log_document(body) == document
+
+
+def test_build_log_message_drops_oversized_document():
+    """Test build log message falls back to an ID-only message"""
+    document = {"id": "log-123", "payload": os.urandom(200 * 1024).hex()}
+
+    body = build_log_message("log-123", "tenant-abc", document)
+
+    assert len(body.encode("utf-8")) <= SQS_MAX_MESSAGE_BYTES
+    assert json.loads(body) == {"log_id": "log-123", "tenant_id": "tenant-abc"}
+
+
+@patch("infra.sqs.get_sqs_client")
+def test_send_batch_to_log_queue(mock_get_client):
+    """Test send batch to log queue"""
+    # Arrange
+    mock_sqs = MagicMock()
+    mock_get_client.return_value = mock_sqs
+    mock_sqs.send_message_batch.return_value = {"Failed": []}
+
+    log_ids = [f"log-{i}" for i in range(25)]
+
+    # Act
+    failed = send_batch_to_log_queue(log_ids, "tenant-abc")
+
+    # Assert
+    assert failed == []
+    mock_get_client.assert_called_once()
+    assert mock_sqs.send_message_batch.call_count == 3
+    entries = mock_sqs.send_message_batch.call_args_list[0][1]["Entries"]
+    assert len(entries) == 10
+    assert json.loads(entries[0]["MessageBody"]) == {
+        "log_id": "log-0",
+        "tenant_id": "tenant-abc",
+    }
+
+
+@patch("infra.sqs.random.uniform", side_effect=lambda low, high: high)
+@patch("infra.sqs.time.sleep")
+@patch("infra.sqs.get_sqs_client")
+def test_send_batch_to_log_queue_retries_failed_entries(
+    mock_get_client, mock_sleep, _mock_uniform
+):
+    """Test send batch to log queue retries only failed entries with backoff"""
+    # Arrange
+    mock_sqs = MagicMock()
+    mock_get_client.return_value = mock_sqs
+    mock_sqs.send_message_batch.side_effect = [
+        {"Failed": [{"Id": "1"}, {"Id": "2"}]},
+        {"Failed": [{"Id": "2"}]},
+        {"Failed": [{"Id": "2"}]},
+    ]
+
+    # Act
+    failed = send_batch_to_log_queue(["log-0", "log-1", "log-2"], "tenant-abc")
+
+    # Assert
+    assert failed == ["log-2"]
+    assert mock_sqs.send_message_batch.call_count == 3
+    retried = mock_sqs.send_message_batch.call_args_list[1][1]["Entries"]
+    assert [entry["Id"] for entry in retried] == ["1", "2"]
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [
+        SQS_BATCH_RETRY_BASE_SECONDS,
+        SQS_BATCH_RETRY_BASE_SECONDS * 2,
+    ]
+
+
+@patch("infra.sqs.time.sleep")
+@patch("infra.sqs.get_sqs_client")
+def test_send_batch_to_log_queue_retries_raising_calls_per_chunk(
+    mock_get_client, mock_sleep
+):
+    """Test a raising call is retried and later chunks are still sent"""
+    # Arrange
+    mock_sqs = MagicMock()
+    mock_get_client.return_value = mock_sqs
+    mock_sqs.send_message_batch.side_effect = [
+        ConnectionError("reset"),
+        {"Failed": [{"Id": "3"}]},
+        {"Failed": []},
+        {"Failed": []},
+    ]
+    log_ids = [f"log-{index}" for index in range(12)]
+
+    # Act
+    failed = send_batch_to_log_queue(log_ids, "tenant-abc")
+
+    # Assert
+    assert failed == []
+    batches = [
+        [entry["Id"] for entry in call[1]["Entries"]]
+        for call in mock_sqs.send_message_batch.call_args_list
+    ]
+    first_chunk = [str(index) for index in range(10)]
+    assert batches == [first_chunk, first_chunk, ["3"], ["10", "11"]]
+    assert mock_sleep.call_count == 2
+
+
 @patch("infra.sqs.get_sqs_client")
 def test_send_to_export_queue(mock_get_client):
     """Test send to export queue"""
@@ -46,3 +187,101 @@ def test_send_to_export_queue(mock_get_client):
         QueueUrl=mock_get_client.return_value.send_message.call_args[1]["QueueUrl"],
         MessageBody=json.dumps({"export_id": export_id, "tenant_id": tenant_id}),
     )
+
+
+@patch("infra.sqs.get_sqs_client")
+def test_send_to_export_queue_shard(mock_get_client):
+    """Test send to export queue includes the shard index"""
+    mock_sqs = MagicMock()
+    mock_get_client.return_value = mock_sqs
+
+    send_to_export_queue("export-456", "tenant-xyz", shard=0)
+
+    body = json.loads(mock_sqs.send_message.call_args[1]["MessageBody"])
+    assert body == {"export_id": "export-456", "tenant_id": "tenant-xyz", "shard": 0}
+
+
+@patch("infra.sqs.get_async_sqs_client")
+def test_send_to_log_queue_async(mock_get_client):
+    """Test send to log queue from the event loop"""
+    # Arrange
+    mock_sqs = AsyncMock()
+    mock_get_client.return_value = mock_sqs
+
+    # Act
+    asyncio.run(send_to_log_queue_async("log-123", "tenant-abc"))
+
+    # Assert
+    mock_sqs.send_message.assert_awaited_once_with(
+        QueueUrl=settings.SQS_LOG_QUEUE_URL,
+        MessageBody=json.dumps({"log_id": "log-123", "tenant_id": "tenant-abc"}),
+    )
+
+
+@patch("infra.sqs.asyncio.sleep", new_callable=AsyncMock)
+@patch("infra.sqs.get_async_sqs_client")
+def test_send_batch_to_log_queue_async_retries_failed_entries(
+    mock_get_client, mock_sleep
+):
+    """Test async batch send chunks and retries like the sync one"""
+    # Arrange
+    mock_sqs = AsyncMock()
+    mock_get_client.return_value = mock_sqs
+    mock_sqs.send_message_batch.side_effect = [
+        {"Failed": [{"Id": "3"}]},
+        {"Failed": []},
+        {"Failed": []},
+    ]
+    log_ids = [f"log-{i}" for i in range(12)]
+
+    # Act
+    failed = asyncio.run(send_batch_to_log_queue_async(log_ids, "tenant-abc"))
+
+    # Assert
+    assert failed == []
+    assert mock_sqs.send_message_batch.await_count == 3
+    retried = mock_sqs.send_message_batch.call_args_list[1][1]["Entries"]
+    assert [entry["Id"] for entry in retried] == ["3"]
+    mock_sleep.assert_awaited_once()
+    assert 0 <= mock_sleep.await_args[0][0] <= SQS_BATCH_RETRY_BASE_SECONDS
+
+
+@patch("infra.sqs.get_async_sqs_client")
+def test_send_to_export_queue_async(mock_get_client):
+    """Test send to export queue from the event loop"""
+    # Arrange
+    mock_sqs = AsyncMock()
+    mock_get_client.return_value = mock_sqs
+
+    # Act
+    asyncio.run(send_to_export_queue_async("export-456", "tenant-xyz", shard=1))
+
+    # Assert
+    body = json.loads(mock_sqs.send_message.call_args[1]["MessageBody"])
+    assert body == {"export_id": "export-456", "tenant_id": "tenant-xyz", "shard": 1}
+
+
+@patch("infra.sqs.get_sqs_client")
+def test_visibility_heartbeat_extends_tracked_messages(mock_get_client):
+    """Test visibility heartbeat extends only tracked messages"""
+    # Arrange
+    mock_sqs = MagicMock()
+    mock_get_client.return_value = mock_sqs
+    mock_sqs.change_message_visibility_batch.return_value = {"Failed": []}
+    heartbeat = VisibilityHeartbeat("queue-url", 60)
+    messages = [{"MessageId": f"m-{i}", "ReceiptHandle": f"h-{i}"} for i in range(12)]
+    heartbeat.track(messages)
+    heartbeat.release(messages[:1])
+
+    # Act
+    heartbeat.beat()
+
+    # Assert
+    assert heartbeat.interval == 20
+    calls = mock_sqs.change_message_visibility_batch.call_args_list
+    assert len(calls) == 2
+    entries = calls[0][1]["Entries"] + calls[1][1]["Entries"]
+    assert [entry["ReceiptHandle"] for entry in entries] == [
+        f"h-{i}" for i in range(1, 12)
+    ]
+    assert all(entry["VisibilityTimeout"] == 60 for entry in entries)
@@ -0,0 +1,229 @@
+"""Test response caches"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.response import etag_matches
+from infra.cache import LRUCache
+from services.cache import LogCache, RefreshingCache, build_cached_log, get_log_detail
+from tests.helpers import InMemoryBackend, mock_async_session
+
+
+def _mock_log() -> MagicMock:
+    log = MagicMock()
+    log.alid = "01900000-0000-7000-8000-000000000001"
+    log.tenant_id = "tenant-abc"
+    log.user_id = "user-1"
+    log.action = "LOGIN"
+    log.resource_type = "user"
+    log.resource_id = "user-1"
+    log.ip_address = None
+    log.user_agent = None
+    log.log_metadata = {}
+    log.before_state = {}
+    log.after_state = {}
+    log.severity = "INFO"
+    log.created_at = datetime(2024, 1, 1)
+    return log
+
+
+def test_build_cached_log_etag_is_stable():
+    """Test the ETag only depends on the serialized log"""
+    # Act
+    first = build_cached_log(_mock_log())
+    second = build_cached_log(_mock_log())
+
+    # Assert
+    assert first == second
+    assert first.data["alid"] == "01900000-0000-7000-8000-000000000001"
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+def test_log_cache_fills_local_level_from_shared_backend():
+    """Test a fresh process serves a log another instance cached"""
+    # Arrange
+    shared = InMemoryBackend()
+    entry = build_cached_log(_mock_log())
+    writer = LogCache(LRUCache(10, 60), shared)
+    reader = LogCache(LRUCache(10, 60), shared)
+
+    async def read():
+        await writer.put("tenant-abc", "log-1", entry)
+        return await reader.get("tenant-abc", "log-1"), await reader.get(
+            "tenant-abc", "log-1"
+        )
+
+    # Act
+    first, second = asyncio.run(read())
+
+    # Assert
+    assert first == second == entry
+    assert reader.stats()["shared_hits"] == 1
+    assert reader.stats()["hits"] == 1
+
+
+def test_log_cache_treats_backend_errors_as_misses():
+    """Test a failing shared backend does not fail reads"""
+    # Arrange
+    shared = AsyncMock()
+    shared.get.side_effect = ConnectionError("down")
+    cache = LogCache(LRUCache(10, 60), shared)
+
+    # Act
+    entry = asyncio.run(cache.get("tenant-abc", "log-1"))
+
+    # Assert
+    assert entry is None
+
+
+@patch("services.cache.log_cache", LogCache(LRUCache(10, 60)))
+@patch("services.cache.get_log_entry")
+def test_get_log_detail_does_not_cache_misses(mock_get_log_entry):
+    """Test unknown logs are looked up again on the next read"""
+    # Arrange
+    db = mock_async_session()
+    mock_get_log_entry.return_value = None
+
+    async def read_twice():
+        await get_log_detail(db, "tenant-abc", "log-1")
+        return await get_log_detail(db, "tenant-abc", "log-1")
+
+    # Act
+    entry = asyncio.run(read_twice())
+
+    # Assert
+    assert entry is None
+    assert mock_get_log_entry.call_count == 2
+
+
+def test_etag_matches():
+    """Test If-None-Match matching"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_refreshing_cache_coalesces_concurrent_loads():
+    """Test concurrent misses for one key share a single load"""
+    # Arrange
+    cache = RefreshingCache(ttl=30, stale=300)
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"tenant": key}
+
+    async def many():
+        return await asyncio.gather(*(cache.get("t1", loader) for _ in range(20)))
+
+    # Act
+    results = asyncio.run(many())
+
+    # Assert
+    assert calls == ["t1"]
+    assert results == [{"tenant": "t1"}] * 20
+    stats = cache.stats()
+    assert stats["misses"] == 20
+    assert stats["coalesced"] == 19
+    assert stats["refreshes"] == 1
+
+
+@patch("services.cache.time.monotonic")
+def test_refreshing_cache_serves_stale_while_refreshing(mock_monotonic):
+    """Test a stale value is returned at once and refreshed in the background"""
+    # Arrange
+    cache = RefreshingCache(ttl=30, stale=300)
+    values = iter(["old", "new"])
+
+    async def loader(_key):
+        return next(values)
+
+    async def scenario():
+        mock_monotonic.return_value = 1000.0
+        first = await cache.get("t1", loader)
+        fresh = await cache.get("t1", loader)
+        mock_monotonic.return_value = 1100.0
+        stale = await cache.get("t1", loader)
+        # Let the background refresh finish
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        refreshed = await cache.get("t1", loader)
+        return first, fresh, stale, refreshed
+
+    # Act
+    first, fresh, stale, refreshed = asyncio.run(scenario())
+
+    # Assert
+    assert (first, fresh, stale, refreshed) == ("old", "old", "old", "new")
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 0.75
+
+
+@patch("services.cache.time.monotonic")
+def test_refreshing_cache_reloads_expired_values(mock_monotonic):
+    """Test values older than ttl + stale are loaded before returning"""
+    # Arrange
+    cache = RefreshingCache(ttl=30, stale=60)
+    loader = AsyncMock(side_effect=["old", "new"])
+    mock_monotonic.return_value = 1000.0
+    asyncio.run(cache.get("t1", loader))
+
+    # Act
+    mock_monotonic.return_value = 1091.0
+    value = asyncio.run(cache.get("t1", loader))
+
+    # Assert
+    assert value == "new"
+    assert loader.await_count == 2
+
+
+def test_refreshing_cache_propagates_load_errors():
+    """Test a failed load reaches the caller and is not cached"""
+    # Arrange
+    cache = RefreshingCache(ttl=30, stale=300)
+    loader = AsyncMock(side_effect=[RuntimeError("boom"), {"ok": True}])
+
+    # Act
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get("t1", loader))
+    value = asyncio.run(cache.get("t1", loader))
+
+    # Assert
+    assert value == {"ok": True}
+    assert cache.stats()["refresh_errors"] == 1
+
+
+def test_refreshing_cache_invalidate_discards_inflight_load():
+    """Test a load running when its key is invalidated is not cached"""
+    # Arrange
+    cache = RefreshingCache(ttl=30, stale=300)
+    values = iter(["before cleanup", "after cleanup"])
+
+    async def loader(_key):
+        await release.wait()
+        return next(values)
+
+    async def scenario():
+        pending = asyncio.create_task(cache.get("t1", loader))
+        await asyncio.sleep(0)
+        cache.invalidate("t1")
+        release.set()
+        first = await pending
+        second = await cache.get("t1", loader)
+        return first, second
+
+    # Act
+    release = asyncio.Event()
+    first, second = asyncio.run(scenario())
+
+    # Assert
+    assert first == "before cleanup"
+    assert second == "after cleanup"
+    assert cache.stats()["misses"] == 2
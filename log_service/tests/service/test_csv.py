@@ -0,0 +1,55 @@
+"""Test CSV service"""
+
+import csv
+import io
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from services.csv import write_logs_to_csv
+from services.logs import EXPORT_COLUMNS
+
+ROW = (
+    "log-1",
+    "tenant-abc",
+    "user-1",
+    "LOGIN",
+    "user",
+    "res-1",
+    "1.2.3.4",
+    "agent",
+    {"k": "v"},
+    "INFO",
+    datetime(2024, 1, 1),
+)
+
+
+def test_write_logs_to_csv_streams_rows():
+    """Test write logs to CSV consumes an iterator of column tuples"""
+    # Arrange
+    stream = io.BytesIO()
+    rows = (ROW for _ in range(3))
+
+    # Act
+    count = write_logs_to_csv(rows, stream)
+
+    # Assert
+    lines = list(csv.reader(io.StringIO(stream.getvalue().decode("utf-8"))))
+    assert count == 3
+    assert lines[0] == [column.key for column in EXPORT_COLUMNS]
+    assert len(lines) == 4
+    assert lines[1][0] == "log-1"
+    assert lines[1][8] == "{'k': 'v'}"
+
+
+@patch("services.csv.CSV_FLUSH_BYTES", 100)
+def test_write_logs_to_csv_flushes_in_blocks():
+    """Test write logs to CSV hands rows to the stream as the buffer fills"""
+    # Arrange
+    stream = MagicMock()
+
+    # Act
+    write_logs_to_csv((ROW for _ in range(10)), stream)
+
+    # Assert
+    assert stream.write.call_count > 2
+    assert all(len(call[0][0]) < 300 for call in stream.write.call_args_list)
@@ -1,9 +1,36 @@
 """Test export service"""
 
-from unittest.mock import MagicMock
+import gzip
+import io
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+import zstandard
 
 from models.export_pipeline import ExportPipeline
-from services.export import create_export_pipeline, get_export_pipeline
+from models.export_shard import ExportShard
+from services.export import (
+    ExportCancelled,
+    ExportProgress,
+    ExportShardLost,
+    build_export_manifest,
+    cancel_export_pipeline,
+    claim_export_shard,
+    complete_export_shard,
+    compressed_stream,
+    create_export_pipeline,
+    export_content_headers,
+    export_part_key,
+    export_watermark_key,
+    finalize_export_pipeline,
+    get_export_pipeline,
+    get_export_watermark,
+    plan_export_shards,
+    resolve_export_filters,
+    shard_export_filters,
+    write_export,
+)
 
 
 def test_create_export_pipeline():
@@ -22,6 +49,8 @@ def test_create_export_pipeline():
     assert isinstance(pipeline, ExportPipeline)
     assert pipeline.tenant_id == tenant_id
     assert pipeline.status == "PENDING"
+    assert pipeline.format == "csv"
+    assert pipeline.compression == "none"
     assert pipeline.created_at is not None
 
     mock_session_add.assert_called_once_with(pipeline)
@@ -58,3 +87,509 @@ def test_get_export_pipeline():
         tenant_id=tenant_id,
     )
     mock_filter.first.assert_called_once()
+
+
+def test_create_export_pipeline_parquet():
+    """Test create export pipeline records the requested format"""
+    pipeline = create_export_pipeline("tenant-abc", MagicMock(), "parquet")
+    assert pipeline.format == "parquet"
+    assert pipeline.compression == "zstd"
+
+
+def test_create_export_pipeline_compression():
+    """Test create export pipeline records the requested compression"""
+    pipeline = create_export_pipeline("tenant-abc", MagicMock(), "csv", "gzip")
+    assert pipeline.compression == "gzip"
+
+
+def test_create_export_pipeline_filters():
+    """Test create export pipeline records filters and incremental mode"""
+    pipeline = create_export_pipeline(
+        "tenant-abc", MagicMock(), "csv", None, {"action": "LOGIN"}, True
+    )
+    assert pipeline.filters == {"action": "LOGIN"}
+    assert pipeline.incremental is True
+    assert create_export_pipeline("tenant-abc", MagicMock(), filters={}).filters is None
+
+
+def test_get_export_watermark():
+    """Test get export watermark reads the latest successful incremental run"""
+    mock_db = MagicMock()
+    watermark = datetime(2024, 1, 1)
+    mock_query = mock_db.query.return_value
+    mock_filtered = mock_query.filter.return_value.filter.return_value.filter
+    mock_keyed = mock_filtered.return_value.filter
+    mock_keyed.return_value.scalar.return_value = watermark
+
+    assert get_export_watermark(mock_db, "tenant-abc", "{}") == watermark
+    keyed = mock_keyed.call_args[0][0]
+    assert "watermark_key" in str(keyed)
+    assert keyed.right.value == "{}"
+
+
+def test_export_watermark_key():
+    """Test the watermark key ignores time bounds and filter order"""
+    assert export_watermark_key(None) == export_watermark_key({}) == "{}"
+    assert export_watermark_key(
+        {"start_time": "2024-01-01T00:00:00Z", "severity": "INFO", "action": "LOGIN"}
+    ) == export_watermark_key({"action": "LOGIN", "severity": "INFO"})
+    assert export_watermark_key({"action": "LOGIN"}) != export_watermark_key({})
+
+
+def test_create_export_pipeline_watermark_key():
+    """Test only incremental pipelines are keyed by their row filters"""
+    filters = {"action": "LOGIN", "end_time": "2024-01-01T00:00:00Z"}
+
+    incremental = create_export_pipeline(
+        "tenant-abc", MagicMock(), filters=filters, incremental=True
+    )
+    full = create_export_pipeline("tenant-abc", MagicMock(), filters=filters)
+
+    assert incremental.watermark_key == '{"action":"LOGIN"}'
+    assert full.watermark_key is None
+
+
+def test_resolve_export_filters_parses_times():
+    """Test resolve export filters turns stored times into naive UTC"""
+    pipeline = ExportPipeline(
+        tenant_id="tenant-abc",
+        filters={"start_time": "2024-01-01T02:00:00+02:00", "action": "LOGIN"},
+        incremental=False,
+    )
+
+    filters = resolve_export_filters(MagicMock(), pipeline)
+
+    assert filters == {"start_time": datetime(2024, 1, 1), "action": "LOGIN"}
+    assert pipeline.watermark is None
+
+
+@patch("services.export.get_export_watermark")
+def test_resolve_export_filters_incremental(mock_get_watermark):
+    """Test incremental exports start at the previous watermark"""
+    # Arrange
+    previous = datetime(2024, 1, 1)
+    mock_get_watermark.return_value = previous
+    pipeline = ExportPipeline(
+        tenant_id="tenant-abc",
+        filters={"start_time": "2023-06-01T00:00:00Z"},
+        incremental=True,
+    )
+
+    # Act
+    filters = resolve_export_filters(MagicMock(), pipeline)
+
+    # Assert
+    assert filters["start_time"] == previous
+    assert filters["end_time"] == pipeline.watermark
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert now - pipeline.watermark > timedelta(seconds=30)
+    assert mock_get_watermark.call_args[0][1:] == ("tenant-abc", "{}")
+
+
+@patch("services.export.get_export_watermark")
+def test_resolve_export_filters_incremental_keyed_by_filters(mock_get_watermark):
+    """Test filtered incremental exports continue from their own watermark"""
+    mock_get_watermark.return_value = None
+    end_time = datetime(2024, 1, 1)
+    pipeline = ExportPipeline(
+        tenant_id="tenant-abc",
+        filters={"action": "LOGIN", "end_time": "2024-01-01T00:00:00Z"},
+        incremental=True,
+        watermark_key='{"action":"LOGIN"}',
+    )
+
+    filters = resolve_export_filters(MagicMock(), pipeline)
+
+    assert mock_get_watermark.call_args[0][2] == '{"action":"LOGIN"}'
+    # Rows after the requested end_time are left for the next run
+    assert filters["end_time"] == pipeline.watermark == end_time
+
+
+@patch("services.export.get_export_watermark")
+def test_resolve_export_filters_first_incremental(mock_get_watermark):
+    """Test the first incremental export has no lower bound"""
+    mock_get_watermark.return_value = None
+    pipeline = ExportPipeline(tenant_id="tenant-abc", incremental=True)
+
+    filters = resolve_export_filters(MagicMock(), pipeline)
+
+    assert "start_time" not in filters
+    assert filters["end_time"] == pipeline.watermark
+
+
+def test_export_part_key():
+    """Test part keys are grouped by export and carry the compression suffix"""
+    pipeline = ExportPipeline(
+        id="export-1", tenant_id="tenant-abc", format="csv", compression="gzip"
+    )
+    assert export_part_key(pipeline, 3) == (
+        "exports/export-1/tenant-abc_logs_part00003.csv.gz"
+    )
+
+    pipeline.format, pipeline.compression = "parquet", "zstd"
+    assert export_part_key(pipeline, 0).endswith("_part00000.parquet")
+
+
+def test_export_content_headers():
+    """Test only stream compressed formats get a Content-Encoding"""
+    assert export_content_headers("csv", "none") == {"content_type": "text/csv"}
+    assert export_content_headers("csv", "gzip") == {
+        "content_type": "text/csv",
+        "content_encoding": "gzip",
+    }
+    assert "content_encoding" not in export_content_headers("parquet", "zstd")
+
+
+def test_compressed_stream_round_trip():
+    """Test gzip and zstd streams decompress back to what was written"""
+    data = b"LOGIN,user,Mozilla/5.0\n" * 1000
+    decompress = {
+        "gzip": gzip.decompress,
+        "zstd": zstandard.ZstdDecompressor().decompressobj().decompress,
+        "none": lambda raw: raw,
+    }
+    for compression, decompressor in decompress.items():
+        stream = io.BytesIO()
+        with compressed_stream(stream, compression) as output:
+            for start in range(0, len(data), 100):
+                output.write(data[start : start + 100])
+        assert not stream.closed
+        assert decompressor(stream.getvalue()) == data
+        if compression != "none":
+            assert len(stream.getvalue()) < len(data) // 10
+
+
+@patch("services.export.write_logs_to_parquet")
+@patch("services.export.write_logs_to_csv")
+def test_write_export_dispatches_by_format(mock_write_csv, mock_write_parquet):
+    """Test write export compresses CSV and hands the codec to Parquet"""
+    stream = io.BytesIO()
+
+    write_export(iter([]), stream, "parquet", "gzip")
+    write_export(iter([]), stream, "csv", "none")
+
+    mock_write_parquet.assert_called_once()
+    assert mock_write_parquet.call_args[1]["compression"] == "gzip"
+    assert mock_write_csv.call_args[0][1] is stream
+
+
+def _bounds_db(count, first, last):
+    mock_db = MagicMock()
+    mock_db.execute.return_value.one.return_value = (count, first, last)
+    return mock_db
+
+
+@patch("services.export.settings")
+def test_plan_export_shards_splits_time_range(mock_settings):
+    """Test planning splits the logs' time range into contiguous shards"""
+    # Arrange
+    mock_settings.EXPORT_SHARD_MIN_ROWS = 100
+    mock_settings.EXPORT_MAX_SHARDS = 4
+    first = datetime(2024, 1, 1)
+    last = datetime(2024, 1, 2)
+    mock_db = _bounds_db(1000, first, last)
+    pipeline = ExportPipeline(id="export-1", tenant_id="tenant-abc")
+
+    # Act
+    shards = plan_export_shards(mock_db, pipeline, {})
+
+    # Assert
+    assert [shard.shard_index for shard in shards] == [0, 1, 2, 3]
+    assert shards[0].start_time == first
+    assert shards[-1].end_time == last + timedelta(microseconds=1)
+    for previous, shard in zip(shards, shards[1:]):
+        assert previous.end_time == shard.start_time
+    assert pipeline.shard_count == 4
+    mock_db.add_all.assert_called_once_with(shards)
+
+
+@patch("services.export.settings")
+def test_plan_export_shards_small_export(mock_settings):
+    """Test small and empty exports get a single shard over the filters"""
+    mock_settings.EXPORT_SHARD_MIN_ROWS = 100
+    mock_settings.EXPORT_MAX_SHARDS = 4
+    end = datetime(2024, 2, 1)
+
+    small = plan_export_shards(
+        _bounds_db(99, datetime(2024, 1, 1), datetime(2024, 1, 2)),
+        ExportPipeline(id="export-1", tenant_id="tenant-abc"),
+        {"end_time": end},
+    )
+    empty = plan_export_shards(
+        _bounds_db(0, None, None),
+        ExportPipeline(id="export-2", tenant_id="tenant-abc"),
+        {"end_time": end},
+    )
+
+    assert [(s.start_time, s.end_time) for s in small] == [(datetime(2024, 1, 1), end)]
+    assert [(s.start_time, s.end_time) for s in empty] == [(None, end)]
+
+
+def test_shard_export_filters_replace_time_range():
+    """Test shard filters keep the requested filters but use the shard range"""
+    pipeline = ExportPipeline(
+        filters={"start_time": "2023-01-01T00:00:00Z", "action": "LOGIN"}
+    )
+    shard = ExportShard(start_time=datetime(2024, 1, 1), end_time=datetime(2024, 1, 2))
+
+    assert shard_export_filters(pipeline, shard) == {
+        "start_time": datetime(2024, 1, 1),
+        "end_time": datetime(2024, 1, 2),
+        "action": "LOGIN",
+    }
+
+
+def test_complete_export_shard():
+    """Test completing the last outstanding shard is reported"""
+    mock_db = MagicMock()
+    pipeline = ExportPipeline(id="export-1")
+    shard = ExportShard(id="shard-1")
+    mock_db.execute.return_value.rowcount = 1
+
+    mock_db.execute.return_value.one.return_value = (1, 2)
+    assert complete_export_shard(mock_db, pipeline, shard, 1, row_count=5) is False
+    mock_db.execute.return_value.one.return_value = (2, 2)
+    assert complete_export_shard(mock_db, pipeline, shard, 1, row_count=5) is True
+    assert mock_db.commit.call_count == 2
+    shard_update = mock_db.execute.call_args_list[0][0][0]
+    params = shard_update.compile().params
+    assert (params["status"], params["row_count"]) == ("DONE", 5)
+    assert params["attempt_1"] == 1 and params["status_1"] == "IN_PROGRESS"
+
+
+def test_complete_export_shard_counts_a_shard_once():
+    """Test a shard completed by an attempt that lost its claim is not counted"""
+    mock_db = MagicMock()
+    mock_db.execute.return_value.rowcount = 0
+
+    with pytest.raises(ExportShardLost):
+        complete_export_shard(
+            mock_db, ExportPipeline(id="export-1"), ExportShard(id="shard-1"), 1
+        )
+
+    # Only the shard update ran; shards_done was not incremented
+    assert mock_db.execute.call_count == 1
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.assert_not_called()
+
+
+def _done_shards():
+    return [
+        ExportShard(
+            shard_index=index,
+            file_key=f"exports/export-1/tenant-abc_logs_part{index:05d}.csv",
+            row_count=10,
+            bytes=100,
+            sha256="abc",
+        )
+        for index in range(2)
+    ]
+
+
+def test_build_export_manifest():
+    """Test the manifest lists every part with its size and checksum"""
+    pipeline = ExportPipeline(
+        id="export-1", tenant_id="tenant-abc", format="csv", compression="none"
+    )
+
+    manifest = build_export_manifest(pipeline, _done_shards())
+
+    assert manifest["export_id"] == "export-1"
+    assert manifest["row_count"] == 20
+    assert [part["index"] for part in manifest["parts"]] == [0, 1]
+    assert manifest["parts"][1]["sha256"] == "abc"
+    assert manifest["parts"][1]["url"].endswith(manifest["parts"][1]["key"])
+
+
+@patch("services.export.upload_json_to_s3")
+def test_finalize_export_pipeline(mock_upload_json):
+    """Test finalizing uploads the manifest and points file_url at it"""
+    # Arrange
+    mock_upload_json.return_value = "https://bucket/manifest.json"
+    mock_db = MagicMock()
+    mock_query = mock_db.query.return_value.filter_by.return_value.order_by
+    mock_query.return_value.all.return_value = _done_shards()
+    mock_db.execute.return_value.rowcount = 1
+    pipeline = ExportPipeline(id="export-1", tenant_id="tenant-abc")
+
+    # Act
+    finalized = finalize_export_pipeline(mock_db, pipeline)
+
+    # Assert
+    assert finalized is True
+    assert mock_upload_json.call_args[0][2] == "exports/export-1/manifest.json"
+    statement = mock_db.execute.call_args[0][0]
+    params = statement.compile().params
+    assert params["manifest_url"] == "https://bucket/manifest.json"
+    assert params["file_url"] == "https://bucket/manifest.json"
+    assert params["status"] == "DONE"
+    assert "export_pipelines.status = :status_1" in str(statement)
+    assert params["status_1"] == "IN_PROGRESS"
+    mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_called_once_with(pipeline)
+
+
+@patch("services.export.upload_json_to_s3")
+def test_finalize_single_shard_export(mock_upload_json):
+    """Test a single shard export links its only part file directly"""
+    mock_db = MagicMock()
+    mock_query = mock_db.query.return_value.filter_by.return_value.order_by
+    mock_query.return_value.all.return_value = _done_shards()[:1]
+    pipeline = ExportPipeline(id="export-1", tenant_id="tenant-abc")
+
+    finalize_export_pipeline(mock_db, pipeline)
+
+    params = mock_db.execute.call_args[0][0].compile().params
+    assert params["file_url"].endswith("tenant-abc_logs_part00000.csv")
+    assert params["manifest_url"] == mock_upload_json.return_value
+
+
+@patch("services.export.upload_json_to_s3")
+def test_finalize_does_not_overwrite_cancelled_export(_mock_upload_json):
+    """Test finalizing a pipeline cancelled meanwhile leaves it alone"""
+    mock_db = MagicMock()
+    mock_query = mock_db.query.return_value.filter_by.return_value.order_by
+    mock_query.return_value.all.return_value = _done_shards()
+    mock_db.execute.return_value.rowcount = 0
+
+    assert finalize_export_pipeline(mock_db, ExportPipeline(id="export-1")) is False
+
+
+def test_cancel_export_pipeline():
+    """Test only pending and running pipelines can be cancelled"""
+    mock_db = MagicMock()
+    pipeline = ExportPipeline(id="export-1", status="IN_PROGRESS")
+
+    mock_db.execute.return_value.rowcount = 1
+    assert cancel_export_pipeline(mock_db, pipeline) is True
+    sql = str(mock_db.execute.call_args[0][0])
+    assert "export_pipelines.status IN" in sql
+    mock_db.refresh.assert_called_once_with(pipeline)
+
+    mock_db.execute.return_value.rowcount = 0
+    assert cancel_export_pipeline(mock_db, pipeline) is False
+
+
+def _claim_db(claimed):
+    mock_db = MagicMock()
+    mock_query = mock_db.query.return_value.filter.return_value.filter.return_value
+    mock_locked = mock_query.with_for_update.return_value.populate_existing
+    mock_locked.return_value.first.return_value = claimed
+    return mock_db, mock_query
+
+
+def test_claim_export_shard_takes_back_partial_progress():
+    """Test reclaiming a crashed shard subtracts what its attempt reported"""
+    # Arrange
+    pipeline = ExportPipeline(id="export-1")
+    shard = ExportShard(status="IN_PROGRESS", row_count=500, bytes=4000, attempt=1)
+    mock_db, mock_query = _claim_db(shard)
+
+    # Act
+    attempt = claim_export_shard(mock_db, pipeline, shard)
+
+    # Assert
+    assert attempt == 2
+    mock_query.with_for_update.assert_called_once_with(skip_locked=True)
+    params = mock_db.execute.call_args[0][0].compile().params
+    assert 500 in params.values() and 4000 in params.values()
+    assert (shard.row_count, shard.bytes, shard.status) == (0, 0, "IN_PROGRESS")
+    assert shard.attempt == 2 and shard.lease_expires_at is not None
+    mock_db.commit.assert_called_once()
+
+
+def test_claim_export_shard_fresh():
+    """Test a fresh shard does not touch the pipeline totals"""
+    shard = ExportShard(status="PENDING", row_count=0, bytes=0, attempt=0)
+    mock_db, _ = _claim_db(shard)
+
+    assert claim_export_shard(mock_db, ExportPipeline(id="export-1"), shard) == 1
+
+    mock_db.execute.assert_not_called()
+
+
+def test_claim_export_shard_already_claimed():
+    """Test a shard that is done, running or locked by a claim is skipped"""
+    mock_db, _ = _claim_db(None)
+
+    attempt = claim_export_shard(mock_db, ExportPipeline(id="export-1"), ExportShard())
+
+    assert attempt is None
+    mock_db.commit.assert_not_called()
+
+
+@patch("services.export.settings")
+def test_export_progress_reports_deltas(mock_settings):
+    """Test progress adds only what changed since the previous report"""
+    # Arrange
+    mock_settings.EXPORT_PROGRESS_INTERVAL_SECONDS = 0
+    mock_settings.EXPORT_SHARD_LEASE_SECONDS = 120
+    mock_db = MagicMock()
+    mock_db.execute.return_value.scalar_one.return_value = "IN_PROGRESS"
+    stream = MagicMock(bytes_written=0)
+    progress = ExportProgress(mock_db, "export-1", "shard-1", 1, stream)
+
+    # Act
+    consumed = []
+    for log in progress.track(iter([("a",), ("b",), ("c",)])):
+        stream.bytes_written += 10
+        consumed.append(log)
+
+    # Assert
+    assert consumed == [("a",), ("b",), ("c",)]
+    assert progress.rows == 3
+    pipeline_updates = [
+        call[0][0].compile().params
+        for call in mock_db.execute.call_args_list
+        if "export_pipelines" in str(call[0][0])
+    ]
+    assert [params["rows_processed_1"] for params in pipeline_updates] == [1, 1, 1]
+    assert [params["bytes_written_1"] for params in pipeline_updates] == [10, 10, 10]
+
+
+@patch("services.export.settings")
+def test_export_progress_raises_when_cancelled(mock_settings):
+    """Test progress stops the export once the pipeline is cancelled"""
+    mock_settings.EXPORT_PROGRESS_INTERVAL_SECONDS = 0
+    mock_settings.EXPORT_SHARD_LEASE_SECONDS = 120
+    mock_db = MagicMock()
+    mock_db.execute.return_value.scalar_one.return_value = "CANCELLED"
+    progress = ExportProgress(
+        mock_db, "export-1", "shard-1", 1, MagicMock(bytes_written=0)
+    )
+
+    with pytest.raises(ExportCancelled):
+        list(progress.track(iter([("a",), ("b",)])))
+    assert progress.rows == 1
+
+
+@patch("services.export.settings")
+def test_export_progress_raises_when_failed(mock_settings):
+    """Test progress stops the export once another shard failed the pipeline"""
+    mock_settings.EXPORT_PROGRESS_INTERVAL_SECONDS = 0
+    mock_settings.EXPORT_SHARD_LEASE_SECONDS = 120
+    mock_db = MagicMock()
+    mock_db.execute.return_value.scalar_one.return_value = "FAILED"
+    progress = ExportProgress(
+        mock_db, "export-1", "shard-1", 1, MagicMock(bytes_written=0)
+    )
+
+    with pytest.raises(ExportCancelled):
+        list(progress.track(iter([("a",), ("b",)])))
+
+
+@patch("services.export.settings")
+def test_export_progress_raises_when_shard_reclaimed(mock_settings):
+    """Test progress stops an attempt whose shard was claimed by a newer one"""
+    mock_settings.EXPORT_PROGRESS_INTERVAL_SECONDS = 0
+    mock_settings.EXPORT_SHARD_LEASE_SECONDS = 120
+    mock_db = MagicMock()
+    mock_db.execute.return_value.rowcount = 0
+    progress = ExportProgress(
+        mock_db, "export-1", "shard-1", 1, MagicMock(bytes_written=0)
+    )
+
+    with pytest.raises(ExportShardLost):
+        list(progress.track(iter([("a",), ("b",)])))
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.assert_not_called()
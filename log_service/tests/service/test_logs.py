@@ -10,6 +10,8 @@ from services.logs import (
     cleanup_old_logs,
     create_bulk_logs,
     create_log_entry,
+    get_export_bounds,
+    get_log_entries,
     get_log_entry,
     get_logs_for_export,
 )
@@ -42,11 +44,47 @@ def test_create_log_entry(mock_mask):
     assert isinstance(log, AuditLog)
     assert log.tenant_id == tenant_id
     assert isinstance(log.alid, UUID)
+    assert log.alid.version == 7
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
     mock_db.refresh.assert_called_once()
 
 
+@patch("services.logs.mask_sensitive_data")
+def test_create_bulk_logs(mock_mask):
+    """Test create bulk logs"""
+    mock_db = MagicMock()
+    tenant_id = "tenant-123"
+    payloads = [
+        AuditLogCreate(
+            user_id=f"user-{i}",
+            email="email@example.com",
+            action="LOGIN",
+            resource_type="user",
+            resource_id=f"res-{i}",
+            ip_address="1.2.3.4",
+            user_agent="agent",
+            metadata={"m": i},
+        )
+        for i in range(3)
+    ]
+    mock_mask.side_effect = lambda data: data
+
+    result = create_bulk_logs(mock_db, tenant_id, payloads)
+
+    assert result["affected_rows"] == 3
+    assert all(isinstance(log_id, UUID) for log_id in result["log_ids"])
+    assert result["log_ids"] == sorted(result["log_ids"])
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_not_called()
+    rows = mock_db.execute.call_args[0][1]
+    assert [row["alid"] for row in rows] == result["log_ids"]
+    assert rows[0]["tenant_id"] == tenant_id
+    assert rows[0]["log_metadata"] == {"m": 0}
+    assert "metadata" not in rows[0]
+
+
 def test_get_log_entry():
     """Test get log entry"""
     mock_db = MagicMock()
@@ -64,22 +102,85 @@ def test_get_log_entry():
     )
 
 
-def test_get_logs_for_export():
-    """Test get logs for export"""
+def test_get_log_entries():
+    """Test get log entries"""
     mock_db = MagicMock()
-    mock_logs = [MagicMock(), MagicMock()]
-    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = (
-        mock_logs
-    )
+    expected_logs = [MagicMock(), MagicMock()]
+    mock_filter = mock_db.query.return_value.filter.return_value.filter.return_value
+    mock_filter.all.return_value = expected_logs
 
-    result = get_logs_for_export(mock_db, "tenant-abc")
+    result = get_log_entries(mock_db, "tenant-x", ["log-1", "log-2"])
 
-    assert result == mock_logs
+    assert result == expected_logs
     mock_db.query.assert_called_once_with(AuditLog)
 
 
+def test_get_log_entries_empty():
+    """Test get log entries with no IDs"""
+    mock_db = MagicMock()
+
+    assert get_log_entries(mock_db, "tenant-x", []) == []
+    mock_db.query.assert_not_called()
+
+
+def test_get_logs_for_export_filters():
+    """Test get logs for export applies time range and field filters"""
+    mock_db = MagicMock()
+    mock_db.execute.return_value.partitions.return_value = iter([])
+    filters = {
+        "start_time": datetime(2024, 1, 1),
+        "end_time": datetime(2024, 2, 1),
+        "action": "LOGIN",
+        "user_id": "user-1",
+    }
+
+    list(get_logs_for_export(mock_db, "tenant-abc", filters=filters))
+
+    sql = str(mock_db.execute.call_args[0][0])
+    assert "audit_logs.created_at >= :created_at_1" in sql
+    assert "audit_logs.created_at < :created_at_2" in sql
+    assert "audit_logs.action = :action_1" in sql
+    assert "audit_logs.user_id = :user_id_1" in sql
+    assert "severity =" not in sql
+
+
+def test_get_logs_for_export():
+    """Test get logs for export streams column tuples in chunks"""
+    # Arrange
+    mock_db = MagicMock()
+    mock_result = mock_db.execute.return_value
+    mock_result.partitions.return_value = iter([[("a",), ("b",)], [("c",)]])
+
+    # Act
+    result = get_logs_for_export(mock_db, "tenant-abc", chunk_size=2)
+
+    # Assert
+    mock_db.execute.assert_not_called()
+    assert list(result) == [("a",), ("b",), ("c",)]
+    statement = mock_db.execute.call_args[0][0]
+    assert [column.key for column in statement.selected_columns][0] == "alid"
+    assert "audit_logs.tenant_id = :tenant_id_1" in str(statement)
+    assert mock_db.execute.call_args[1]["execution_options"] == {"yield_per": 2}
+    mock_db.query.assert_not_called()
+
+
+def test_get_export_bounds():
+    """Test get export bounds counts the filtered logs and their time range"""
+    mock_db = MagicMock()
+    bounds = (3, datetime(2024, 1, 1), datetime(2024, 1, 2))
+    mock_db.execute.return_value.one.return_value = bounds
+
+    result = get_export_bounds(mock_db, "tenant-abc", {"action": "LOGIN"})
+
+    assert result == bounds
+    sql = str(mock_db.execute.call_args[0][0])
+    assert "count(*)" in sql
+    assert "min(audit_logs.created_at)" in sql
+    assert "audit_logs.action = :action_1" in sql
+
+
 def test_cleanup_old_logs():
-    """Test cleanup old logs"""
+    """Test cleanup old logs only deletes the tenant's expired rows"""
     mock_db = MagicMock()
     mock_query = mock_db.query.return_value
     mock_filter = mock_query.filter.return_value.filter.return_value
@@ -88,7 +189,7 @@ def test_cleanup_old_logs():
     result = cleanup_old_logs(mock_db, "tenant-x", retention_days=30)
 
     assert result["deleted"] == 42
-    _ = datetime.now(timezone.utc) - timedelta(days=30)
-    assert "cutoff" in result
-    assert datetime.fromisoformat(result["cutoff"]) <= datetime.now(timezone.utc)
+    cutoff = datetime.fromisoformat(result["cutoff"])
+    assert cutoff <= datetime.now(timezone.utc) - timedelta(days=30)
+    mock_db.execute.assert_not_called()
     mock_db.commit.assert_called_once()
@@ -0,0 +1,87 @@
+"""Test outbox service"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from models.outbox import OutboxEvent
+from services.outbox import (
+    add_outbox_events,
+    claim_outbox_events,
+    delete_outbox_events,
+    group_outbox_events,
+    retry_outbox_events,
+)
+
+
+def test_add_outbox_events():
+    """Test add outbox events does not commit"""
+    mock_db = MagicMock()
+    log_ids = [uuid4(), uuid4()]
+
+    add_outbox_events(mock_db, "tenant-abc", log_ids)
+
+    events = mock_db.add_all.call_args[0][0]
+    assert [event.log_id for event in events] == log_ids
+    assert all(event.tenant_id == "tenant-abc" for event in events)
+    mock_db.commit.assert_not_called()
+
+
+def test_claim_outbox_events():
+    """Test claim outbox events skips locked, delayed and dead rows"""
+    mock_db = MagicMock()
+    mock_filter = mock_db.query.return_value.filter
+    mock_limit = (
+        mock_filter.return_value.filter.return_value.order_by.return_value.limit
+    )
+    mock_lock = mock_limit.return_value.with_for_update
+    mock_lock.return_value.all.return_value = ["event"]
+
+    result = claim_outbox_events(mock_db, 500)
+
+    assert result == ["event"]
+    mock_db.query.assert_called_once_with(OutboxEvent)
+    mock_limit.assert_called_once_with(500)
+    mock_lock.assert_called_once_with(skip_locked=True)
+    assert "outbox_events.attempts <" in str(mock_filter.call_args[0][0])
+
+
+def test_group_outbox_events():
+    """Test group outbox events by tenant"""
+    events = [
+        OutboxEvent(id=1, tenant_id="a", log_id=uuid4()),
+        OutboxEvent(id=2, tenant_id="b", log_id=uuid4()),
+        OutboxEvent(id=3, tenant_id="a", log_id=uuid4()),
+    ]
+
+    grouped = group_outbox_events(events)
+
+    assert [event.id for event in grouped["a"]] == [1, 3]
+    assert [event.id for event in grouped["b"]] == [2]
+
+
+@patch("services.outbox.settings")
+def test_retry_outbox_events(mock_settings):
+    """Test retry outbox events backs off and dead-letters exhausted events"""
+    mock_settings.OUTBOX_MAX_ATTEMPTS = 3
+    mock_settings.OUTBOX_RETRY_BASE_SECONDS = 10
+    fresh = OutboxEvent(id=1, tenant_id="a", log_id=uuid4(), attempts=0)
+    retried = OutboxEvent(id=2, tenant_id="a", log_id=uuid4(), attempts=1)
+    exhausted = OutboxEvent(id=3, tenant_id="a", log_id=uuid4(), attempts=2)
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    dead = retry_outbox_events([fresh, retried, exhausted])
+
+    assert dead == [exhausted]
+    assert [event.attempts for event in (fresh, retried, exhausted)] == [1, 2, 3]
+    assert fresh.available_at >= before + timedelta(seconds=10)
+    assert retried.available_at >= before + timedelta(seconds=20)
+    assert retried.available_at < before + timedelta(seconds=40)
+
+
+def test_delete_outbox_events_empty():
+    """Test delete outbox events with nothing to delete"""
+    mock_db = MagicMock()
+
+    assert delete_outbox_events(mock_db, []) == 0
+    mock_db.query.assert_not_called()
@@ -0,0 +1,70 @@
+"""Test Parquet service"""
+
+import io
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.parquet import PARQUET_COLUMNS, PARQUET_SCHEMA, write_logs_to_parquet
+
+
+def _row(index: int) -> tuple:
+    return (
+        uuid4(),
+        "tenant-abc",
+        "user-1",
+        "LOGIN" if index % 2 else "LOGOUT",
+        "user",
+        f"res-{index}",
+        "1.2.3.4",
+        "agent",
+        {"index": index},
+        "INFO",
+        datetime(2024, 1, 1, 12, 0),
+        None,
+        {"roles": ["admin"]},
+    )
+
+
+def test_parquet_schema_matches_columns():
+    """Test the Parquet schema lines up with the streamed columns"""
+    assert PARQUET_SCHEMA.names == [column.key for column in PARQUET_COLUMNS]
+
+
+def test_write_logs_to_parquet_row_groups():
+    """Test write logs to Parquet writes typed row groups from a stream"""
+    # Arrange
+    stream = io.BytesIO()
+    rows = (_row(index) for index in range(25))
+
+    # Act
+    count = write_logs_to_parquet(rows, stream, row_group_size=10)
+
+    # Assert
+    assert count == 25
+    assert not stream.closed
+    parquet_file = pq.ParquetFile(io.BytesIO(stream.getvalue()))
+    assert parquet_file.metadata.num_rows == 25
+    assert parquet_file.metadata.num_row_groups == 3
+    schema = parquet_file.schema_arrow
+    assert schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert pa.types.is_dictionary(schema.field("action").type)
+    assert pa.types.is_dictionary(schema.field("severity").type)
+    first = parquet_file.read().slice(0, 1).to_pylist()[0]
+    assert first["created_at"] == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert json.loads(first["log_metadata"]) == {"index": 0}
+    assert first["before_state"] is None
+    assert json.loads(first["after_state"]) == {"roles": ["admin"]}
+
+
+def test_write_logs_to_parquet_empty():
+    """Test write logs to Parquet writes a valid file without logs"""
+    stream = io.BytesIO()
+
+    count = write_logs_to_parquet(iter([]), stream)
+
+    assert count == 0
+    assert pq.read_table(io.BytesIO(stream.getvalue())).num_rows == 0
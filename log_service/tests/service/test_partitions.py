@@ -0,0 +1,67 @@
+"""Test partitions service"""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from services.partitions import (
+    drop_expired_audit_log_partitions,
+    ensure_audit_log_partitions,
+    month_start,
+    next_month,
+    partition_name,
+)
+
+
+def test_next_month_rolls_over_year():
+    """Test next month across a year boundary"""
+    assert next_month(datetime(2024, 12, 1)) == datetime(2025, 1, 1)
+    assert partition_name(datetime(2024, 2, 1)) == "audit_logs_p202402"
+
+
+@patch("services.partitions.list_audit_log_partitions")
+def test_ensure_audit_log_partitions(mock_list):
+    """Test ensure audit log partitions attaches missing months"""
+    mock_db = MagicMock()
+    start = month_start(datetime.now(timezone.utc).replace(tzinfo=None))
+    mock_list.return_value = [partition_name(start)]
+
+    names = ensure_audit_log_partitions(mock_db, 2)
+
+    assert len(names) == 3
+    assert names[0] == partition_name(start)
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert len(statements) == 4
+    assert not any(names[0] in stmt for stmt in statements)
+    assert f"CREATE TABLE IF NOT EXISTS {names[1]}" in statements[0]
+    assert f"ALTER TABLE audit_logs ATTACH PARTITION {names[1]}" in statements[1]
+    assert not any("PARTITION OF" in stmt for stmt in statements)
+    assert mock_db.commit.call_count == 2
+
+
+@patch("services.partitions.list_audit_log_partitions")
+def test_drop_expired_audit_log_partitions(mock_list):
+    """Test drop expired partitions detaches whole expired months concurrently"""
+    mock_connection = MagicMock()
+    mock_list.side_effect = [
+        ["audit_logs_p202312"],
+        ["audit_logs_p202401", "audit_logs_p202402", "audit_logs_p202403"],
+    ]
+
+    dropped = drop_expired_audit_log_partitions(
+        mock_connection, datetime(2024, 3, 15, tzinfo=timezone.utc)
+    )
+
+    assert dropped == ["audit_logs_p202401", "audit_logs_p202402"]
+    mock_list.assert_any_call(mock_connection, detach_pending=True)
+    statements = [str(call[0][0]) for call in mock_connection.execute.call_args_list]
+    assert statements[:2] == [
+        "ALTER TABLE audit_logs DETACH PARTITION audit_logs_p202312 FINALIZE",
+        "DROP TABLE audit_logs_p202312",
+    ]
+    assert (
+        "ALTER TABLE audit_logs DETACH PARTITION audit_logs_p202401 CONCURRENTLY"
+        in statements
+    )
+    assert "DROP TABLE audit_logs_p202402" in statements
+    assert not any("audit_logs_p202403" in stmt for stmt in statements)
+    mock_connection.commit.assert_not_called()
@@ -0,0 +1,160 @@
+"""Test tenant scoped query plans against a seeded database
+
+Runs only when TEST_DATABASE_URL points at a migrated PostgreSQL database.
+Everything happens inside a transaction that is rolled back afterwards.
+"""
+
+import os
+import re
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from services.logs import (
+    cleanup_old_logs,
+    get_log_entries,
+    get_log_entry,
+    get_logs_for_export,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+SEED_TENANTS = 20
+SEED_ROWS_PER_TENANT = 500
+
+# Sort plan nodes, not the "Sort Key" detail lines of a Merge Append
+SORT_NODE = re.compile(r"(Incremental )?Sort\s+\(cost=")
+
+
+@pytest.fixture(name="db")
+def fixture_db():
+    """Session on a seeded, rolled back transaction"""
+    engine = create_engine(TEST_DATABASE_URL)
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"database unavailable: {e}")
+    transaction = connection.begin()
+    connection.execute(
+        text(
+            "INSERT INTO audit_logs "
+            "(alid, tenant_id, action, resource_type, resource_id, severity, "
+            "created_at) "
+            "SELECT gen_random_uuid(), 'plan-tenant-' || (i % :tenants), "
+            "'LOGIN', 'user', 'res-' || i, 'INFO', "
+            "(now() AT TIME ZONE 'utc') - (i % 60) * interval '1 day' "
+            "FROM generate_series(1, :rows) AS i"
+        ),
+        {"tenants": SEED_TENANTS, "rows": SEED_TENANTS * SEED_ROWS_PER_TENANT},
+    )
+    connection.execute(text("ANALYZE audit_logs"))
+    # A small seed makes scanning everything and sorting look cheap. Disabled
+    # nodes still show up when there is no alternative, so these settings only
+    # make the planner prove an index driven, sort free plan exists.
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    connection.execute(text("SET LOCAL enable_sort = off"))
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+def _explain_audit_log_queries(db: Session, call) -> list:
+    """Run call and return the EXPLAIN output of its audit_logs reads/deletes"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments
+        if statement.lstrip().startswith(("SELECT audit_logs", "DELETE FROM audit")):
+            statements.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+    plans = []
+    for statement, parameters in statements:
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        plans.append("\n".join(row[0] for row in rows))
+    assert plans
+    return plans
+
+
+def _assert_index_plan(plan: str, index_name: str):
+    assert index_name in plan, plan
+    assert "Seq Scan" not in plan, plan
+    assert not SORT_NODE.search(plan), plan
+
+
+def test_export_query_uses_tenant_created_at_index(db):
+    """Test export reads newest first from the composite index without sorting"""
+    # Act
+    plans = _explain_audit_log_queries(
+        db, lambda: list(get_logs_for_export(db, "plan-tenant-1"))
+    )
+
+    # Assert
+    for plan in plans:
+        _assert_index_plan(plan, "tenant_id_created_at")
+
+
+def test_cleanup_query_uses_tenant_created_at_index(db):
+    """Test cleanup deletes expired rows through the composite index"""
+    # Act
+    plans = _explain_audit_log_queries(
+        db, lambda: cleanup_old_logs(db, "plan-tenant-1", retention_days=30)
+    )
+
+    # Assert
+    for plan in plans:
+        _assert_index_plan(plan, "tenant_id_created_at")
+
+
+def test_get_log_entry_uses_index(db):
+    """Test single log lookup is an index scan"""
+    # Arrange
+    log_id = db.execute(
+        text("SELECT alid FROM audit_logs WHERE tenant_id = 'plan-tenant-1' LIMIT 1")
+    ).scalar()
+
+    # Act
+    plans = _explain_audit_log_queries(
+        db, lambda: get_log_entry(db, "plan-tenant-1", str(log_id or uuid.uuid4()))
+    )
+
+    # Assert
+    for plan in plans:
+        assert "Index" in plan, plan
+        assert "Seq Scan" not in plan, plan
+
+
+def test_get_log_entries_uses_index(db):
+    """Test multi-get resolves alid = ANY(...) through an index"""
+    # Arrange
+    log_ids = db.execute(
+        text("SELECT alid FROM audit_logs WHERE tenant_id = 'plan-tenant-1' LIMIT 50")
+    ).scalars()
+
+    # Act
+    plans = _explain_audit_log_queries(
+        db, lambda: get_log_entries(db, "plan-tenant-1", list(log_ids))
+    )
+
+    # Assert
+    for plan in plans:
+        assert "Index" in plan, plan
+        assert "Seq Scan" not in plan, plan
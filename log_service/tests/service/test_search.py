@@ -1,17 +1,64 @@
 """Test search service"""
 
+import asyncio
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from opensearchpy.exceptions import NotFoundError
 
 from models import AuditLog
 from services.search import (
+    LOG_INDEX_TEMPLATE_VERSION,
+    build_log_document,
+    bulk_index_documents,
+    decode_log_cursor,
     delete_old_logs_in_opensearch,
+    ensure_log_index,
     get_log_stats_opensearch,
     index_log_to_opensearch,
+    install_log_index_template,
     search_logs,
 )
 
 
+@patch("services.search.get_opensearch_client")
+def test_install_log_index_template(mock_get_client):
+    """Test install log index template when none exists"""
+    mock_client = MagicMock()
+    mock_get_client.return_value = mock_client
+    mock_client.indices.get_index_template.side_effect = NotFoundError(
+        404, "index_template_missing_exception", {}
+    )
+
+    assert install_log_index_template() is True
+
+    _, kwargs = mock_client.indices.put_index_template.call_args
+    template = kwargs["body"]
+    properties = template["template"]["mappings"]["properties"]
+    assert template["version"] == LOG_INDEX_TEMPLATE_VERSION
+    assert properties["action"] == {"type": "keyword"}
+    assert properties["created_at"] == {"type": "date"}
+    assert properties["after_state"] == {"type": "flat_object"}
+
+
+@patch("services.search.get_opensearch_client")
+def test_install_log_index_template_up_to_date(mock_get_client):
+    """Test install log index template skips a current template"""
+    mock_client = MagicMock()
+    mock_get_client.return_value = mock_client
+    mock_client.indices.get_index_template.return_value = {
+        "index_templates": [
+            {
+                "name": "logs",
+                "index_template": {"version": LOG_INDEX_TEMPLATE_VERSION},
+            }
+        ]
+    }
+
+    assert install_log_index_template() is False
+    mock_client.indices.put_index_template.assert_not_called()
+
+
 @patch("services.search.get_opensearch_client")
 def test_index_log_to_opensearch(mock_get_client):
     """Test index log to opensearch"""
@@ -39,15 +86,49 @@ def test_index_log_to_opensearch(mock_get_client):
 
     mock_client.index.assert_called_once()
     _, kwargs = mock_client.index.call_args
-    assert kwargs["index"] == "logs-tenant-abc"
+    assert kwargs["index"] == "logs-tenant-abc-2024.01"
     assert kwargs["id"] == "log-123"
     assert kwargs["body"]["action"] == "LOGIN"
+    assert kwargs["body"] == build_log_document(log)
 
 
 @patch("services.search.get_opensearch_client")
+def test_bulk_index_documents(mock_get_client):
+    """Test bulk index documents reports failed IDs"""
+    mock_client = MagicMock()
+    mock_get_client.return_value = mock_client
+    mock_client.bulk.return_value = {
+        "errors": True,
+        "items": [
+            {"index": {"_id": "log-1", "status": 201}},
+            {"index": {"_id": "log-2", "status": 429}},
+        ],
+    }
+    docs = [
+        {"id": "log-1", "tenant_id": "tenant-abc", "created_at": "2024-01-31T23:00:00"},
+        {"id": "log-2", "tenant_id": "tenant-abc", "created_at": "2024-02-01T01:00:00"},
+    ]
+
+    failed = bulk_index_documents(docs)
+
+    assert failed == ["log-2"]
+    mock_client.bulk.assert_called_once()
+    body = mock_client.bulk.call_args[1]["body"]
+    assert body[0] == {"index": {"_index": "logs-tenant-abc-2024.01", "_id": "log-1"}}
+    assert body[1] == docs[0]
+    assert body[2] == {"index": {"_index": "logs-tenant-abc-2024.02", "_id": "log-2"}}
+    assert len(body) == 4
+
+
+def test_bulk_index_documents_empty():
+    """Test bulk index documents with nothing to index"""
+    assert bulk_index_documents([]) == []
+
+
+@patch("services.search.get_async_opensearch_client")
 def test_search_logs(mock_get_client):
     """Test search logs"""
-    mock_client = MagicMock()
+    mock_client = AsyncMock()
     mock_get_client.return_value = mock_client
 
     mock_client.search.return_value = {
@@ -58,17 +139,50 @@ def test_search_logs(mock_get_client):
     }
 
     filters = {"action": "LOGIN", "page": 1, "page_size": 10}
-    result = search_logs("tenant-abc", filters)
+    result = asyncio.run(search_logs("tenant-abc", filters))
 
     assert result["total"] == 1
     assert result["logs"][0]["action"] == "LOGIN"
+    assert result["next_cursor"] is None
     mock_client.search.assert_called_once()
 
 
-@patch("services.search.get_opensearch_client")
+@patch("services.search.get_async_opensearch_client")
+def test_search_logs_search_after_with_pit(mock_get_client):
+    """Test search logs continues from a cursor inside a point in time"""
+    mock_client = AsyncMock()
+    mock_get_client.return_value = mock_client
+    mock_client.create_pit.return_value = {"pit_id": "pit-1"}
+    mock_client.search.return_value = {
+        "pit_id": "pit-2",
+        "hits": {
+            "total": {"value": 3},
+            "hits": [
+                {"_source": {"id": "b"}, "sort": [2, "b"]},
+                {"_source": {"id": "a"}, "sort": [1, "a"]},
+            ],
+        },
+    }
+
+    filters = {"page_size": 2, "pit": True, "cursor": {"search_after": [3, "c"]}}
+    result = asyncio.run(search_logs("tenant-abc", filters))
+
+    _, kwargs = mock_client.search.call_args
+    assert "index" not in kwargs
+    assert kwargs["body"]["search_after"] == [3, "c"]
+    assert kwargs["body"]["pit"]["id"] == "pit-1"
+    assert "from" not in kwargs["body"]
+    assert kwargs["body"]["query"]["bool"]["filter"] == [
+        {"term": {"tenant_id": "tenant-abc"}}
+    ]
+    state, _ = decode_log_cursor(result["next_cursor"], "tenant-abc")
+    assert state == {"search_after": [1, "a"], "pit_id": "pit-2"}
+
+
+@patch("services.search.get_async_opensearch_client")
 def test_get_log_stats_opensearch(mock_get_client):
     """Test get log stats in opensearch"""
-    mock_client = MagicMock()
+    mock_client = AsyncMock()
     mock_get_client.return_value = mock_client
 
     mock_client.search.return_value = {
@@ -82,19 +196,51 @@ def test_get_log_stats_opensearch(mock_get_client):
         }
     }
 
-    stats = get_log_stats_opensearch("tenant-abc")
+    stats = asyncio.run(get_log_stats_opensearch("tenant-abc"))
     assert stats["action_counts"][0]["key"] == "LOGIN"
     assert stats["severity_counts"][0]["key"] == "INFO"
 
 
 @patch("services.search.get_opensearch_client")
-def test_delete_old_logs_in_opensearch(mock_get_client):
-    """Test delete old logs in opensearch"""
+def test_ensure_log_index_attaches_read_alias(mock_get_client):
+    """Test ensure log index creates the backing index once with its alias"""
     mock_client = MagicMock()
     mock_get_client.return_value = mock_client
 
-    mock_client.delete_by_query.return_value = {"deleted": 123}
+    ensure_log_index(mock_client, "tenant-new", "logs-tenant-new-2024.03")
+    ensure_log_index(mock_client, "tenant-new", "logs-tenant-new-2024.03")
+
+    mock_client.indices.create.assert_called_once_with(
+        index="logs-tenant-new-2024.03",
+        body={"aliases": {"logs-tenant-new": {}}},
+    )
+
 
-    response = delete_old_logs_in_opensearch("tenant-abc", days=30)
-    assert response["deleted"] == 123
-    mock_client.delete_by_query.assert_called_once()
+@patch("services.search.datetime")
+@patch("services.search.get_async_opensearch_client")
+def test_delete_old_logs_in_opensearch(mock_get_client, mock_datetime):
+    """Test delete old logs drops whole expired indices"""
+    mock_client = AsyncMock()
+    mock_get_client.return_value = mock_client
+    mock_datetime.now.return_value = datetime(2024, 5, 15, tzinfo=timezone.utc)
+    mock_datetime.strptime = datetime.strptime
+
+    mock_client.indices.get_alias.return_value = {
+        "logs-tenant-abc-2024.03": {},
+        "logs-tenant-abc-2024.04": {},
+        "logs-tenant-abc-2024.04.14": {},
+        "logs-tenant-abc-2024.04.15": {},
+        "logs-tenant-abc-2024.05": {},
+    }
+
+    response = asyncio.run(delete_old_logs_in_opensearch("tenant-abc", days=30))
+
+    assert response["deleted_indices"] == [
+        "logs-tenant-abc-2024.03",
+        "logs-tenant-abc-2024.04.14",
+    ]
+    mock_client.indices.get_alias.assert_called_once_with(name="logs-tenant-abc")
+    mock_client.indices.delete.assert_called_once_with(
+        index="logs-tenant-abc-2024.03,logs-tenant-abc-2024.04.14"
+    )
+    mock_client.delete_by_query.assert_not_called()
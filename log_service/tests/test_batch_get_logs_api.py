@@ -0,0 +1,135 @@
+"""Test batch get logs API"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from core.db import get_session
+from main import app
+from services.cache import log_cache
+from tests.helpers import mock_async_session
+
+client = TestClient(app)
+
+
+def _mock_log(log_id: str) -> MagicMock:
+    mock_log = MagicMock()
+    mock_log.alid = log_id
+    mock_log.tenant_id = "tenant-abc"
+    mock_log.user_id = "user-123"
+    mock_log.action = "LOGIN"
+    mock_log.resource_type = "user"
+    mock_log.resource_id = "user_12345"
+    mock_log.ip_address = None
+    mock_log.user_agent = None
+    mock_log.log_metadata = {}
+    mock_log.before_state = {}
+    mock_log.after_state = {}
+    mock_log.severity = "INFO"
+    mock_log.created_at = datetime(2024, 1, 1)
+    return mock_log
+
+
+@patch("services.cache.get_log_entries")
+@patch("api.logs.get_tenant_id")
+def test_batch_get_logs_api_keeps_order_and_flags_misses(
+    mock_get_tenant_id, mock_get_log_entries
+):
+    """Test batch get returns items in request order with misses flagged"""
+    # Arrange
+    log_cache.clear()
+    first, second, unknown = str(uuid4()), str(uuid4()), str(uuid4())
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "tenant-abc"
+    # The database returns rows in its own order
+    mock_get_log_entries.return_value = [_mock_log(second), _mock_log(first)]
+
+    # Act
+    response = client.post(
+        "/api/v1/logs/batch-get", json={"ids": [first, unknown, second, first]}
+    )
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [item["id"] for item in data["items"]] == [first, unknown, second, first]
+    assert [item["found"] for item in data["items"]] == [True, False, True, True]
+    assert data["items"][0]["log"]["alid"] == first
+    assert data["items"][1]["log"] is None
+    assert data["missing"] == [unknown]
+    mock_get_log_entries.assert_called_once_with(
+        mock_db, "tenant-abc", [first, unknown, second]
+    )
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("services.cache.get_log_entries")
+@patch("api.logs.get_tenant_id")
+def test_batch_get_logs_api_only_queries_uncached_ids(
+    mock_get_tenant_id, mock_get_log_entries
+):
+    """Test batch get reads cached logs without touching the database"""
+    # Arrange
+    log_cache.clear()
+    cached, fresh = str(uuid4()), str(uuid4())
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "tenant-abc"
+    mock_get_log_entries.side_effect = [[_mock_log(cached)], [_mock_log(fresh)]]
+    client.post("/api/v1/logs/batch-get", json={"ids": [cached]})
+
+    # Act
+    response = client.post("/api/v1/logs/batch-get", json={"ids": [cached, fresh]})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["data"]["missing"] == []
+    assert mock_get_log_entries.call_args[0][2] == [fresh]
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.get_tenant_id")
+def test_batch_get_logs_api_invalid_ids(mock_get_tenant_id):
+    """Test batch get reports every invalid ID at once"""
+    # Arrange
+    app.dependency_overrides[get_session] = lambda: mock_async_session()
+    mock_get_tenant_id.return_value = "tenant-abc"
+
+    # Act
+    response = client.post(
+        "/api/v1/logs/batch-get", json={"ids": ["bad-1", str(uuid4()), "bad-2"]}
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json()["detail"]["invalid_ids"] == ["bad-1", "bad-2"]
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.settings.LOG_BATCH_GET_MAX_IDS", 2)
+@patch("api.logs.get_tenant_id")
+def test_batch_get_logs_api_too_many_ids(mock_get_tenant_id):
+    """Test batch get rejects more IDs than the limit"""
+    # Arrange
+    app.dependency_overrides[get_session] = lambda: mock_async_session()
+    mock_get_tenant_id.return_value = "tenant-abc"
+
+    # Act
+    response = client.post(
+        "/api/v1/logs/batch-get", json={"ids": [str(uuid4()) for _ in range(3)]}
+    )
+
+    # Assert
+    assert response.status_code == 400
+
+    # Cleanup
+    app.dependency_overrides = {}
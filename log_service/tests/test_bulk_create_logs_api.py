@@ -1,21 +1,24 @@
 """Test bulk create logs API"""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
+from core.config import settings
 from core.db import get_session
 from main import app
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
 def override_get_session():
     """Override get_session"""
-    return MagicMock()
+    return mock_async_session()
 
 
-@patch("api.logs.send_to_log_queue")
+@patch.object(settings, "OUTBOX_ENABLED", False)
+@patch("api.logs.send_batch_to_log_queue_async")
 @patch("api.logs.create_bulk_logs")
 @patch("api.logs.get_tenant_id")
 def test_bulk_create_logs_api_success(
@@ -23,7 +26,7 @@ def test_bulk_create_logs_api_success(
 ):
     """Test bulk create logs API success"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
     mock_get_tenant_id.return_value = "tenant-1"
 
@@ -45,9 +48,11 @@ def test_bulk_create_logs_api_success(
         ]
     }
 
+    mock_send_queue.return_value = ["log-2"]
     mock_create_bulk.return_value = {
         "affected_rows": 2,
         "log_ids": ["log-1", "log-2"],
+        "documents": None,
     }
 
     # Act
@@ -57,10 +62,10 @@ def test_bulk_create_logs_api_success(
     assert response.status_code == 200
     data = response.json()["data"]
     assert data["affected_rows"] == 2
+    assert data["failed_log_ids"] == ["log-2"]
 
     mock_create_bulk.assert_called_once()
-    mock_send_queue.assert_any_call("log-1", "tenant-1")
-    mock_send_queue.assert_any_call("log-2", "tenant-1")
+    mock_send_queue.assert_called_once_with(["log-1", "log-2"], "tenant-1", None)
 
     # Cleanup
     app.dependency_overrides = {}
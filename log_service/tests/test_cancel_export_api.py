@@ -0,0 +1,119 @@
+"""Test cancel export pipeline API"""
+
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from core.db import get_session
+from main import app
+from tests.helpers import mock_async_session
+
+client = TestClient(app)
+
+
+def override_get_session():
+    """Override get_session"""
+    return mock_async_session()
+
+
+def _mock_pipeline(pipeline_id: str, status: str) -> MagicMock:
+    mock_pipeline = MagicMock()
+    mock_pipeline.id = pipeline_id
+    mock_pipeline.tenant_id = "test-tenant-id"
+    mock_pipeline.status = status
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "none"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
+    mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 4
+    mock_pipeline.shards_done = 1
+    mock_pipeline.rows_processed = 250
+    mock_pipeline.bytes_written = 16000
+    mock_pipeline.rows_estimated = 1000
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
+    mock_pipeline.created_at = "2024-01-01T00:00:00Z"
+    return mock_pipeline
+
+
+@patch("api.logs.cancel_export_pipeline")
+@patch("api.logs.get_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_cancel_export_api_success(
+    mock_get_tenant_id,
+    mock_get_export_pipeline,
+    mock_cancel_export_pipeline,
+):
+    """Test cancel export API cancels a running pipeline"""
+    # Arrange
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "test-tenant-id"
+
+    pipeline_id = str(uuid4())
+    mock_pipeline = _mock_pipeline(pipeline_id, "CANCELLED")
+    mock_get_export_pipeline.return_value = mock_pipeline
+    mock_cancel_export_pipeline.return_value = True
+
+    # Act
+    response = client.delete(f"/api/v1/logs/export/{pipeline_id}")
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["status"] == "CANCELLED"
+    assert data["rows_processed"] == 250
+    mock_cancel_export_pipeline.assert_called_once_with(mock_db, mock_pipeline)
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.cancel_export_pipeline")
+@patch("api.logs.get_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_cancel_export_api_finished(
+    mock_get_tenant_id,
+    mock_get_export_pipeline,
+    mock_cancel_export_pipeline,
+):
+    """Test cancel export API rejects pipelines that already finished"""
+    # Arrange
+    app.dependency_overrides[get_session] = override_get_session
+    mock_get_tenant_id.return_value = "test-tenant-id"
+    pipeline_id = str(uuid4())
+    mock_get_export_pipeline.return_value = _mock_pipeline(pipeline_id, "DONE")
+    mock_cancel_export_pipeline.return_value = False
+
+    # Act
+    response = client.delete(f"/api/v1/logs/export/{pipeline_id}")
+
+    # Assert
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Pipeline is already DONE"
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.get_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_cancel_export_api_not_found(mock_get_tenant_id, mock_get_export_pipeline):
+    """Test cancel export API returns 404 for unknown pipelines"""
+    # Arrange
+    app.dependency_overrides[get_session] = override_get_session
+    mock_get_tenant_id.return_value = "test-tenant-id"
+    mock_get_export_pipeline.return_value = None
+
+    # Act
+    response = client.delete(f"/api/v1/logs/export/{uuid4()}")
+
+    # Assert
+    assert response.status_code == 404
+
+    # Cleanup
+    app.dependency_overrides = {}
@@ -1,18 +1,19 @@
 """Test cleanup logs API"""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 from core.db import get_session
 from main import app
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
 def override_get_session():
     """Override get_session"""
-    return MagicMock()
+    return mock_async_session()
 
 
 @patch("api.logs.cleanup_old_logs")
@@ -23,7 +24,7 @@ def test_cleanup_logs_api(
 ):
     """Test cleanup logs API"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
 
     # Mock get_tenant_id to return the expected tenant_id
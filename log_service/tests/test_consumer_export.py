@@ -0,0 +1,116 @@
+"""Test export consumer"""
+
+import queue
+import threading
+import time
+from unittest.mock import MagicMock, call, patch
+
+from consumer_export import export_shard, plan_export, receive_loop
+from models import ExportPipeline, ExportShard
+
+
+@patch("consumer_export.send_to_export_queue")
+@patch("consumer_export.get_pending_export_shards")
+def test_plan_export_requeues_pending_shards(mock_get_pending, mock_send):
+    """Test a redelivered planning message queues the still pending shards"""
+    # Arrange
+    mock_db = MagicMock()
+    pipeline = ExportPipeline(id="export-1", tenant_id="tenant-abc")
+    pipeline.status = "IN_PROGRESS"
+    mock_get_pending.return_value = [ExportShard(shard_index=2)]
+
+    # Act
+    plan_export(mock_db, pipeline)
+
+    # Assert
+    mock_get_pending.assert_called_once_with(mock_db, "export-1")
+    assert mock_send.call_args_list == [call("export-1", "tenant-abc", shard=2)]
+    mock_db.commit.assert_not_called()
+
+
+@patch("consumer_export.send_to_export_queue")
+@patch("consumer_export.get_pending_export_shards")
+def test_plan_export_skips_finished_pipeline(mock_get_pending, mock_send):
+    """Test a planning message for a finished pipeline queues nothing"""
+    pipeline = ExportPipeline(id="export-1", tenant_id="tenant-abc")
+    pipeline.status = "CANCELLED"
+
+    plan_export(MagicMock(), pipeline)
+
+    mock_get_pending.assert_not_called()
+    mock_send.assert_not_called()
+
+
+@patch("consumer_export.finalize_export_pipeline")
+@patch("consumer_export.complete_export_shard")
+@patch("consumer_export.write_export")
+@patch("consumer_export.S3MultipartWriter")
+@patch("consumer_export.SessionLocal")
+@patch("consumer_export.get_logs_for_export")
+@patch("consumer_export.claim_export_shard")
+@patch("consumer_export.get_export_shard")
+def test_export_shard_handles_duplicate_messages_once(
+    mock_get_shard,
+    mock_claim,
+    _mock_get_logs,
+    _mock_session_local,
+    mock_writer,
+    mock_write_export,
+    mock_complete,
+    mock_finalize,
+):
+    """Test a second copy of a shard message does not export the shard again"""
+    # Arrange
+    mock_db = MagicMock()
+    pipeline = ExportPipeline(
+        id="export-1", tenant_id="tenant-abc", format="csv", compression="none"
+    )
+    pipeline.status = "IN_PROGRESS"
+    mock_get_shard.return_value = ExportShard(id="shard-1", shard_index=0)
+    # The first copy claims the shard, the second finds it claimed
+    mock_claim.side_effect = [1, None]
+    mock_write_export.return_value = 10
+    mock_complete.return_value = True
+
+    # Act
+    export_shard(mock_db, pipeline, 0)
+    export_shard(mock_db, pipeline, 0)
+
+    # Assert
+    assert mock_claim.call_count == 2
+    mock_writer.assert_called_once()
+    mock_complete.assert_called_once()
+    assert mock_complete.call_args[0][3] == 1
+    assert mock_complete.call_args[1]["row_count"] == 10
+    mock_finalize.assert_called_once()
+
+
+@patch("consumer_export.get_sqs_client")
+def test_receive_loop_waits_for_an_idle_worker(mock_get_client):
+    """Test a message is only received while a worker is idle"""
+    # Arrange
+    mock_sqs = mock_get_client.return_value
+    mock_sqs.receive_message.return_value = {
+        "Messages": [{"MessageId": "m-1", "ReceiptHandle": "r-1", "Body": "{}"}]
+    }
+    inbox = queue.Queue()
+    stop = threading.Event()
+    idle = threading.Semaphore(1)
+    receiver = threading.Thread(
+        target=receive_loop, args=(inbox, MagicMock(), stop, idle)
+    )
+
+    # Act
+    receiver.start()
+    inbox.get(timeout=1)
+    time.sleep(0.1)
+    busy_calls = mock_sqs.receive_message.call_count
+    # The worker finishes its message
+    idle.release()
+    inbox.get(timeout=1)
+    stop.set()
+    receiver.join(timeout=5)
+
+    # Assert
+    assert busy_calls == 1
+    assert mock_sqs.receive_message.call_count == 2
@@ -0,0 +1,104 @@
+"""Test log consumer"""
+
+import json
+import queue
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from consumer_log import resolve_documents, supervise, worker_loop
+from infra.sqs import VisibilityHeartbeat
+
+
+@patch("consumer_log.SessionLocal")
+def test_resolve_documents_releases_malformed_messages(mock_session_local):
+    """Test malformed messages are released and skipped"""
+    # Arrange
+    heartbeat = MagicMock()
+    document = {"id": "log-1", "tenant_id": "tenant-abc"}
+    good = {
+        "MessageId": "m-1",
+        "ReceiptHandle": "r-1",
+        "Body": json.dumps(
+            {"log_id": "log-1", "tenant_id": "tenant-abc", "document": document}
+        ),
+    }
+    not_json = {"MessageId": "m-2", "ReceiptHandle": "r-2", "Body": "{not json"}
+    no_ids = {"MessageId": "m-3", "ReceiptHandle": "r-3", "Body": "{}"}
+
+    # Act
+    resolved = resolve_documents([good, not_json, no_ids], heartbeat)
+
+    # Assert
+    assert resolved == [(good, document)]
+    heartbeat.release.assert_any_call([not_json])
+    heartbeat.release.assert_any_call([no_ids])
+    assert heartbeat.release.call_count == 2
+    mock_session_local.assert_not_called()
+
+
+@patch("consumer_log.settings")
+@patch("consumer_log.bulk_index_documents")
+@patch("consumer_log.get_sqs_client")
+def test_worker_survives_delete_errors(mock_get_client, mock_bulk_index, mock_settings):
+    """Test a failed delete releases the batch and keeps the worker running"""
+    # Arrange
+    mock_settings.LOG_CONSUMER_BULK_SIZE = 1
+    mock_settings.LOG_CONSUMER_BULK_MAX_SECONDS = 5.0
+    mock_get_client.return_value.delete_message_batch.side_effect = RuntimeError(
+        "throttled"
+    )
+    mock_bulk_index.return_value = []
+    heartbeat = VisibilityHeartbeat("queue-url", 60)
+    document = {"id": "log-1", "tenant_id": "tenant-abc"}
+    messages = [
+        {
+            "MessageId": f"m-{index}",
+            "ReceiptHandle": f"r-{index}",
+            "Body": json.dumps(
+                {"log_id": "log-1", "tenant_id": "tenant-abc", "document": document}
+            ),
+        }
+        for index in range(2)
+    ]
+    inbox = queue.Queue()
+    stop = threading.Event()
+    worker = threading.Thread(target=worker_loop, args=(inbox, heartbeat, stop))
+    worker.start()
+
+    # Act
+    for message in messages:
+        heartbeat.track([message])
+        inbox.put([message])
+    for _ in range(100):
+        if mock_get_client.return_value.delete_message_batch.call_count == 2:
+            break
+        time.sleep(0.01)
+    alive = worker.is_alive()
+    stop.set()
+    worker.join(timeout=5)
+
+    # Assert
+    assert alive
+    assert mock_get_client.return_value.delete_message_batch.call_count == 2
+    assert not heartbeat._handles  # pylint: disable=protected-access
+
+
+def test_supervise_restarts_dead_threads():
+    """Test a thread that died is started again from its spec"""
+    # Arrange
+    stop = MagicMock()
+    stop.wait.side_effect = [False, True]
+    restarted = threading.Event()
+    dead = threading.Thread(target=lambda: None, name="log-worker-0")
+    dead.start()
+    dead.join()
+    threads = [dead]
+
+    # Act
+    supervise(threads, [(restarted.set, (), "log-worker-0")], stop)
+
+    # Assert
+    assert threads[0] is not dead
+    assert threads[0].name == "log-worker-0"
+    assert restarted.wait(timeout=1)
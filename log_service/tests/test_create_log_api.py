@@ -5,18 +5,21 @@ from uuid import uuid4
 
 from fastapi.testclient import TestClient
 
+from core.config import settings
 from core.db import get_session
 from main import app
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
 def override_get_session():
     """Override get_session"""
-    return MagicMock()
+    return mock_async_session()
 
 
-@patch("api.logs.send_to_log_queue")
+@patch.object(settings, "OUTBOX_ENABLED", False)
+@patch("api.logs.send_to_log_queue_async")
 @patch("api.logs.create_log_entry")
 @patch("api.logs.get_tenant_id")
 def test_create_log_api_success(
@@ -24,7 +27,7 @@ def test_create_log_api_success(
 ):
     """Test create log API success"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
     tenant_id = str(uuid4())
     mock_get_tenant_id.return_value = tenant_id
@@ -91,7 +94,49 @@ def test_create_log_api_success(
 
     mock_get_tenant_id.assert_called_once()
     mock_create_log.assert_called_once()
-    mock_send_to_queue.assert_called_once_with(alid, tenant_id)
+    mock_send_to_queue.assert_called_once_with(alid, tenant_id, None)
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch.object(settings, "OUTBOX_ENABLED", True)
+@patch("api.logs.send_to_log_queue_async")
+@patch("api.logs.create_log_entry")
+@patch("api.logs.get_tenant_id")
+def test_create_log_api_with_outbox(
+    mock_get_tenant_id, mock_create_log, mock_send_to_queue
+):
+    """Test create log API leaves queueing to the outbox relay"""
+    # Arrange
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    tenant_id = str(uuid4())
+    mock_get_tenant_id.return_value = tenant_id
+
+    mock_log = MagicMock()
+    mock_log.alid = str(uuid4())
+    mock_log.tenant_id = tenant_id
+    mock_log.created_at = "2024-01-01T00:00:00Z"
+    mock_create_log.return_value = mock_log
+
+    payload = {
+        "user_id": "user-abc",
+        "email": None,
+        "action": "LOGIN",
+        "resource_type": "user",
+        "resource_id": "user_12345",
+        "ip_address": None,
+        "user_agent": None,
+    }
+
+    # Act
+    response = client.post("/api/v1/logs", json=payload)
+
+    # Assert
+    assert response.status_code == 201
+    mock_create_log.assert_called_once()
+    mock_send_to_queue.assert_not_called()
 
     # Cleanup
     app.dependency_overrides = {}
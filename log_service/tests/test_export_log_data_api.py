@@ -8,16 +8,17 @@ from fastapi.testclient import TestClient
 from core.db import get_session
 from main import app
 from models.export_pipeline import ExportPipeline
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
 def override_get_session():
     """Override get_session"""
-    return MagicMock()
+    return mock_async_session()
 
 
-@patch("api.logs.send_to_export_queue")
+@patch("api.logs.send_to_export_queue_async")
 @patch("api.logs.create_export_pipeline")
 @patch("api.logs.get_tenant_id")
 def test_export_log_data_api_success(
@@ -25,7 +26,7 @@ def test_export_log_data_api_success(
 ):
     """Test export log data API success"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
 
     # Mock get_tenant_id to return the expected tenant_id
@@ -37,7 +38,20 @@ def test_export_log_data_api_success(
     mock_pipeline.id = pipeline_id
     mock_pipeline.tenant_id = "1"
     mock_pipeline.status = "PENDING"
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "none"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
     mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 0
+    mock_pipeline.shards_done = 0
+    mock_pipeline.rows_processed = 0
+    mock_pipeline.bytes_written = 0
+    mock_pipeline.rows_estimated = None
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
 
     mock_create_export_pipeline.return_value = mock_pipeline
 
@@ -54,14 +68,16 @@ def test_export_log_data_api_success(
 
     # Verify function calls
     mock_get_tenant_id.assert_called_once()
-    mock_create_export_pipeline.assert_called_once_with("1", mock_db)
+    mock_create_export_pipeline.assert_called_once_with(
+        "1", mock_db, "csv", None, {}, False
+    )
     mock_send_to_export_queue.assert_called_once_with(pipeline_id, "1")
 
     # Cleanup
     app.dependency_overrides = {}
 
 
-@patch("api.logs.send_to_export_queue")
+@patch("api.logs.send_to_export_queue_async")
 @patch("api.logs.create_export_pipeline")
 @patch("api.logs.get_tenant_id")
 def test_export_log_data_api_with_different_tenant(
@@ -69,7 +85,7 @@ def test_export_log_data_api_with_different_tenant(
 ):
     """Test export log data API with different tenant"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
 
     # Mock get_tenant_id to return a different tenant_id
@@ -81,7 +97,20 @@ def test_export_log_data_api_with_different_tenant(
     mock_pipeline.id = pipeline_id
     mock_pipeline.tenant_id = "tenant-123"
     mock_pipeline.status = "PENDING"
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "none"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
     mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 0
+    mock_pipeline.shards_done = 0
+    mock_pipeline.rows_processed = 0
+    mock_pipeline.bytes_written = 0
+    mock_pipeline.rows_estimated = None
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
 
     mock_create_export_pipeline.return_value = mock_pipeline
 
@@ -94,7 +123,9 @@ def test_export_log_data_api_with_different_tenant(
     assert data["data"]["tenant_id"] == "tenant-123"
 
     # Verify function calls
-    mock_create_export_pipeline.assert_called_once_with("tenant-123", mock_db)
+    mock_create_export_pipeline.assert_called_once_with(
+        "tenant-123", mock_db, "csv", None, {}, False
+    )
     mock_send_to_export_queue.assert_called_once_with(
         pipeline_id,
         "tenant-123",
@@ -102,3 +133,201 @@ def test_export_log_data_api_with_different_tenant(
 
     # Cleanup
     app.dependency_overrides = {}
+
+
+@patch("api.logs.send_to_export_queue_async")
+@patch("api.logs.create_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_export_log_data_api_parquet(
+    mock_get_tenant_id, mock_create_export_pipeline, mock_send_to_export_queue
+):
+    """Test export log data API with parquet format"""
+    # Arrange
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "1"
+
+    pipeline_id = str(uuid4())
+    mock_pipeline = MagicMock(spec=ExportPipeline)
+    mock_pipeline.id = pipeline_id
+    mock_pipeline.tenant_id = "1"
+    mock_pipeline.status = "PENDING"
+    mock_pipeline.format = "parquet"
+    mock_pipeline.compression = "zstd"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
+    mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 0
+    mock_pipeline.shards_done = 0
+    mock_pipeline.rows_processed = 0
+    mock_pipeline.bytes_written = 0
+    mock_pipeline.rows_estimated = None
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
+    mock_create_export_pipeline.return_value = mock_pipeline
+
+    # Act
+    response = client.post("/api/v1/logs/export", json={"format": "parquet"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["data"]["format"] == "parquet"
+    assert response.json()["data"]["compression"] == "zstd"
+    mock_create_export_pipeline.assert_called_once_with(
+        "1", mock_db, "parquet", None, {}, False
+    )
+    mock_send_to_export_queue.assert_called_once_with(pipeline_id, "1")
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.create_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_export_log_data_api_invalid_format(
+    mock_get_tenant_id, mock_create_export_pipeline
+):
+    """Test export log data API rejects unknown formats and compressions"""
+    app.dependency_overrides[get_session] = MagicMock
+    mock_get_tenant_id.return_value = "1"
+
+    response = client.post("/api/v1/logs/export", json={"format": "xlsx"})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/logs/export", json={"compression": "bz2"})
+    assert response.status_code == 422
+    mock_create_export_pipeline.assert_not_called()
+
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.send_to_export_queue_async")
+@patch("api.logs.create_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_export_log_data_api_compression(
+    mock_get_tenant_id, mock_create_export_pipeline, mock_send_to_export_queue
+):
+    """Test export log data API passes the requested compression"""
+    # Arrange
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "1"
+
+    mock_pipeline = MagicMock(spec=ExportPipeline)
+    mock_pipeline.id = str(uuid4())
+    mock_pipeline.tenant_id = "1"
+    mock_pipeline.status = "PENDING"
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "gzip"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
+    mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 0
+    mock_pipeline.shards_done = 0
+    mock_pipeline.rows_processed = 0
+    mock_pipeline.bytes_written = 0
+    mock_pipeline.rows_estimated = None
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
+    mock_create_export_pipeline.return_value = mock_pipeline
+
+    # Act
+    response = client.post("/api/v1/logs/export", json={"compression": "gzip"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["data"]["compression"] == "gzip"
+    mock_create_export_pipeline.assert_called_once_with(
+        "1", mock_db, "csv", "gzip", {}, False
+    )
+    mock_send_to_export_queue.assert_called_once()
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.send_to_export_queue_async")
+@patch("api.logs.create_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_export_log_data_api_filters_and_incremental(
+    mock_get_tenant_id, mock_create_export_pipeline, mock_send_to_export_queue
+):
+    """Test export log data API stores filters and incremental mode"""
+    # Arrange
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "1"
+
+    mock_pipeline = MagicMock(spec=ExportPipeline)
+    mock_pipeline.id = str(uuid4())
+    mock_pipeline.tenant_id = "1"
+    mock_pipeline.status = "PENDING"
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "none"
+    mock_pipeline.filters = {"action": "LOGIN"}
+    mock_pipeline.incremental = True
+    mock_pipeline.watermark = None
+    mock_pipeline.file_url = None
+    mock_pipeline.manifest_url = None
+    mock_pipeline.shard_count = 0
+    mock_pipeline.shards_done = 0
+    mock_pipeline.rows_processed = 0
+    mock_pipeline.bytes_written = 0
+    mock_pipeline.rows_estimated = None
+    mock_pipeline.started_at = None
+    mock_pipeline.finished_at = None
+    mock_create_export_pipeline.return_value = mock_pipeline
+
+    # Act
+    response = client.post(
+        "/api/v1/logs/export",
+        json={
+            "start_time": "2024-01-01T00:00:00Z",
+            "action": "LOGIN",
+            "severity": None,
+            "incremental": True,
+        },
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["data"]["incremental"] is True
+    mock_create_export_pipeline.assert_called_once_with(
+        "1",
+        mock_db,
+        "csv",
+        None,
+        {"start_time": "2024-01-01T00:00:00Z", "action": "LOGIN"},
+        True,
+    )
+    mock_send_to_export_queue.assert_called_once()
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("api.logs.create_export_pipeline")
+@patch("api.logs.get_tenant_id")
+def test_export_log_data_api_invalid_time_range(
+    mock_get_tenant_id, mock_create_export_pipeline
+):
+    """Test export log data API rejects an empty time range"""
+    app.dependency_overrides[get_session] = MagicMock
+    mock_get_tenant_id.return_value = "1"
+
+    response = client.post(
+        "/api/v1/logs/export",
+        json={
+            "start_time": "2024-02-01T00:00:00Z",
+            "end_time": "2024-01-01T00:00:00Z",
+        },
+    )
+
+    assert response.status_code == 422
+    mock_create_export_pipeline.assert_not_called()
+
+    app.dependency_overrides = {}
@@ -1,5 +1,6 @@
 """Test get export pipeline result API"""
 
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
@@ -7,13 +8,14 @@ from fastapi.testclient import TestClient
 
 from core.db import get_session
 from main import app
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
 def override_get_session():
     """Override get_session"""
-    return MagicMock()
+    return mock_async_session()
 
 
 @patch("api.logs.get_export_pipeline")
@@ -24,16 +26,29 @@ def test_export_result_api_success(
 ):
     """Test export result API success"""
     # Arrange
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
     mock_get_tenant_id.return_value = "test-tenant-id"
 
     pipeline_id = str(uuid4())
     mock_pipeline = MagicMock()
     mock_pipeline.id = pipeline_id
+    mock_pipeline.format = "csv"
+    mock_pipeline.compression = "none"
+    mock_pipeline.filters = None
+    mock_pipeline.incremental = False
+    mock_pipeline.watermark = None
     mock_pipeline.status = "DONE"
     mock_pipeline.tenant_id = "test-tenant-id"
     mock_pipeline.file_url = "https://example.com/file.csv"
+    mock_pipeline.manifest_url = "https://example.com/manifest.json"
+    mock_pipeline.shard_count = 1
+    mock_pipeline.shards_done = 1
+    mock_pipeline.rows_processed = 1000
+    mock_pipeline.bytes_written = 64000
+    mock_pipeline.rows_estimated = 1000
+    mock_pipeline.started_at = datetime(2024, 1, 1, 0, 0, 0)
+    mock_pipeline.finished_at = datetime(2024, 1, 1, 0, 0, 10)
     mock_pipeline.created_at = "2024-01-01T00:00:00Z"
 
     mock_get_export_pipeline.return_value = mock_pipeline
@@ -49,6 +64,10 @@ def test_export_result_api_success(
     assert data["tenant_id"] == "test-tenant-id"
     assert data["created_at"] == "2024-01-01T00:00:00Z"
     assert data["file_url"] == "https://example.com/file.csv"
+    assert data["manifest_url"] == "https://example.com/manifest.json"
+    assert data["shards_done"] == data["shard_count"] == 1
+    assert data["rows_processed"] == data["rows_estimated"] == 1000
+    assert data["rows_per_second"] == 100.0
 
     mock_get_export_pipeline.assert_called_once_with(
         mock_db, "test-tenant-id", pipeline_id
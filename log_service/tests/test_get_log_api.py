@@ -8,19 +8,40 @@ from fastapi.testclient import TestClient
 
 from core.db import get_session
 from main import app
+from services.cache import log_cache
+from tests.helpers import mock_async_session
 
 client = TestClient(app)
 
 
-@patch("api.logs.get_log_entry")
+def _mock_log(log_id: str, tenant_id: str) -> MagicMock:
+    mock_log = MagicMock()
+    mock_log.alid = log_id
+    mock_log.tenant_id = tenant_id
+    mock_log.user_id = "user-123"
+    mock_log.action = "LOGIN"
+    mock_log.resource_type = "user"
+    mock_log.resource_id = "user_12345"
+    mock_log.ip_address = "192.168.0.1"
+    mock_log.user_agent = "Mozilla/5.0"
+    mock_log.log_metadata = {"login_method": "oauth"}
+    mock_log.before_state = {}
+    mock_log.after_state = {}
+    mock_log.severity = "INFO"
+    mock_log.created_at = datetime(2024, 1, 1, 0, 0, 0)
+    return mock_log
+
+
+@patch("services.cache.get_log_entry")
 @patch("api.logs.get_tenant_id")
 def test_get_log_api_success(mock_get_tenant_id, mock_get_log_entry):
     """Test get log API success"""
     # Arrange
+    log_cache.clear()
     log_id = str(uuid4())
     tenant_id = "tenant-abc"
 
-    mock_db = MagicMock()
+    mock_db = mock_async_session()
     app.dependency_overrides[get_session] = lambda: mock_db
     mock_get_tenant_id.return_value = tenant_id
 
@@ -71,9 +92,65 @@ def test_get_log_api_success(mock_get_tenant_id, mock_get_log_entry):
     assert data["resource_type"] == "user"
     assert data["tenant_id"] == tenant_id
     assert data["log_metadata"]["login_method"] == "oauth"
+    assert response.headers["ETag"].startswith('"')
 
     mock_get_tenant_id.assert_called_once()
     mock_get_log_entry.assert_called_once_with(mock_db, tenant_id, log_id)
 
     # Cleanup
     app.dependency_overrides = {}
+
+
+@patch("services.cache.get_log_entry")
+@patch("api.logs.get_tenant_id")
+def test_get_log_api_serves_repeat_reads_from_cache(
+    mock_get_tenant_id, mock_get_log_entry
+):
+    """Test repeated reads of a log hit the database once"""
+    # Arrange
+    log_cache.clear()
+    log_id = str(uuid4())
+    mock_db = mock_async_session()
+    app.dependency_overrides[get_session] = lambda: mock_db
+    mock_get_tenant_id.return_value = "tenant-abc"
+    mock_get_log_entry.return_value = _mock_log(log_id, "tenant-abc")
+
+    # Act
+    first = client.get(f"/api/v1/logs/{log_id}")
+    second = client.get(f"/api/v1/logs/{log_id}")
+
+    # Assert
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    mock_get_log_entry.assert_called_once()
+    assert log_cache.stats()["hits"] == 1
+
+    # Cleanup
+    app.dependency_overrides = {}
+
+
+@patch("services.cache.get_log_entry")
+@patch("api.logs.get_tenant_id")
+def test_get_log_api_not_modified(mock_get_tenant_id, mock_get_log_entry):
+    """Test get log API answers a matching If-None-Match with 304"""
+    # Arrange
+    log_cache.clear()
+    log_id = str(uuid4())
+    app.dependency_overrides[get_session] = lambda: mock_async_session()
+    mock_get_tenant_id.return_value = "tenant-abc"
+    mock_get_log_entry.return_value = _mock_log(log_id, "tenant-abc")
+    etag = client.get(f"/api/v1/logs/{log_id}").headers["ETag"]
+
+    # Act
+    response = client.get(
+        f"/api/v1/logs/{log_id}", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+
+    # Assert
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    # Cleanup
+    app.dependency_overrides = {}
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 from main import app
+from services.cache import stats_cache
 
 client = TestClient(app)
 
@@ -14,6 +15,7 @@ client = TestClient(app)
 def test_get_log_stats_api(mock_get_tenant_id, mock_get_log_stats):
     """Test get log stats API"""
     # Arrange
+    stats_cache.clear()
     mock_get_tenant_id.return_value = "test-tenant-id"
     mock_get_log_stats.return_value = {
         "action_counts": [
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 
 from main import app
+from services.search import encode_log_cursor
 
 client = TestClient(app)
 
@@ -24,6 +25,8 @@ def test_list_logs_api_success(mock_get_tenant_id, mock_search_logs):
         "search": None,
         "page": 2,
         "page_size": 1,
+        "cursor": None,
+        "pit": False,
     }
 
     mock_search_logs.return_value = {
@@ -40,6 +43,7 @@ def test_list_logs_api_success(mock_get_tenant_id, mock_search_logs):
                 "created_at": "2024-01-01T00:00:00Z",
             }
         ],
+        "next_cursor": "next-page",
     }
 
     # Act
@@ -53,6 +57,61 @@ def test_list_logs_api_success(mock_get_tenant_id, mock_search_logs):
     assert len(data["items"]) == 1
     assert data["page"] == 2
     assert data["page_size"] == 1
+    assert data["next_cursor"] == "next-page"
 
     mock_get_tenant_id.assert_called_once()
     mock_search_logs.assert_called_once_with(tenant_id, expected_filters)
+
+
+@patch("api.logs.search_logs")
+@patch("api.logs.get_tenant_id")
+def test_list_logs_api_with_cursor(mock_get_tenant_id, mock_search_logs):
+    """Test list logs API decodes the cursor"""
+    # Arrange
+    mock_get_tenant_id.return_value = "tenant-abc"
+    mock_search_logs.return_value = {"total": 0, "logs": [], "next_cursor": None}
+    cursor = encode_log_cursor(
+        {"search_after": ["2024-01-01T00:00:00Z", "log-001"]}, "tenant-abc"
+    )
+
+    # Act
+    response = client.get(f"/api/v1/logs/?cursor={cursor}")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    filters = mock_search_logs.call_args[0][1]
+    assert filters["cursor"] == {"search_after": ["2024-01-01T00:00:00Z", "log-001"]}
+
+
+@patch("api.logs.search_logs")
+@patch("api.logs.get_tenant_id")
+def test_list_logs_api_invalid_cursor(mock_get_tenant_id, mock_search_logs):
+    """Test list logs API rejects a malformed cursor"""
+    # Arrange
+    mock_get_tenant_id.return_value = "tenant-abc"
+
+    # Act
+    response = client.get("/api/v1/logs/?cursor=not-a-cursor!")
+
+    # Assert
+    assert response.status_code == 400
+    mock_search_logs.assert_not_called()
+
+
+@patch("api.logs.search_logs")
+@patch("api.logs.get_tenant_id")
+def test_list_logs_api_rejects_cursor_of_other_tenant(
+    mock_get_tenant_id, mock_search_logs
+):
+    """Test list logs API rejects a cursor issued to another tenant"""
+    # Arrange
+    mock_get_tenant_id.return_value = "tenant-abc"
+    cursor = encode_log_cursor({"pit_id": "pit-of-other-tenant"}, "tenant-xyz")
+
+    # Act
+    response = client.get(f"/api/v1/logs/?cursor={cursor}")
+
+    # Assert
+    assert response.status_code == 400
+    mock_search_logs.assert_not_called()
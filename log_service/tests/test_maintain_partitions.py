@@ -0,0 +1,33 @@
+"""Test partition maintenance"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from maintain_partitions import maintain_once
+
+
+@patch("maintain_partitions.drop_expired_audit_log_partitions")
+@patch("maintain_partitions.ensure_audit_log_partitions")
+@patch("maintain_partitions.engine")
+@patch("maintain_partitions.SessionLocal")
+@patch("maintain_partitions.settings")
+def test_maintain_once(
+    mock_settings, mock_session_local, mock_engine, mock_ensure, mock_drop
+):
+    """Test maintenance creates partitions and drops them outside a transaction"""
+    # Arrange
+    mock_settings.AUDIT_LOG_PARTITIONS_AHEAD = 3
+    mock_settings.AUDIT_LOG_RETENTION_DAYS = 90
+    mock_db = mock_session_local.return_value.__enter__.return_value
+    mock_connect = mock_engine.connect.return_value
+    mock_connection = mock_connect.execution_options.return_value.__enter__()
+
+    # Act
+    maintain_once()
+
+    # Assert
+    mock_ensure.assert_called_once_with(mock_db, 3)
+    mock_connect.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    connection, cutoff = mock_drop.call_args[0]
+    assert connection is mock_connection
+    assert cutoff <= datetime.now(timezone.utc) - timedelta(days=90)
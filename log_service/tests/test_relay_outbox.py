@@ -0,0 +1,38 @@
+"""Test outbox relay"""
+
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from models.outbox import OutboxEvent
+from relay_outbox import relay_once
+
+
+@patch("relay_outbox.send_batch_to_log_queue")
+@patch("relay_outbox.claim_outbox_events")
+@patch("relay_outbox.settings")
+@patch("services.outbox.settings")
+def test_relay_once_retries_failed_events(
+    mock_outbox_settings, mock_settings, mock_claim, mock_send
+):
+    """Test failed events are retried later instead of blocking the outbox"""
+    # Arrange
+    mock_outbox_settings.OUTBOX_MAX_ATTEMPTS = 2
+    mock_outbox_settings.OUTBOX_RETRY_BASE_SECONDS = 1
+    mock_db = MagicMock()
+    sent = OutboxEvent(id=1, tenant_id="a", log_id=uuid4(), attempts=0)
+    failing = OutboxEvent(id=2, tenant_id="a", log_id=uuid4(), attempts=0)
+    exhausted = OutboxEvent(id=3, tenant_id="a", log_id=uuid4(), attempts=1)
+    mock_claim.return_value = [sent, failing, exhausted]
+    mock_send.return_value = [str(failing.log_id), str(exhausted.log_id)]
+
+    # Act
+    relayed = relay_once(mock_db)
+
+    # Assert
+    assert relayed == 1
+    assert failing.attempts == 1
+    assert failing.available_at is not None
+    assert exhausted.attempts == 2
+    deleted = mock_db.query.return_value.filter.call_args[0][0]
+    assert deleted.right.value == [1]
+    mock_db.commit.assert_called_once()
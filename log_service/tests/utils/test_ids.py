@@ -0,0 +1,43 @@
+"""Test identifier utilities"""
+
+import time
+from unittest.mock import patch
+
+from utils.ids import uuid7
+
+
+def test_uuid7_version_and_timestamp():
+    """Test uuid7 sets version, variant and the millisecond timestamp"""
+    # Arrange
+    before = time.time_ns() // 1_000_000
+
+    # Act
+    value = uuid7()
+
+    # Assert
+    after = time.time_ns() // 1_000_000
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_is_monotonic():
+    """Test uuid7 values sort in generation order"""
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+@patch("utils.ids.time.time_ns")
+def test_uuid7_monotonic_when_clock_steps_back(mock_time_ns):
+    """Test uuid7 stays ordered if the clock goes backwards"""
+    # Arrange
+    mock_time_ns.side_effect = [2_000_000_000_000_000, 1_000_000_000_000_000]
+
+    # Act
+    first = uuid7()
+    second = uuid7()
+
+    # Assert
+    assert second > first
+    assert second.int >> 80 == first.int >> 80
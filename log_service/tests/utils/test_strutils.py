@@ -1,4 +1,4 @@
-from utils.strutils import validate_uuid
+from utils.strutils import decode_cursor, encode_cursor, validate_uuid
 
 
 def test_validate_uuid_success():
@@ -9,9 +9,46 @@ def test_validate_uuid_success():
     assert error is None
 
 
+def test_validate_uuid_accepts_v7():
+    """Test validate UUID accepts time-ordered version 7 IDs"""
+    valid_uuid = "01920d3c-8f2a-7b4e-9c1d-5e6f7a8b9c0d"
+    result, error = validate_uuid(valid_uuid)
+    assert result == valid_uuid
+    assert error is None
+
+
 def test_validate_uuid_failure():
     """Test validate UUID failure"""
     invalid_uuid = "not-a-uuid"
     result, error = validate_uuid(invalid_uuid)
     assert result is None
     assert error == "Invalid UUID format"
+
+
+def test_cursor_round_trip():
+    """Test encode and decode cursor"""
+    state = {"search_after": ["2024-01-01T00:00:00Z", "log-1"], "pit_id": "abc"}
+    cursor = encode_cursor(state, "secret", context="tenant-a")
+    result, error = decode_cursor(cursor, "secret", context="tenant-a")
+    assert "=" not in cursor
+    assert result == state
+    assert error is None
+
+
+def test_decode_cursor_failure():
+    """Test decode cursor failure"""
+    result, error = decode_cursor("not-a-cursor!", "secret")
+    assert result is None
+    assert error == "Invalid cursor signature"
+
+
+def test_decode_cursor_rejects_other_context_and_tampering():
+    """Test a cursor only verifies with its own secret and context"""
+    cursor = encode_cursor({"pit_id": "abc"}, "secret", context="tenant-a")
+    payload, signature = cursor.split(".")
+    forged = encode_cursor({"pit_id": "xyz"}, "other", context="tenant-a")
+
+    assert decode_cursor(cursor, "secret", context="tenant-b")[0] is None
+    assert decode_cursor(cursor, "other", context="tenant-a")[0] is None
+    assert decode_cursor(f"{forged.split('.')[0]}.{signature}", "secret")[0] is None
+    assert decode_cursor(payload, "secret", context="tenant-a")[0] is None
@@ -1,5 +1,10 @@
 """String utilities"""
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
 import uuid
 
 
@@ -15,3 +20,54 @@ def validate_uuid(id_str: str) -> tuple[str, str]:
         return str(uuid.UUID(id_str)), None
     except ValueError:
         return None, "Invalid UUID format"
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    padded = value + "=" * (-len(value) % 4)
+    return base64.urlsafe_b64decode(padded.encode("ascii"))
+
+
+def _cursor_signature(payload: str, secret: str, context: str) -> str:
+    message = f"{context}.{payload}".encode("utf-8")
+    digest = hmac.new(secret.encode("utf-8"), message, hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def encode_cursor(data: dict, secret: str, context: str = "") -> str:
+    """
+    Encodes pagination state into an opaque, URL-safe, signed cursor.
+
+    The HMAC covers context as well, so a cursor bound to one context (e.g.
+    a tenant) does not verify in another.
+
+    Returns:
+        str: The cursor string.
+    """
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    payload = _b64encode(raw)
+    return f"{payload}.{_cursor_signature(payload, secret, context)}"
+
+
+def decode_cursor(cursor: str, secret: str, context: str = "") -> tuple[dict, str]:
+    """
+    Decodes and verifies a cursor produced by encode_cursor.
+
+    Returns:
+        tuple[dict, str]: The pagination state if the cursor is valid,
+            or None and error message if it's not.
+    """
+    payload, _, signature = cursor.partition(".")
+    expected = _cursor_signature(payload, secret, context)
+    if not hmac.compare_digest(signature.encode("utf-8"), expected.encode("utf-8")):
+        return None, "Invalid cursor signature"
+    try:
+        data = json.loads(_b64decode(payload))
+    except (binascii.Error, UnicodeError, ValueError):
+        return None, "Invalid cursor format"
+    if not isinstance(data, dict):
+        return None, "Invalid cursor format"
+    return data, None